@@ -0,0 +1,201 @@
+"""Non-interactive batch mode for scripted and headless runs.
+
+Schedules one or more trace files (or directories of them) with the policy
+and parameters given as flags, and writes the results as JSON, JSON Lines
+or CSV to stdout or a file. Nothing here imports Tk or matplotlib.
+
+    python main.py traces/ --policy sjf --cores 4 --format csv -o results.csv
+    python main.py a.jsonl b.csv --policy all --summary
+    python main.py big.ctrace --policy srtf --summary --instrument report.prom --cprofile
+"""
+import argparse
+import csv
+import os
+import sys
+
+from engine import POLICIES, simulate
+from instrument import INSTRUMENTS
+from traceio import SCHEDULE_FIELDS, load_batch, open_trace, trace_format, write_rows
+
+POLICY_ALIASES = {
+    'fcfs': "FCFS",
+    'rr': "Round Robin",
+    'sjf': "Shortest Job First",
+    'srtf': "Shortest Remaining Time",
+    'energy': "Energy-Aware",
+    'priority': "Priority-Based",
+    'priority-preemptive': "Priority (Preemptive)",
+}
+ALL_POLICIES = 'all'
+SUMMARY_FIELDS = ('trace', 'policy', 'tasks', 'total_energy', 'avg_power', 'makespan',
+                  'avg_waiting', 'avg_turnaround')
+FORMATS = ('json', 'jsonl', 'csv')
+
+
+def policy_name(value):
+    """Resolve a policy given on the command line by full name or alias"""
+    if value.lower() == ALL_POLICIES:
+        return ALL_POLICIES
+    for policy in POLICIES:
+        if value.lower() == policy.lower():
+            return policy
+    try:
+        return POLICY_ALIASES[value.lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(
+            f"unknown policy {value!r} (choose from {', '.join(POLICY_ALIASES)}, all)") from None
+
+
+def _is_trace(path):
+    try:
+        trace_format(path)
+        return True
+    except ValueError:
+        return False
+
+
+def expand_inputs(paths):
+    """Trace files named directly, plus every trace file under the given directories"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if _is_trace(os.path.join(root, name)))
+        else:
+            files.append(path)
+    return files
+
+
+def _values(column):
+    return column.tolist() if hasattr(column, 'tolist') else column
+
+
+def schedule_rows(schedule, trace=None):
+    """One output row per task, in SCHEDULE_FIELDS order (prefixed by ``trace`` if given)"""
+    prefix = () if trace is None else (trace,)
+    for task, start, end, energy, core in zip(schedule.tasks, _values(schedule.starts), _values(schedule.ends),
+                                              _values(schedule.energies), _values(schedule.cores)):
+        yield prefix + tuple(task) + (start, end, energy, core)
+
+
+def _options(args):
+    return {
+        'quantum': args.quantum,
+        'switch_cost': args.switch_cost,
+        'cores': args.cores,
+        'partitioned': args.partitioned,
+        'profile': args.profile,
+    }
+
+
+def _rows(files, args, errors):
+    """Lazily schedule each file and yield its output rows; failures are reported and skipped"""
+    options = _options(args)
+    store = None
+    if args.record:
+        from rundb import RunStore
+        store = RunStore(args.db) if args.db else RunStore()
+    try:
+        for path in files:
+            try:
+                with INSTRUMENTS.phase('load'):
+                    tasks = load_batch(path)
+                if args.policy == ALL_POLICIES:
+                    from compare import compare_policies
+                    for result in compare_policies(tasks, processes=args.processes, **options):
+                        yield (path,) + tuple(result[field] for field in SUMMARY_FIELDS[1:])
+                    continue
+
+                schedule = simulate(tasks, args.policy, **options)
+                if store is not None:
+                    with INSTRUMENTS.phase('record'):
+                        store.save_run(schedule, tasks, **options)
+                if args.summary:
+                    from compare import summarize
+                    result = summarize(schedule, curve=False)
+                    yield (path,) + tuple(result[field] for field in SUMMARY_FIELDS[1:])
+                else:
+                    yield from schedule_rows(schedule, path if len(files) > 1 else None)
+            except (OSError, ValueError, KeyError, csv.Error) as e:
+                errors.append(path)
+                print(f"{path}: {e}", file=sys.stderr)
+    finally:
+        if store is not None:
+            store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Schedule task trace files without the interactive menu or GUI")
+    parser.add_argument('inputs', nargs='+', help="trace files (.json, .jsonl, .csv, .gz, .ctrace) or directories")
+    parser.add_argument('-p', '--policy', type=policy_name, default="FCFS",
+                        help="policy name or alias (fcfs, rr, sjf, srtf, energy, priority, "
+                             "priority-preemptive), or 'all' to compare every policy")
+    parser.add_argument('--quantum', type=float, default=2, help="Round Robin time quantum")
+    parser.add_argument('--switch-cost', type=float, default=0, help="Round Robin context switch cost")
+    parser.add_argument('--cores', type=int, default=1)
+    parser.add_argument('--partitioned', action='store_true', help="per-core ready queues")
+    parser.add_argument('--profile', default=None,
+                        help="power profile: Performance, Balanced, Power Saver or Auto")
+    parser.add_argument('--summary', action='store_true', help="one summary row per input instead of per task")
+    parser.add_argument('-f', '--format', choices=FORMATS, default=None,
+                        help="output format (default: from the -o extension, else json)")
+    parser.add_argument('-o', '--output', default=None, help="output file (default: stdout)")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes for --policy all")
+    parser.add_argument('--record', action='store_true', help="also store each run in the run history database")
+    parser.add_argument('--db', default=None, help="run history database for --record")
+    parser.add_argument('--instrument', metavar='PATH', default=None,
+                        help="write phase timings and counters here (Prometheus text for .prom, else JSON)")
+    parser.add_argument('--cprofile', action='store_true', help="add a cProfile capture to --instrument")
+    parser.add_argument('--tracemalloc', action='store_true', help="add tracemalloc statistics to --instrument")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.cprofile or args.tracemalloc) and not args.instrument:
+        parser.error("--cprofile and --tracemalloc need --instrument")
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("No trace files found", file=sys.stderr)
+        return 1
+
+    fmt = args.format
+    if fmt is None:
+        fmt = trace_format(args.output) if args.output and _is_trace(args.output) else 'json'
+        if fmt not in FORMATS:
+            fmt = 'json'
+
+    if args.policy == ALL_POLICIES or args.summary:
+        fields = SUMMARY_FIELDS
+    else:
+        fields = (('trace',) if len(files) > 1 else ()) + SCHEDULE_FIELDS
+
+    if args.instrument:
+        INSTRUMENTS.enable(cprofile=args.cprofile, tracemalloc=args.tracemalloc)
+
+    errors = []
+    rows = _rows(files, args, errors)
+    if args.output:
+        with open_trace(args.output, 'w') as f:
+            write_rows(f, fmt, fields, rows)
+    else:
+        try:
+            write_rows(sys.stdout, fmt, fields, rows)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader went away (e.g. piped into head): stop quietly, and point
+            # stdout at devnull so flushing it at exit cannot fail again
+            rows.close()
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    if args.instrument:
+        INSTRUMENTS.disable()
+        INSTRUMENTS.write(args.instrument)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Benchmark suite for the scheduling engine.
+
+Times every policy over growing task counts and several arrival patterns,
+records peak traced memory, and writes the results as JSON. Given a
+baseline file from an earlier run it reports every case that got slower
+by more than the threshold and exits with status 1, so it can gate CI.
+
+With --startup it instead times a cold import of each command line entry
+point in a fresh interpreter and fails if one takes longer than the budget
+or pulls in a module it should only load on first use (Tk, matplotlib).
+
+    python bench.py -o bench.json
+    python bench.py --sizes 1000 100000 --baseline bench.json --threshold 0.2
+    python bench.py --startup --startup-budget 50
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from engine import POLICIES, simulate
+from taskbatch import LOAD, MEAN_BURST, TaskBatch
+
+SIZES = (1000, 10000, 100000, 1000000, 10000000)
+# Cases faster than this are dominated by timer noise and never flagged
+MIN_COMPARABLE_SECONDS = 0.01
+
+# Entry points launched as short-lived processes, and modules each must not load at import
+STARTUP_MODULES = {
+    'main': ('tkinter', 'matplotlib', 'numpy'),
+    'batch': ('tkinter', 'matplotlib', 'numpy'),
+    'cli': ('tkinter', 'matplotlib', 'numpy'),
+    'scheduler': ('tkinter', 'matplotlib', 'numpy'),
+    'engine': ('tkinter', 'matplotlib', 'numpy'),
+}
+# Milliseconds an entry point may spend importing, on top of interpreter start-up
+STARTUP_BUDGET_MS = 50.0
+_STARTUP_PROBE = """\
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(' '.join(name for name in {forbidden!r} if name in sys.modules))
+"""
+
+
+def _uniform(rng, n):
+    return rng.integers(0, int(n * MEAN_BURST / LOAD) + 1, n)
+
+
+def _poisson(rng, n):
+    return np.cumsum(rng.exponential(MEAN_BURST / LOAD, n)).astype(np.int64)
+
+
+def _bursty(rng, n, size=100):
+    # Groups of ``size`` tasks arrive together, with the same average load
+    groups = np.cumsum(rng.exponential(size * MEAN_BURST / LOAD, -(-n // size))).astype(np.int64)
+    return np.repeat(groups, size)[:n]
+
+
+DISTRIBUTIONS = {
+    'uniform': _uniform,
+    'poisson': _poisson,
+    'bursty': _bursty,
+}
+
+
+def workload(distribution, n, seed=0):
+    """TaskBatch of ``n`` tasks with arrivals drawn from ``distribution``"""
+    rng = np.random.default_rng(seed)
+    arrival = DISTRIBUTIONS[distribution](rng, n)
+    return TaskBatch(arrival, rng.integers(1, 10, n, endpoint=True), rng.integers(1, 5, n, endpoint=True),
+                     rng.integers(1, 5, n, endpoint=True))
+
+
+def time_case(tasks, policy, repeat=1, memory=True, **options):
+    """Best wall-clock time over ``repeat`` runs and the peak traced memory in MB"""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        simulate(tasks, policy, **options)
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        # Tracing slows allocation down, so it gets a run of its own
+        tracemalloc.start()
+        try:
+            simulate(tasks, policy, **options)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return best, peak_mb
+
+
+def run(sizes=SIZES, policies=None, distributions=None, repeat=1, memory=True, budget=60.0,
+        log=print, **options):
+    """Benchmark every (policy, distribution, size) case and return result dicts.
+
+    Once a policy's run time extrapolated linearly to the next size exceeds
+    ``budget`` seconds, its larger sizes are recorded as skipped instead of run.
+    """
+    policies = list(POLICIES) if policies is None else list(policies)
+    distributions = list(DISTRIBUTIONS) if distributions is None else list(distributions)
+    results = []
+    for distribution in distributions:
+        for policy in policies:
+            previous = None
+            for n in sorted(sizes):
+                case = {'policy': policy, 'distribution': distribution, 'n': n}
+                if previous is not None and previous[1] * n / previous[0] > budget:
+                    case['skipped'] = True
+                    results.append(case)
+                    continue
+                tasks = workload(distribution, n)
+                seconds, peak_mb = time_case(tasks, policy, repeat, memory, **options)
+                del tasks
+                case['seconds'] = seconds
+                case['tasks_per_second'] = n / seconds if seconds > 0 else None
+                if peak_mb is not None:
+                    case['peak_mb'] = peak_mb
+                results.append(case)
+                previous = (n, seconds)
+                if log:
+                    log(f"{policy:<24} {distribution:<8} n={n:<9} {seconds:9.4f}s"
+                        + (f" {peak_mb:9.1f} MB" if peak_mb is not None else ""))
+    return results
+
+
+def _case_key(case):
+    return case['policy'], case['distribution'], case['n']
+
+
+def compare(results, baseline, threshold=0.2):
+    """Cases more than ``threshold`` slower than the baseline, as (case, base, ratio)"""
+    previous = {_case_key(case): case for case in baseline if 'seconds' in case}
+    regressions = []
+    for case in results:
+        base = previous.get(_case_key(case))
+        if base is None or 'seconds' not in case or base['seconds'] < MIN_COMPARABLE_SECONDS:
+            continue
+        ratio = case['seconds'] / base['seconds']
+        if ratio > 1 + threshold:
+            regressions.append((case, base, ratio))
+    return regressions
+
+
+def time_startup(module, forbidden=(), repeat=5):
+    """Best cold import time of ``module`` in seconds, and the forbidden modules it loaded"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    best, loaded = math.inf, []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _STARTUP_PROBE.format(module=module, forbidden=forbidden)],
+                                cwd=here, capture_output=True, text=True, check=True).stdout.split('\n')
+        best = min(best, float(output[0]))
+        loaded = output[1].split()
+    return best, loaded
+
+
+def check_startup(modules=STARTUP_MODULES, budget_ms=STARTUP_BUDGET_MS, repeat=5, log=print):
+    """Time every entry point's import; returns the failures as messages"""
+    failures = []
+    for module, forbidden in modules.items():
+        seconds, loaded = time_startup(module, forbidden, repeat)
+        log(f"{module:<12} {seconds * 1000:8.1f} ms" + (f"  loads {', '.join(loaded)}" if loaded else ""))
+        if seconds * 1000 > budget_ms:
+            failures.append(f"{module} takes {seconds * 1000:.1f} ms to import (budget {budget_ms:g} ms)")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} at start-up")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduling engine")
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES))
+    parser.add_argument('--policy', nargs='+', choices=POLICIES, default=None)
+    parser.add_argument('--distribution', nargs='+', choices=list(DISTRIBUTIONS), default=None)
+    parser.add_argument('--cores', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1, help="timed runs per case (best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak memory run")
+    parser.add_argument('--budget', type=float, default=60.0,
+                        help="skip sizes expected to take longer than this many seconds")
+    parser.add_argument('-o', '--output', default=None, help="write results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed slowdown relative to the baseline (0.2 = 20%%)")
+    parser.add_argument('--startup', action='store_true',
+                        help="only check the import time of the command line entry points")
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_MS,
+                        help="milliseconds each entry point may take to import")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        failures = check_startup(budget_ms=args.startup_budget, repeat=max(args.repeat, 5))
+        for failure in failures:
+            print(f"STARTUP {failure}")
+        return 1 if failures else 0
+
+    results = run(args.sizes, args.policy, args.distribution, args.repeat, not args.no_memory,
+                  args.budget, cores=args.cores)
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for case, base, ratio in regressions:
+            print(f"REGRESSION {case['policy']} {case['distribution']} n={case['n']}: "
+                  f"{base['seconds']:.4f}s -> {case['seconds']:.4f}s ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
-import tkinter as tk
+from engine import POLICIES
 from scheduler import EnergyEfficientScheduler
 from task import Task
 
 def show_gui_results(scheduler):
     """Creates a pop-up window displaying scheduling results."""
+    import tkinter as tk
+
     result_window = tk.Tk()
     result_window.title("Scheduling Results")
 
@@ -18,7 +20,23 @@ def show_gui_results(scheduler):
     
     result_window.mainloop()
 
+def choose(label, options, default):
+    """Prompts until the user picks one of ``options`` by its 1-based number; Enter picks ``default``."""
+    choices = ", ".join(f"[{i+1}] {name}" for i, name in enumerate(options))
+    while True:
+        choice = input(f"{label} {choices} (default {options.index(default) + 1}): ").strip()
+        if not choice:
+            return default
+        if choice.isdigit() and 1 <= int(choice) <= len(options):
+            return options[int(choice) - 1]
+        print(f"❌ Please enter a number from 1 to {len(options)}.")
+
 def run_cli():
+    # numpy and sqlite are only needed once tasks are in, so load them here
+    import sqlite3
+    from compare import COMPARE_ALL, compare_policies, format_table
+    from rundb import RunStore
+
     tasks = []
 
     try:
@@ -30,12 +48,43 @@ def run_cli():
 
             task = Task(arrival, burst, power)
             tasks.append(task)
+
+        modes = POLICIES + [COMPARE_ALL]
+        policy = choose("Scheduling Policy", modes, modes[0])
+
+        quantum, switch_cost = 2, 0
+        if policy in ("Round Robin", COMPARE_ALL):
+            quantum = float(input("Time Quantum (default 2): ").strip() or 2)
+            switch_cost = float(input("Context Switch Cost (default 0): ").strip() or 0)
+
+        cores = int(input("Number of Cores (default 1): ").strip() or 1)
+        partitioned = False
+        if cores > 1:
+            partitioned = input("Per-core queues? [y/N]: ").strip().lower() == "y"
+
+        profiles = ["Performance", "Balanced", "Power Saver", "Auto"]
+        profile = choose("Power Profile", profiles, "Balanced")
+
+        if policy == COMPARE_ALL:
+            # Every policy runs in its own worker process
+            results = compare_policies(tasks, quantum=quantum, switch_cost=switch_cost,
+                                       cores=cores, partitioned=partitioned, profile=profile)
+            print(format_table(results))
+            return
         
-        scheduler = EnergyEfficientScheduler(tasks)
+        scheduler = EnergyEfficientScheduler(tasks, policy, quantum, switch_cost, cores, partitioned, profile)
         scheduler.schedule()
+
+        try:
+            store = RunStore()
+            run_id = store.save_run(scheduler.result, tasks, quantum, switch_cost, cores, partitioned, profile)
+            store.close()
+            print(f"💾 Saved as run #{run_id} (browse with: python rundb.py list)")
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Run not recorded: {e}")
         
         # Show results in a pop-up GUI window
         show_gui_results(scheduler)
 
-    except ValueError:
+    except (ValueError, IndexError):
         print("❌ Invalid input! Please enter integer values only.")
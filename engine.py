@@ -0,0 +1,527 @@
+"""Headless discrete-event scheduling engine shared by the GUI and the CLI.
+
+Nothing in here touches Tk or matplotlib, so it can run on machines without
+a display. Tasks are handled internally as plain tuples (see ``normalize_tasks``)
+which keeps large traces cheap to sort and push through the ready queue.
+"""
+import heapq
+import sys
+from array import array
+from collections import deque
+from operator import itemgetter
+
+from instrument import INSTRUMENTS
+
+POLICIES = ["FCFS", "Round Robin", "Shortest Job First", "Shortest Remaining Time",
+            "Energy-Aware", "Priority-Based", "Priority (Preemptive)"]
+
+# Field positions inside a task record: (id, arrival, burst, power, priority)
+ID, ARRIVAL, BURST, POWER, PRIORITY = range(5)
+
+
+def is_batch(tasks):
+    """True if ``tasks`` is a columnar taskbatch.TaskBatch"""
+    # A TaskBatch can only exist once its module (and NumPy) has been imported
+    taskbatch = sys.modules.get('taskbatch')
+    return taskbatch is not None and isinstance(tasks, taskbatch.TaskBatch)
+
+
+def normalize_tasks(tasks):
+    """Convert GUI task dicts, task.Task objects or record tuples into records"""
+    records = []
+    for i, task in enumerate(tasks):
+        if isinstance(task, tuple):
+            records.append(task)
+        elif isinstance(task, dict):
+            records.append((task.get('id', i + 1), task['arrival'], task['burst'],
+                            task['power'], task.get('priority', 1)))
+        else:
+            records.append((getattr(task, 'id', i + 1), task.arrival, task.burst,
+                            task.power, getattr(task, 'priority', 1)))
+    return records
+
+
+class Schedule:
+    """Result of one simulation run, stored column-wise.
+
+    The per-task columns are in completion order, with ``starts`` holding the
+    first time each task got the CPU and ``cores`` the core it finished on.
+    Preemptive policies also fill the
+    ``slice_*`` columns with every stretch of CPU time a task received; the
+    slice times live in flat ``array('d')`` buffers so runs with a huge
+    number of quantum expirations stay compact.
+    """
+
+    def __init__(self, policy, preemptive=False, cores=1):
+        self.policy = policy
+        self.preemptive = preemptive
+        self.num_cores = cores
+        self.tasks = []
+        self.starts = []
+        self.ends = []
+        self.energies = []
+        self.cores = array('H')
+        self.slice_tasks = []
+        self.slice_starts = array('d')
+        self.slice_ends = array('d')
+        self.slice_cores = array('H')
+        self.total_energy = 0
+        self.makespan = 0
+
+    def __len__(self):
+        return len(self.tasks)
+
+    @property
+    def avg_power(self):
+        return self.total_energy / self.makespan if self.makespan > 0 else 0
+
+    def slices(self):
+        """Iterate over (task, start, end, core) for every executed slice"""
+        if self.preemptive:
+            return zip(self.slice_tasks, self.slice_starts, self.slice_ends, self.slice_cores)
+        return zip(self.tasks, self.starts, self.ends, self.cores)
+
+    def collect(self, events):
+        """Append (task, start, end, first_start, core) events from a dispatch loop.
+
+        ``first_start`` is None for a slice that did not finish its task.
+        """
+        add_task, add_start = self.tasks.append, self.starts.append
+        add_end, add_energy = self.ends.append, self.energies.append
+        add_core = self.cores.append
+        add_slice_task, add_slice_start = self.slice_tasks.append, self.slice_starts.append
+        add_slice_end, add_slice_core = self.slice_ends.append, self.slice_cores.append
+        preemptive = self.preemptive
+        total_energy = self.total_energy
+        makespan = self.makespan
+        for task, start, end, first, core in events:
+            if preemptive:
+                add_slice_task(task)
+                add_slice_start(start)
+                add_slice_end(end)
+                add_slice_core(core)
+                if first is None:
+                    continue
+            energy = task[BURST] * task[POWER]
+            add_task(task)
+            add_start(first)
+            add_end(end)
+            add_core(core)
+            add_energy(energy)
+            total_energy += energy
+            if end > makespan:
+                makespan = end
+        self.total_energy = total_energy
+        self.makespan = makespan
+        return self
+
+    def to_dicts(self):
+        """Scheduled tasks in the dict layout used by the GUI"""
+        return [
+            {
+                'id': task[ID],
+                'arrival': task[ARRIVAL],
+                'burst': task[BURST],
+                'power': task[POWER],
+                'priority': task[PRIORITY],
+                'start': start,
+                'end': end,
+                'energy': energy,
+                'core': core
+            }
+            for task, start, end, energy, core in zip(self.tasks, self.starts, self.ends,
+                                                      self.energies, self.cores)
+        ]
+
+
+def _run_in_order(records, cores, free=None):
+    """Dispatch records in the given order, each on the earliest free core.
+
+    ``free`` is a heap of (time the core becomes free, core index) to start
+    from instead of every core being free at time 0.
+    """
+    if free is None:
+        free = [(0, core) for core in range(cores)]
+    if cores == 1:
+        clock = free[0][0]
+        for task in records:
+            arrival = task[ARRIVAL]
+            start = clock if clock > arrival else arrival
+            clock = start + task[BURST]
+            yield task, start, clock, start, 0
+        return
+
+    replace = heapq.heapreplace
+    for task in records:
+        free_at, core = free[0]
+        arrival = task[ARRIVAL]
+        start = free_at if free_at > arrival else arrival
+        end = start + task[BURST]
+        replace(free, (end, core))
+        yield task, start, end, start, core
+
+
+def _run_ready_queue(records, key, cores, free=None, ready=None, seq=0, clock=0):
+    """Non-preemptive dispatch from a min-heap of arrived tasks.
+
+    ``records`` must be ordered by arrival. Whenever a core frees up, every
+    task that has arrived by then is pushed onto the ready queue and the one
+    with the smallest ``key`` runs to completion on that core. Ties go to the
+    earlier arrival because the sequence number follows arrival order.
+    ``free``, ``ready``, ``seq`` and ``clock`` resume a run from that state.
+    """
+    push, pop, replace = heapq.heappush, heapq.heappop, heapq.heapreplace
+    source = iter(records)
+    pending = next(source, None)
+    if ready is None:
+        ready = []
+    # Heap of (time the core becomes free, core index)
+    if free is None:
+        free = [(0, core) for core in range(cores)]
+
+    while pending is not None or ready:
+        free_at, core = free[0]
+        if free_at > clock:
+            clock = free_at
+        # Nothing waiting: jump the clock straight to the next arrival event
+        if not ready and pending[ARRIVAL] > clock:
+            clock = pending[ARRIVAL]
+
+        while pending is not None and pending[ARRIVAL] <= clock:
+            push(ready, (key(pending), seq, pending))
+            seq += 1
+            pending = next(source, None)
+
+        task = pop(ready)[2]
+        end = clock + task[BURST]
+        replace(free, (end, core))
+        yield task, clock, end, clock, core
+
+
+def _run_preemptive(records, key, cores):
+    """Preemptive dispatch from a min-heap of arrived tasks.
+
+    ``key(task, remaining)`` ranks tasks. When every core is busy, an arrival
+    with a strictly smaller key than the worst running task preempts it and
+    that task goes back on the heap with its remaining time and its original
+    sequence number, so ties still go to the earlier arrival. Each arrival
+    preempts at most once, so a run costs O(n * cores * log n).
+    """
+    push, pop = heapq.heappush, heapq.heappop
+    source = iter(records)
+    pending = next(source, None)
+    ready = []
+    seq = 0
+    clock = 0
+    # Per core: (task, slice start, remaining at slice start, first start, seq) or None
+    running = [None] * cores
+    busy = 0
+
+    while busy or pending is not None or ready:
+        if not busy and not ready and pending[ARRIVAL] > clock:
+            clock = pending[ARRIVAL]
+        while pending is not None and pending[ARRIVAL] <= clock:
+            push(ready, (key(pending, pending[BURST]), seq, pending, pending[BURST], None))
+            seq += 1
+            pending = next(source, None)
+
+        # Hand the best waiting tasks to idle cores
+        if ready and busy < cores:
+            for core in range(cores):
+                if running[core] is None:
+                    _, task_seq, task, remaining, first = pop(ready)
+                    running[core] = (task, clock, remaining, clock if first is None else first, task_seq)
+                    busy += 1
+                    if not ready:
+                        break
+
+        # With every core busy, let waiting tasks displace running ones that rank worse
+        while ready and busy == cores:
+            worst = worst_key = None
+            for core, slot in enumerate(running):
+                current = key(slot[0], slot[2] - (clock - slot[1]))
+                # Among equal keys the latest arrival is the one displaced
+                if worst is None or current > worst_key or (current == worst_key and slot[4] > running[worst][4]):
+                    worst, worst_key = core, current
+            if not ready[0][0] < worst_key:
+                break
+            task, run_start, remaining, first, task_seq = running[worst]
+            yield task, run_start, clock, None, worst
+            push(ready, (worst_key, task_seq, task, remaining - (clock - run_start), first))
+            _, task_seq, task, remaining, first = pop(ready)
+            running[worst] = (task, clock, remaining, clock if first is None else first, task_seq)
+
+        finish = min(slot[1] + slot[2] for slot in running if slot is not None)
+        if pending is None or finish <= pending[ARRIVAL]:
+            clock = finish
+            for core, slot in enumerate(running):
+                if slot is not None and slot[1] + slot[2] == finish:
+                    yield slot[0], slot[1], finish, slot[3], core
+                    running[core] = None
+                    busy -= 1
+        else:
+            # Run up to the next arrival; it is admitted at the top of the loop
+            clock = pending[ARRIVAL]
+
+
+def _run_round_robin(records, quantum, switch_cost, cores):
+    """Round Robin over a FIFO deque of arrived tasks.
+
+    Tasks arriving during a slice join the queue before the task that was
+    just preempted, which rejoins when its slice ends. ``switch_cost`` time
+    units are spent whenever a core moves from one task to a different one.
+    """
+    if cores == 1:
+        return _run_round_robin_one_core(records, quantum, switch_cost)
+    return _run_round_robin_shared(records, quantum, switch_cost, cores)
+
+
+def _run_round_robin_shared(records, quantum, switch_cost, cores):
+    """Multi-core Round Robin, where each core takes the next queued task"""
+    push, pop = heapq.heappush, heapq.heappop
+    source = iter(records)
+    pending = next(source, None)
+    ready = deque()
+    enqueue, dequeue = ready.append, ready.popleft
+    # Heap of (slice end, seq, queue entry) for tasks that used up their quantum
+    requeued = []
+    seq = 0
+    free = [(0, core) for core in range(cores)]
+    last = [None] * cores
+    clock = 0
+
+    while pending is not None or ready or requeued:
+        free_at, core = pop(free)
+        if free_at > clock:
+            clock = free_at
+        if not ready:
+            # Idle core: wait for the next arrival or preempted slice
+            wake = pending[ARRIVAL] if pending is not None else requeued[0][0]
+            if requeued and requeued[0][0] < wake:
+                wake = requeued[0][0]
+            if wake > clock:
+                clock = wake
+            last[core] = None
+
+        # Admit arrivals and preempted tasks in time order, arrivals first on ties
+        while True:
+            if pending is not None and pending[ARRIVAL] <= clock and (
+                    not requeued or pending[ARRIVAL] <= requeued[0][0]):
+                enqueue((pending, pending[BURST], None))
+                pending = next(source, None)
+            elif requeued and requeued[0][0] <= clock:
+                enqueue(pop(requeued)[2])
+            else:
+                break
+
+        task, remaining, first = dequeue()
+        start = clock
+        if last[core] is not None and last[core] is not task:
+            start += switch_cost
+        if first is None:
+            first = start
+        if remaining > quantum:
+            end = start + quantum
+            remaining -= quantum
+        else:
+            end = start + remaining
+            remaining = 0
+        last[core] = task
+        push(free, (end, core))
+
+        if remaining:
+            yield task, start, end, None, core
+            push(requeued, (end, seq, (task, remaining, first)))
+            seq += 1
+        else:
+            yield task, start, end, first, core
+
+
+def _run_round_robin_one_core(records, quantum, switch_cost):
+    """Single-core Round Robin, where a preempted task can rejoin right away"""
+    source = iter(records)
+    pending = next(source, None)
+    ready = deque()
+    enqueue, dequeue = ready.append, ready.popleft
+    clock = 0
+    last = None
+
+    while pending is not None or ready:
+        if not ready:
+            if pending[ARRIVAL] > clock:
+                clock = pending[ARRIVAL]
+            last = None
+        while pending is not None and pending[ARRIVAL] <= clock:
+            enqueue((pending, pending[BURST], None))
+            pending = next(source, None)
+
+        task, remaining, first = dequeue()
+        if last is not None and last is not task:
+            clock += switch_cost
+        if first is None:
+            first = clock
+        start = clock
+        if remaining > quantum:
+            clock += quantum
+            remaining -= quantum
+        else:
+            clock += remaining
+            remaining = 0
+        last = task
+
+        while pending is not None and pending[ARRIVAL] <= clock:
+            enqueue((pending, pending[BURST], None))
+            pending = next(source, None)
+
+        if remaining:
+            yield task, start, clock, None, 0
+            enqueue((task, remaining, first))
+        else:
+            yield task, start, clock, first, 0
+
+
+def _partition(records, cores):
+    """Split arrival-ordered records into per-core queues, least loaded first"""
+    replace = heapq.heapreplace
+    load = [(0, core) for core in range(cores)]
+    parts = [[] for _ in range(cores)]
+    for task in records:
+        work, core = load[0]
+        parts[core].append(task)
+        replace(load, (work + task[BURST], core))
+    return parts
+
+
+def _on_core(events, core):
+    for task, start, end, first, _ in events:
+        yield task, start, end, first, core
+
+
+def _by_arrival(task):
+    return task[ARRIVAL]
+
+
+def _by_remaining(task, remaining):
+    return remaining
+
+
+def _by_priority(task, remaining):
+    return task[PRIORITY]
+
+
+# Ready-queue keys for the non-preemptive policies that pick among arrived tasks
+_READY_KEYS = {
+    "Shortest Job First": itemgetter(BURST),
+    "Energy-Aware": itemgetter(POWER),
+    "Priority-Based": itemgetter(PRIORITY),
+}
+
+# Ready-queue keys for the preemptive policies, given (task, remaining time)
+_PREEMPTIVE_KEYS = {
+    "Shortest Remaining Time": _by_remaining,
+    "Priority (Preemptive)": _by_priority,
+}
+
+
+def _by_end(event):
+    return event[2]
+
+
+def _dispatcher(policy, quantum, switch_cost):
+    """Return (run, preemptive) for a policy, where run(records, cores) yields events"""
+    if policy == "FCFS":
+        # The ready queue would always hand back the earliest arrival, so the
+        # arrival-sorted records can be dispatched as they are
+        return _run_in_order, False
+    if policy == "Round Robin":
+        if quantum <= 0:
+            raise ValueError("Round Robin time quantum must be positive")
+        if switch_cost < 0:
+            raise ValueError("Context switch cost cannot be negative")
+        return lambda records, cores: _run_round_robin(records, quantum, switch_cost, cores), True
+    if policy in _READY_KEYS:
+        return lambda records, cores: _run_ready_queue(records, _READY_KEYS[policy], cores), False
+    if policy in _PREEMPTIVE_KEYS:
+        return lambda records, cores: _run_preemptive(records, _PREEMPTIVE_KEYS[policy], cores), True
+    raise ValueError(f"Unknown scheduling policy: {policy}")
+
+
+def is_preemptive(policy):
+    """True if ``policy`` can take the CPU away from a task before it finishes"""
+    return policy == "Round Robin" or policy in _PREEMPTIVE_KEYS
+
+
+def simulate(tasks, policy="FCFS", quantum=2, switch_cost=0, cores=1, partitioned=False,
+             profile=None, budget=None):
+    """Schedule ``tasks`` under ``policy`` and return a Schedule.
+
+    ``quantum`` and ``switch_cost`` only apply to Round Robin. With more than
+    one core, tasks either share one global ready queue or, if
+    ``partitioned`` is set, are split up front into per-core queues that are
+    each scheduled with the same policy. ``profile`` names a dvfs power
+    profile whose frequency scaling is applied to the tasks first, with
+    ``budget`` as the makespan bound for the Auto profile. A TaskBatch under
+    single-core FCFS gets the vectorized timeline and a taskbatch.BatchSchedule.
+    """
+    if cores < 1:
+        raise ValueError("At least one core is required")
+    if profile is not None:
+        import dvfs
+        with INSTRUMENTS.phase('power_profile'):
+            tasks = dvfs.apply_profile(tasks, profile, budget, cores)
+    if is_batch(tasks) and policy == "FCFS" and cores == 1:
+        with INSTRUMENTS.phase('dispatch'):
+            schedule = tasks.fcfs()
+    else:
+        with INSTRUMENTS.phase('sort'):
+            records = normalize_tasks(tasks.to_records() if is_batch(tasks) else tasks)
+            records.sort(key=_by_arrival)
+
+        run, preemptive = _dispatcher(policy, quantum, switch_cost)
+        with INSTRUMENTS.phase('dispatch'):
+            if partitioned and cores > 1:
+                # Each per-core run is already in time order, so merging by end time
+                # keeps the combined stream in completion order
+                runs = [_on_core(run(queue, 1), core) for core, queue in enumerate(_partition(records, cores))]
+                events = heapq.merge(*runs, key=_by_end)
+            else:
+                events = run(records, cores)
+            schedule = Schedule(policy, preemptive=preemptive, cores=cores).collect(events)
+
+    if INSTRUMENTS.enabled:
+        INSTRUMENTS.record_schedule(schedule)
+    return schedule
+
+
+def stream(records, policy="FCFS", quantum=2, switch_cost=0, cores=1):
+    """Lazily schedule an arrival-ordered stream of records on a global queue.
+
+    Yields (task, start, end, first_start, core) events as soon as they are
+    decided, pulling records from ``records`` only when the simulation clock
+    reaches them. Memory is bounded by the ready queue, not the trace size.
+    """
+    if cores < 1:
+        raise ValueError("At least one core is required")
+    run, _ = _dispatcher(policy, quantum, switch_cost)
+    return run(records, cores)
+
+
+def resume(records, policy, cores, free, ready=(), seq=0, clock=0):
+    """Continue a non-preemptive run on a global queue from a saved dispatcher state.
+
+    ``free`` lists (time the core becomes free, core index) for every core,
+    ``ready`` holds (seq, task) for the tasks admitted but not yet dispatched,
+    ``clock`` is the time of the last dispatch and ``records`` the tasks
+    still to arrive, in arrival order, numbered from ``seq``. Yields the same
+    events as the original run would have from that point on.
+    """
+    free = sorted(free)
+    if policy == "FCFS":
+        # Everything admitted has already been dispatched in arrival order
+        return _run_in_order(records, cores, free)
+    if policy not in _READY_KEYS:
+        raise ValueError(f"Cannot resume a {policy} run")
+    key = _READY_KEYS[policy]
+    queue = [(key(task), number, task) for number, task in ready]
+    heapq.heapify(queue)
+    return _run_ready_queue(records, key, cores, free, queue, seq, clock)
@@ -0,0 +1,148 @@
+"""Gantt chart rendering that stays fast for any number of tasks.
+
+The whole schedule is drawn by one PolyCollection whose polygons are
+rebuilt for the visible time range whenever the x limits change. Zoomed
+out, slices closer together than a pixel are merged into busy intervals,
+so the polygon count is bounded by the axes width times the core count.
+Zoomed in far enough, every slice gets its own task-colored bar, and
+labels appear once only a handful of bars are on screen.
+"""
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.patches import Patch
+
+from engine import ID
+
+# Visible slices up to which each one is drawn individually
+DETAIL_LIMIT = 2000
+# Visible slices up to which bars wide enough for text get a label
+LABEL_LIMIT = 100
+LABEL_MIN_PIXELS = 24
+LEGEND_LIMIT = 20
+BAR_HALF_HEIGHT = 0.3
+
+
+def slice_columns(schedule):
+    """(starts, ends, cores, ids) arrays with one entry per executed slice"""
+    batch = getattr(schedule, 'batch', None)
+    if batch is not None:
+        return (np.asarray(schedule.starts, np.float64), np.asarray(schedule.ends, np.float64),
+                np.asarray(schedule.cores), batch.ids)
+    if schedule.preemptive:
+        tasks, starts, ends, cores = (schedule.slice_tasks, schedule.slice_starts,
+                                      schedule.slice_ends, schedule.slice_cores)
+    else:
+        tasks, starts, ends, cores = schedule.tasks, schedule.starts, schedule.ends, schedule.cores
+    ids = np.array([task[ID] for task in tasks])
+    return (np.asarray(starts, np.float64), np.asarray(ends, np.float64),
+            np.asarray(cores, np.int64), ids)
+
+
+def _bar_verts(starts, ends, lanes):
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = starts
+    verts[:, 2, 0] = verts[:, 3, 0] = ends
+    verts[:, 0, 1] = verts[:, 3, 1] = lanes - BAR_HALF_HEIGHT
+    verts[:, 1, 1] = verts[:, 2, 1] = lanes + BAR_HALF_HEIGHT
+    return verts
+
+
+class GanttView:
+    """Draws a schedule on ``ax`` and redraws it at the right detail on zoom"""
+
+    def __init__(self, ax, schedule, palette, busy_color, edge_color, text_color):
+        self.ax = ax
+        self.text_color = text_color
+        self.edge_color = to_rgba(edge_color)
+        self.busy_color = to_rgba(busy_color, 0.85)
+        self.labels = []
+
+        starts, ends, cores, ids = slice_columns(schedule)
+        # Sorted by core, then time: each core's slices form a run in which
+        # both starts and ends increase, so visible ranges are binary searches
+        order = np.lexsort((starts, cores))
+        self.starts, self.ends, self.cores = starts[order], ends[order], cores[order]
+        self.ids = ids[order]
+        self.core_bounds = np.searchsorted(self.cores, np.arange(schedule.num_cores + 1))
+
+        # Colors follow task ids, so every slice of a task matches
+        self.unique_ids, color_index = np.unique(self.ids, return_inverse=True)
+        self.colors = to_rgba_array(palette, 0.85)
+        self.face_colors = self.colors[color_index % len(self.colors)]
+
+        self.collection = PolyCollection(np.empty((0, 4, 2)), antialiased=False)
+        ax.add_collection(self.collection)
+
+        ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+        if len(self.starts):
+            first, last = self.starts.min(), self.ends.max()
+            pad = max((last - first) * 0.02, 0.5)
+            ax.set_xlim(first - pad, last + pad)
+
+    def legend_handles(self):
+        """One patch per task, or None when there are too many tasks for a legend"""
+        if len(self.unique_ids) > LEGEND_LIMIT:
+            return None
+        return [Patch(facecolor=self.colors[i % len(self.colors)], edgecolor=self.edge_color,
+                      label=f"Task {task_id}") for i, task_id in enumerate(self.unique_ids.tolist())]
+
+    def _visible(self, x0, x1):
+        """(core, lo, hi) for the slices of each core that overlap [x0, x1]"""
+        ranges = []
+        for core in range(len(self.core_bounds) - 1):
+            begin, end = self.core_bounds[core], self.core_bounds[core + 1]
+            lo = begin + np.searchsorted(self.ends[begin:end], x0, side='right')
+            hi = begin + np.searchsorted(self.starts[begin:end], x1, side='left')
+            if hi > lo:
+                ranges.append((core, lo, hi))
+        return ranges
+
+    def _on_xlim_changed(self, ax):
+        self.update()
+
+    def update(self):
+        """Rebuild the polygons (and labels) for the current view"""
+        for label in self.labels:
+            label.remove()
+        self.labels = []
+
+        x0, x1 = self.ax.get_xlim()
+        pixels = max(self.ax.get_window_extent().width, 1)
+        pixel = (x1 - x0) / pixels
+        ranges = self._visible(x0, x1)
+        visible = sum(hi - lo for _, lo, hi in ranges)
+
+        if visible <= DETAIL_LIMIT:
+            index = np.concatenate([np.arange(lo, hi) for _, lo, hi in ranges]) if ranges else np.arange(0)
+            starts, ends = self.starts[index], self.ends[index]
+            # Keep sub-pixel slices visible
+            self.collection.set_verts(_bar_verts(starts, np.maximum(ends, starts + pixel), self.cores[index]))
+            self.collection.set_facecolor(self.face_colors[index])
+            self.collection.set_edgecolor(self.edge_color)
+            self.collection.set_linewidth(1.5 if visible <= LABEL_LIMIT else 0.5)
+            if visible <= LABEL_LIMIT:
+                self._add_labels(index, pixel)
+            return
+
+        # Zoomed out: merge slices separated by less than a pixel per core
+        merged_starts, merged_ends, lanes = [], [], []
+        for core, lo, hi in ranges:
+            starts, ends = self.starts[lo:hi], self.ends[lo:hi]
+            breaks = np.flatnonzero(starts[1:] - ends[:-1] >= pixel)
+            merged_starts.append(np.concatenate(([starts[0]], starts[breaks + 1])))
+            merged_ends.append(np.concatenate((ends[breaks], [ends[-1]])))
+            lanes.append(np.full(len(breaks) + 1, core))
+        starts, ends = np.concatenate(merged_starts), np.concatenate(merged_ends)
+        self.collection.set_verts(_bar_verts(starts, np.maximum(ends, starts + pixel), np.concatenate(lanes)))
+        self.collection.set_facecolor(self.busy_color)
+        self.collection.set_edgecolor('none')
+        self.collection.set_linewidth(0)
+
+    def _add_labels(self, index, pixel):
+        for i in index.tolist():
+            start, end = self.starts[i], self.ends[i]
+            if (end - start) / pixel >= LABEL_MIN_PIXELS:
+                self.labels.append(self.ax.text(
+                    (start + end) / 2, self.cores[i], f"T{self.ids[i]}", ha='center', va='center',
+                    color=self.text_color, fontweight='bold', fontsize=9, clip_on=True))
@@ -1,14 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import random
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import numpy as np
 import time
 import threading
-import json
-from collections import deque
+import queue
+import sqlite3
 import sys
 
+from compare import COMPARE_FIELDS, COMPARE_HEADINGS, compare_policies
+from engine import POLICIES, is_batch
+from gantt import GanttView
+from history import DEFAULT_CAPACITY, RETENTION_CHOICES, HistoryBuffer
+from historyview import VirtualTreeview
+from incremental import IncrementalSchedule
+from instrument import INSTRUMENTS
+from metrics import ScheduleMetrics, format_metrics
+from rundb import RunStore, RunTasks
+from schedcache import ScheduleCache
+from speedscale import POLICY as MIN_ENERGY_POLICY, schedule_min_energy
+from taskbatch import TaskBatch, schedule_columns
+from thermal import ThermalModel, simulate_throttled
+from traceio import load_batch, write_tasks
+
 # Modern color scheme
 COLORS = {
     'bg_primary': '#1e1e2e',      # Dark background
@@ -24,6 +40,27 @@ COLORS = {
     'border': '#4a4a5e',          # Border color
 }
 
+# Seconds between monitor samples and milliseconds between queue drains
+MONITOR_INTERVAL = 1.0
+MONITOR_POLL_MS = 200
+# Wall-clock seconds in which the monitor replays a run's simulated timeline
+THERMAL_REPLAY_SECONDS = 30.0
+RUNS_PAGE_SIZE = 20
+# Task ids listed in the summary when deadlines are missed
+MISSED_SHOWN = 10
+# Tasks the energy chart gives a bar each; beyond this only the most
+# energy-hungry get one and the rest share a single bar
+ENERGY_BAR_LIMIT = 30
+
+TRACE_FILETYPES = [
+    ("Task traces", "*.json *.jsonl *.ndjson *.csv *.gz *.ctrace"),
+    ("JSON files", "*.json"),
+    ("JSON Lines files", "*.jsonl *.ndjson"),
+    ("CSV files", "*.csv"),
+    ("Gzip-compressed traces", "*.gz"),
+    ("Binary traces", "*.ctrace"),
+]
+
 class EnergyEfficientSchedulerGUI:
     def __init__(self, root):
         self.root = root
@@ -32,10 +69,29 @@ class EnergyEfficientSchedulerGUI:
         self.root.configure(bg=COLORS['bg_primary'])
 
         # System state variables
-        self.scheduled_tasks = []
-        self.task_history = deque(maxlen=100)
+        self.schedule = None
+        self.task_history = HistoryBuffer(DEFAULT_CAPACITY)
+        # Where to write the instrumentation report on exit, if instrumentation is on
+        self.instrument_report = INSTRUMENTS.configure_from_env()
+        # Metrics of every run this session, merged as runs complete
+        self.session_metrics = ScheduleMetrics()
+        # Re-running a task set with settings already tried is answered from here
+        self.schedule_cache = ScheduleCache()
+        # Schedule of the task entry window, updated row by row as rows are edited;
+        # edited_rows is None until the window's rows have all been parsed once
+        self.rescheduler = None
+        self.edited_rows = None
+        self.runs_page = 0
+        try:
+            self.run_store = RunStore()
+        except (sqlite3.Error, OSError) as e:
+            # Runs are still scheduled, just not recorded
+            print(f"Run history database unavailable: {e}")
+            self.run_store = None
         self.current_tasks = []
         self.task_entries = []
+        # Deadlines of a loaded TaskBatch (NaN for none), or None
+        self.task_deadlines = None
         self.cached_tasks = []
 
         # System statistics
@@ -47,12 +103,20 @@ class EnergyEfficientSchedulerGUI:
             'active_cores': 4
         }
 
-        # Thread control
+        # The monitor replays the last run's thermal trace from thermal_started on
+        self.thermal_model = ThermalModel()
+        self.thermal_trace = None
+        self.thermal_started = 0.0
+
+        # Thread control; the monitor thread only produces samples; Tk and
+        # matplotlib are touched from the Tk thread alone
         self.shutdown_event = threading.Event()
         self.monitor_thread = None
+        self.monitor_queue = queue.Queue(maxsize=16)
+        self.monitor_after = None
 
         # Configure matplotlib style
-        plt.style.use('dark_background')
+        matplotlib.style.use('dark_background')
 
         # Configure styles first
         self.configure_styles()
@@ -138,6 +202,11 @@ class EnergyEfficientSchedulerGUI:
         style.map('TRadiobutton', background=[('selected', COLORS['bg_secondary'])],
                  foreground=[('selected', COLORS['accent_primary'])])
 
+        style.configure('TCheckbutton', background=COLORS['bg_secondary'], foreground=COLORS['text_primary'],
+                       font=('Segoe UI', 10))
+        style.map('TCheckbutton', background=[('active', COLORS['bg_secondary'])],
+                 foreground=[('selected', COLORS['accent_primary'])])
+
         style.configure('TScale', background=COLORS['bg_secondary'], troughcolor=COLORS['bg_tertiary'])
 
         style.configure('Status.TFrame', background=COLORS['bg_secondary'], relief=tk.RAISED, borderwidth=1)
@@ -194,11 +263,23 @@ class EnergyEfficientSchedulerGUI:
         policy_frame.pack(fill=tk.X, pady=(0, 10))
 
         self.policy_var = tk.StringVar(value="FCFS")
-        policies = ["FCFS", "Round Robin", "Shortest Job First", "Energy-Aware", "Priority-Based"]
 
-        for i, policy in enumerate(policies):
+        for i, policy in enumerate(POLICIES + [MIN_ENERGY_POLICY]):
             ttk.Radiobutton(policy_frame, text=policy, variable=self.policy_var,
-                           value=policy).grid(row=i, column=0, sticky=tk.W, padx=5, pady=4)
+                           value=policy).grid(row=i, column=0, columnspan=2, sticky=tk.W, padx=5, pady=4)
+
+        # Round Robin settings
+        row = len(POLICIES) + 1
+        ttk.Label(policy_frame, text="Time Quantum:", style='Card.TLabel').grid(row=row, column=0, sticky=tk.W, pady=5)
+        self.quantum_entry = ttk.Entry(policy_frame, width=8)
+        self.quantum_entry.insert(0, "2")
+        self.quantum_entry.grid(row=row, column=1, padx=10, pady=5, sticky=tk.EW)
+
+        ttk.Label(policy_frame, text="Context Switch Cost:", style='Card.TLabel').grid(row=row + 1, column=0, sticky=tk.W, pady=5)
+        self.switch_cost_entry = ttk.Entry(policy_frame, width=8)
+        self.switch_cost_entry.insert(0, "0")
+        self.switch_cost_entry.grid(row=row + 1, column=1, padx=10, pady=5, sticky=tk.EW)
+        policy_frame.columnconfigure(1, weight=1)
 
         # Power management section
         power_frame = ttk.LabelFrame(control_frame, text="🔋 Power Management", padding=15)
@@ -206,7 +287,7 @@ class EnergyEfficientSchedulerGUI:
 
         ttk.Label(power_frame, text="Power Profile:", style='Card.TLabel').grid(row=0, column=0, sticky=tk.W, pady=5)
         self.power_profile = ttk.Combobox(power_frame,
-                                         values=["Performance", "Balanced", "Power Saver"], width=12)
+                                         values=["Performance", "Balanced", "Power Saver", "Auto"], width=12)
         self.power_profile.current(1)
         self.power_profile.grid(row=0, column=1, padx=10, pady=5, sticky=tk.EW)
         power_frame.columnconfigure(1, weight=1)
@@ -219,6 +300,10 @@ class EnergyEfficientSchedulerGUI:
         self.core_slider = ttk.Scale(power_frame, from_=1, to=8, value=4)
         self.core_slider.grid(row=2, column=1, padx=10, pady=5, sticky=tk.EW)
 
+        self.partitioned_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(power_frame, text="Per-Core Queues", variable=self.partitioned_var).grid(
+            row=3, column=0, columnspan=2, sticky=tk.W, padx=5, pady=4)
+
         # Action buttons
         action_frame = ttk.Frame(control_frame)
         action_frame.pack(fill=tk.X, pady=10)
@@ -227,6 +312,10 @@ class EnergyEfficientSchedulerGUI:
                   command=self.schedule_tasks, style='Success.TButton')
         schedule_btn.pack(fill=tk.X, pady=5)
 
+        compare_btn = ttk.Button(action_frame, text="📊 Compare All Policies",
+                  command=self.compare_all_policies, style='TButton')
+        compare_btn.pack(fill=tk.X, pady=5)
+
         reset_btn = ttk.Button(action_frame, text="🔄 Reset System",
                   command=self.reset_system, style='TButton')
         reset_btn.pack(fill=tk.X, pady=5)
@@ -242,20 +331,25 @@ class EnergyEfficientSchedulerGUI:
         gantt_frame = ttk.Frame(self.notebook)
         self.notebook.add(gantt_frame, text="📊 Gantt Chart")
 
-        self.gantt_fig, self.gantt_ax = plt.subplots(figsize=(10, 5), facecolor=COLORS['bg_secondary'])
+        self.gantt_fig = Figure(figsize=(10, 5), facecolor=COLORS['bg_secondary'])
+        self.gantt_ax = self.gantt_fig.add_subplot()
         self.gantt_ax.set_facecolor(COLORS['bg_secondary'])
         self.gantt_ax.tick_params(colors=COLORS['text_primary'])
         self.gantt_ax.xaxis.label.set_color(COLORS['text_primary'])
         self.gantt_ax.yaxis.label.set_color(COLORS['text_primary'])
         self.gantt_ax.title.set_color(COLORS['text_primary'])
         self.gantt_canvas = FigureCanvasTkAgg(self.gantt_fig, gantt_frame)
+        # Zoom and pan; the chart adds detail as the visible range narrows
+        self.gantt_toolbar = NavigationToolbar2Tk(self.gantt_canvas, gantt_frame, pack_toolbar=False)
+        self.gantt_toolbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.gantt_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         # Energy Consumption Tab
         energy_frame = ttk.Frame(self.notebook)
         self.notebook.add(energy_frame, text="⚡ Energy Consumption")
 
-        self.energy_fig, self.energy_ax = plt.subplots(figsize=(10, 5), facecolor=COLORS['bg_secondary'])
+        self.energy_fig = Figure(figsize=(10, 5), facecolor=COLORS['bg_secondary'])
+        self.energy_ax = self.energy_fig.add_subplot()
         self.energy_ax.set_facecolor(COLORS['bg_secondary'])
         self.energy_ax.tick_params(colors=COLORS['text_primary'])
         self.energy_ax.xaxis.label.set_color(COLORS['text_primary'])
@@ -265,44 +359,81 @@ class EnergyEfficientSchedulerGUI:
         self.energy_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         # System Monitor Tab
-        monitor_frame = ttk.Frame(self.notebook)
-        self.notebook.add(monitor_frame, text="🖥️ System Monitor")
+        self.monitor_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.monitor_frame, text="🖥️ System Monitor")
 
         # CPU Utilization
-        self.cpu_fig, self.cpu_ax = plt.subplots(figsize=(10, 2), facecolor=COLORS['bg_secondary'])
+        self.cpu_fig = Figure(figsize=(10, 2), facecolor=COLORS['bg_secondary'])
+        self.cpu_ax = self.cpu_fig.add_subplot()
         self.cpu_ax.set_facecolor(COLORS['bg_secondary'])
         self.cpu_ax.tick_params(colors=COLORS['text_primary'])
         self.cpu_ax.xaxis.label.set_color(COLORS['text_primary'])
         self.cpu_ax.yaxis.label.set_color(COLORS['text_primary'])
         self.cpu_ax.title.set_color(COLORS['text_primary'])
-        self.cpu_canvas = FigureCanvasTkAgg(self.cpu_fig, monitor_frame)
+        self.cpu_canvas = FigureCanvasTkAgg(self.cpu_fig, self.monitor_frame)
         self.cpu_canvas.get_tk_widget().pack(fill=tk.X, pady=10, padx=10)
 
         # Temperature Gauge
-        self.temp_fig, self.temp_ax = plt.subplots(figsize=(10, 2), facecolor=COLORS['bg_secondary'])
+        self.temp_fig = Figure(figsize=(10, 2), facecolor=COLORS['bg_secondary'])
+        self.temp_ax = self.temp_fig.add_subplot()
         self.temp_ax.set_facecolor(COLORS['bg_secondary'])
         self.temp_ax.tick_params(colors=COLORS['text_primary'])
         self.temp_ax.xaxis.label.set_color(COLORS['text_primary'])
         self.temp_ax.yaxis.label.set_color(COLORS['text_primary'])
         self.temp_ax.title.set_color(COLORS['text_primary'])
-        self.temp_canvas = FigureCanvasTkAgg(self.temp_fig, monitor_frame)
+        self.temp_canvas = FigureCanvasTkAgg(self.temp_fig, self.monitor_frame)
         self.temp_canvas.get_tk_widget().pack(fill=tk.X, pady=10, padx=10)
 
+        self.create_monitor_gauges()
+        # Hidden gauges are not rendered, so catch up as soon as the tab is shown
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self.update_monitor_tabs())
+
         # Task History Tab
         history_frame = ttk.Frame(self.notebook)
         self.notebook.add(history_frame, text="📜 Task History")
 
+        retention_bar = ttk.Frame(history_frame)
+        retention_bar.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(retention_bar, text="Keep last (tasks):").pack(side=tk.LEFT)
+        self.retention_box = ttk.Combobox(retention_bar, width=12,
+                                          values=[f"{choice:,}" for choice in RETENTION_CHOICES])
+        self.retention_box.set(f"{DEFAULT_CAPACITY:,}")
+        self.retention_box.pack(side=tk.LEFT, padx=10)
+        self.retention_box.bind("<<ComboboxSelected>>", self.set_history_retention)
+        self.retention_box.bind("<Return>", self.set_history_retention)
+
+        self.record_runs_var = tk.BooleanVar(value=self.run_store is not None)
+        ttk.Checkbutton(retention_bar, text="Record runs", variable=self.record_runs_var).pack(side=tk.LEFT, padx=10)
+        ttk.Button(retention_bar, text="Session History",
+                   command=self.show_session_history).pack(side=tk.RIGHT)
+
+        # Runs stored in the database, one page at a time
+        runs_frame = ttk.LabelFrame(history_frame, text="Saved Runs", padding=5)
+        runs_frame.pack(fill=tk.X, padx=5, pady=5)
+        run_columns = ("Run", "Time", "Policy", "Tasks", "Energy", "Makespan", "Cores", "Profile")
+        self.runs_tree = ttk.Treeview(runs_frame, columns=run_columns, show="headings", height=5)
+        for col in run_columns:
+            self.runs_tree.heading(col, text=col)
+            self.runs_tree.column(col, width=140 if col in ("Time", "Policy") else 80, anchor=tk.CENTER)
+        self.runs_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.runs_tree.bind("<Double-1>", lambda event: self.show_saved_run())
+
+        runs_nav = ttk.Frame(runs_frame)
+        runs_nav.pack(side=tk.RIGHT, fill=tk.Y, padx=5)
+        ttk.Button(runs_nav, text="Show Run", command=self.show_saved_run).pack(fill=tk.X, pady=2)
+        ttk.Button(runs_nav, text="◀ Newer", command=lambda: self.page_runs(-1)).pack(fill=tk.X, pady=2)
+        ttk.Button(runs_nav, text="Older ▶", command=lambda: self.page_runs(1)).pack(fill=tk.X, pady=2)
+
+        # Metrics of whatever the table below shows
+        self.history_metrics_label = ttk.Label(history_frame, text="", justify=tk.LEFT)
+        self.history_metrics_label.pack(fill=tk.X, padx=10, pady=(0, 5))
+
+        # Only the visible rows exist in the Treeview; scrolling pages through the ring buffer
         columns = ("Task ID", "Arrival", "Burst", "Power", "Start", "End", "Energy")
-        self.history_tree = ttk.Treeview(history_frame, columns=columns, show="headings")
-
-        for col in columns:
-            self.history_tree.heading(col, text=col)
-            self.history_tree.column(col, width=100, anchor=tk.CENTER)
-
-        scrollbar = ttk.Scrollbar(history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
-        self.history_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.history_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.history_view = VirtualTreeview(history_frame, columns, self.task_history)
+        self.history_tree = self.history_view.tree
+        self.history_view.pack()
+        self.update_runs_tree()
 
     def create_status_bar(self):
         self.status_bar = ttk.Frame(self.root, style='Status.TFrame', height=40)
@@ -336,8 +467,55 @@ class EnergyEfficientSchedulerGUI:
         self.cores_label = ttk.Label(self.status_bar, text="🔧 Active Cores: 4/8", style='Status.TLabel')
         self.cores_label.pack(side=tk.LEFT, padx=15)
 
+    def create_monitor_gauges(self):
+        """Create the gauge artists once; updates only move and blit the animated ones"""
+        self.cpu_bar = self.cpu_ax.barh(['CPU Usage'], [0], height=0.5, color=COLORS['accent_success'],
+                                        edgecolor=COLORS['text_primary'], linewidth=2, animated=True)[0]
+        self.cpu_text = self.cpu_ax.text(2, 0, '', va='center', color=COLORS['text_primary'],
+                                         fontsize=11, fontweight='bold', animated=True)
+        self.cpu_ax.set_xlim(0, 100)
+        self.cpu_ax.set_title('CPU Utilization', color=COLORS['text_primary'], fontsize=12, fontweight='bold')
+        self.cpu_ax.grid(True, alpha=0.3, color=COLORS['text_secondary'])
+
+        self.temp_bar = self.temp_ax.barh(['Temperature'], [0], height=0.5, color=COLORS['accent_secondary'],
+                                          edgecolor=COLORS['text_primary'], linewidth=2, animated=True)[0]
+        self.temp_line = self.temp_ax.axvline(int(self.temp_slider.get()), color=COLORS['accent_danger'],
+                                              linestyle='--', linewidth=2, label='Max Temp', animated=True)
+        self.temp_text = self.temp_ax.text(2, 0, '', va='center', color=COLORS['text_primary'],
+                                           fontsize=11, fontweight='bold', animated=True)
+        self.temp_ax.set_xlim(0, 100)
+        self.temp_ax.set_title('CPU Temperature', color=COLORS['text_primary'], fontsize=12, fontweight='bold')
+        self.temp_ax.grid(True, alpha=0.3, color=COLORS['text_secondary'])
+
+        self.monitor_gauges = {
+            self.cpu_canvas: (self.cpu_ax, (self.cpu_bar, self.cpu_text)),
+            self.temp_canvas: (self.temp_ax, (self.temp_bar, self.temp_line, self.temp_text)),
+        }
+        self.monitor_backgrounds = {}
+        for canvas in self.monitor_gauges:
+            canvas.mpl_connect('draw_event', lambda event, canvas=canvas: self.capture_gauge(canvas))
+
+    def capture_gauge(self, canvas):
+        """After a full draw (first show, resize), save the static background for blitting"""
+        ax, artists = self.monitor_gauges[canvas]
+        self.monitor_backgrounds[canvas] = canvas.copy_from_bbox(canvas.figure.bbox)
+        for artist in artists:
+            ax.draw_artist(artist)
+
+    def blit_gauge(self, canvas):
+        background = self.monitor_backgrounds.get(canvas)
+        if background is None:
+            # Nothing drawn yet; the full draw captures the background
+            canvas.draw()
+            return
+        ax, artists = self.monitor_gauges[canvas]
+        canvas.restore_region(background)
+        for artist in artists:
+            ax.draw_artist(artist)
+        canvas.blit(canvas.figure.bbox)
+
     def start_monitoring(self):
-        """Start the system monitoring thread"""
+        """Start the system monitoring thread and the Tk-side queue drain"""
         if self.monitor_thread and self.monitor_thread.is_alive():
             return
 
@@ -345,73 +523,73 @@ class EnergyEfficientSchedulerGUI:
         self.monitor_thread = threading.Thread(target=self.system_monitor)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
+        self.monitor_after = self.root.after(MONITOR_POLL_MS, self.poll_monitor)
 
     def system_monitor(self):
-        """Background thread to update system monitoring"""
+        """Background thread producing one monitor sample per interval; it never calls Tk"""
         while not self.shutdown_event.is_set():
+            trace = self.thermal_trace
+            if trace is None:
+                sample = {'temperature': self.thermal_model.ambient, 'cpu_utilization': 0}
+            else:
+                elapsed = time.monotonic() - self.thermal_started
+                sample = trace.sample(elapsed * max(trace.makespan, 1) / THERMAL_REPLAY_SECONDS)
             try:
-                if not self.root.winfo_exists():
-                    break
-
-                # Update system stats
-                self.update_system_stats()
-
-                # Update UI
-                self.update_status_bar()
-                self.update_monitor_tabs()
-
-                time.sleep(1)
-            except tk.TclError:
+                self.monitor_queue.put_nowait(sample)
+            except queue.Full:
+                # The Tk thread is busy (e.g. a long scheduling run); drop the sample
+                pass
+            self.shutdown_event.wait(MONITOR_INTERVAL)
+
+    def poll_monitor(self):
+        """Apply queued samples on the Tk thread and refresh what is on screen"""
+        updated = False
+        while True:
+            try:
+                sample = self.monitor_queue.get_nowait()
+            except queue.Empty:
                 break
-            except Exception as e:
-                print(f"Monitoring error: {e}")
-                time.sleep(1)
-
-    def update_system_stats(self):
-        """Update the system statistics"""
-        # Simulate changing system stats
-        temp_change = random.uniform(-1, 1)
-        new_temp = self.system_stats['temperature'] + temp_change
-        self.system_stats['temperature'] = min(
-            max(40, new_temp),
-            int(self.temp_slider.get())
-        )
-
-        self.system_stats['active_cores'] = int(self.core_slider.get())
+            self.update_system_stats(sample)
+            updated = True
 
-        if self.scheduled_tasks:
-            utilization = min(100, random.randint(70, 95))
-        else:
-            utilization = random.randint(5, 20)
+        if updated:
+            self.update_status_bar()
+            self.update_monitor_tabs()
+        self.monitor_after = self.root.after(MONITOR_POLL_MS, self.poll_monitor)
 
-        self.system_stats['cpu_utilization'] = utilization
+    def update_system_stats(self, sample):
+        """Update the system statistics from a monitor sample"""
+        self.system_stats['temperature'] = sample['temperature']
+        self.system_stats['active_cores'] = int(self.core_slider.get())
+        self.system_stats['cpu_utilization'] = sample['cpu_utilization']
 
     def update_status_bar(self):
         """Update the status bar with current system stats"""
-        self.energy_label.config(text=f"⚡ Total Energy: {self.system_stats['total_energy']} units")
+        self.energy_label.config(text=f"⚡ Total Energy: {self.system_stats['total_energy']:g} units")
         self.power_label.config(text=f"🔋 Avg Power: {self.system_stats['avg_power']:.1f} W")
         self.util_label.config(text=f"💻 CPU Util: {self.system_stats['cpu_utilization']}%")
         self.temp_label.config(text=f"🌡️ Temp: {self.system_stats['temperature']:.1f}°C")
         self.cores_label.config(text=f"🔧 Active Cores: {self.system_stats['active_cores']}/8")
 
+    def monitor_visible(self):
+        return (self.notebook.select() == str(self.monitor_frame)
+                and self.root.state() != 'iconic')
+
     def update_monitor_tabs(self):
-        """Update the monitoring tabs"""
+        """Update the monitoring gauges, unless their tab is hidden"""
+        if not self.monitor_visible():
+            return
+
         # Update CPU utilization gauge
-        self.cpu_ax.clear()
-        self.cpu_ax.set_facecolor(COLORS['bg_secondary'])
         util = self.system_stats['cpu_utilization']
         color = COLORS['accent_success'] if util < 70 else (COLORS['accent_warning'] if util < 90 else COLORS['accent_danger'])
-        self.cpu_ax.barh(['CPU Usage'], [util], color=color, height=0.5, edgecolor=COLORS['text_primary'], linewidth=2)
-        self.cpu_ax.set_xlim(0, 100)
-        self.cpu_ax.set_title('CPU Utilization', color=COLORS['text_primary'], fontsize=12, fontweight='bold')
-        self.cpu_ax.tick_params(colors=COLORS['text_primary'])
-        self.cpu_ax.text(util + 2, 0, f'{util}%', va='center', color=COLORS['text_primary'], fontsize=11, fontweight='bold')
-        self.cpu_ax.grid(True, alpha=0.3, color=COLORS['text_secondary'])
-        self.cpu_canvas.draw()
+        self.cpu_bar.set_width(util)
+        self.cpu_bar.set_facecolor(color)
+        self.cpu_text.set_x(util + 2)
+        self.cpu_text.set_text(f'{util}%')
+        self.blit_gauge(self.cpu_canvas)
 
         # Update temperature gauge
-        self.temp_ax.clear()
-        self.temp_ax.set_facecolor(COLORS['bg_secondary'])
         temp = self.system_stats['temperature']
         max_temp = int(self.temp_slider.get())
         if temp > max_temp - 10:
@@ -421,14 +599,12 @@ class EnergyEfficientSchedulerGUI:
         else:
             color = COLORS['accent_secondary']
 
-        self.temp_ax.barh(['Temperature'], [temp], color=color, height=0.5, edgecolor=COLORS['text_primary'], linewidth=2)
-        self.temp_ax.axvline(max_temp, color=COLORS['accent_danger'], linestyle='--', linewidth=2, label='Max Temp')
-        self.temp_ax.set_xlim(0, 100)
-        self.temp_ax.set_title('CPU Temperature', color=COLORS['text_primary'], fontsize=12, fontweight='bold')
-        self.temp_ax.tick_params(colors=COLORS['text_primary'])
-        self.temp_ax.text(temp + 2, 0, f'{temp:.1f}°C', va='center', color=COLORS['text_primary'], fontsize=11, fontweight='bold')
-        self.temp_ax.grid(True, alpha=0.3, color=COLORS['text_secondary'])
-        self.temp_canvas.draw()
+        self.temp_bar.set_width(temp)
+        self.temp_bar.set_facecolor(color)
+        self.temp_line.set_xdata([max_temp, max_temp])
+        self.temp_text.set_x(temp + 2)
+        self.temp_text.set_text(f'{temp:.1f}°C')
+        self.blit_gauge(self.temp_canvas)
 
     def open_task_window(self):
         """Open window for task input"""
@@ -474,7 +650,7 @@ class EnergyEfficientSchedulerGUI:
         scrollbar.pack(side="right", fill="y")
 
         # Create headers with better styling
-        headers = ["Task ID", "Arrival Time", "Burst Time", "Power Consumption", "Priority"]
+        headers = ["Task ID", "Arrival Time", "Burst Time", "Power Consumption", "Priority", "Deadline"]
         for col, header in enumerate(headers):
             label = ttk.Label(scrollable_frame, text=header, style='Card.TLabel',
                             font=('Segoe UI', 10, 'bold'))
@@ -485,9 +661,13 @@ class EnergyEfficientSchedulerGUI:
         scrollable_frame.columnconfigure(2, weight=1)
         scrollable_frame.columnconfigure(3, weight=1)
         scrollable_frame.columnconfigure(4, weight=1)
+        scrollable_frame.columnconfigure(5, weight=1)
 
         # Create entry rows
         self.task_entries = []
+        self.task_deadlines = None
+        self.rescheduler = None
+        self.edited_rows = None
         for i in range(num_tasks):
             task_id = ttk.Label(scrollable_frame, text=f"Task {i+1}", style='TLabel')
             task_id.grid(row=i+1, column=0, padx=8, pady=5, sticky=tk.W)
@@ -505,11 +685,19 @@ class EnergyEfficientSchedulerGUI:
             priority_entry.insert(0, "1")  # Default priority
             priority_entry.grid(row=i+1, column=4, padx=8, pady=5, sticky=tk.EW)
 
+            # Left blank, the task has no deadline
+            deadline_entry = ttk.Entry(scrollable_frame, width=12)
+            deadline_entry.grid(row=i+1, column=5, padx=8, pady=5, sticky=tk.EW)
+
+            for entry in (arrival_entry, burst_entry, power_entry, priority_entry, deadline_entry):
+                entry.bind("<KeyRelease>", lambda event, row=i: self.mark_row_edited(row))
+
             self.task_entries.append({
                 'arrival': arrival_entry,
                 'burst': burst_entry,
                 'power': power_entry,
-                'priority': priority_entry
+                'priority': priority_entry,
+                'deadline': deadline_entry
             })
 
         # Add buttons at the bottom
@@ -524,6 +712,11 @@ class EnergyEfficientSchedulerGUI:
                   command=task_window.destroy,
                   style='TButton').pack(side=tk.RIGHT, padx=5)
 
+    def mark_row_edited(self, row):
+        """Remember that a row of the task entry window changed since it was last scheduled"""
+        if self.edited_rows is not None:
+            self.edited_rows.add(row)
+
     def safe_schedule_tasks(self, window):
         """Wrapper for schedule_tasks that handles window destruction"""
         try:
@@ -546,39 +739,24 @@ class EnergyEfficientSchedulerGUI:
             return
 
         # Generate random tasks
-        self.task_entries = []
-        for _ in range(num_tasks):
-            self.task_entries.append({
-                'arrival': random.randint(0, 20),
-                'burst': random.randint(1, 10),
-                'power': random.randint(1, 5),
-                'priority': random.randint(1, 5)
-            })
+        self.task_entries = TaskBatch.random(num_tasks)
+        self.task_deadlines = None
 
         # Schedule with the generated tasks
         self.schedule_tasks(None)
 
     def load_tasks_from_file(self):
-        """Load tasks from a JSON file"""
-        file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        """Load tasks from a JSON, JSON Lines or CSV trace (optionally gzipped) or a binary trace"""
+        file_path = filedialog.askopenfilename(filetypes=TRACE_FILETYPES)
         if not file_path:
             return
 
         try:
-            with open(file_path, 'r') as f:
-                tasks = json.load(f)
+            # Streamed straight into columns, no per-task dicts, deadlines in the same pass
+            self.task_entries, self.task_deadlines = load_batch(file_path, deadlines=True)
 
             self.num_tasks_entry.delete(0, tk.END)
-            self.num_tasks_entry.insert(0, str(len(tasks)))
-
-            self.task_entries = []
-            for task in tasks:
-                self.task_entries.append({
-                    'arrival': task.get('arrival', 0),
-                    'burst': task.get('burst', 1),
-                    'power': task.get('power', 1),
-                    'priority': task.get('priority', 1)
-                })
+            self.num_tasks_entry.insert(0, str(len(self.task_entries)))
 
             # Schedule with the loaded tasks
             self.schedule_tasks(None)
@@ -587,75 +765,85 @@ class EnergyEfficientSchedulerGUI:
             messagebox.showerror("Error", f"Failed to load tasks: {str(e)}")
 
     def save_tasks_to_file(self):
-        """Save current tasks to a JSON file"""
-        if not self.task_entries:
+        """Save current tasks to a JSON, JSON Lines, CSV or binary trace"""
+        if not len(self.task_entries):
             messagebox.showerror("Error", "No tasks to save")
             return
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json")]
+            filetypes=TRACE_FILETYPES
         )
         if not file_path:
             return
 
         try:
-            tasks = []
-            for entry in self.task_entries:
-                if isinstance(entry['arrival'], tk.Entry):
-                    # From manual input window
+            deadlines = None
+            if is_batch(self.task_entries):
+                # From random generation or load
+                tasks = self.task_entries
+                deadlines = self.task_deadlines
+            else:
+                # From manual input window
+                tasks = []
+                for entry in self.task_entries:
                     tasks.append({
                         'arrival': int(entry['arrival'].get()),
                         'burst': int(entry['burst'].get()),
                         'power': int(entry['power'].get()),
-                        'priority': int(entry['priority'].get()) if entry['priority'].get() else 1
-                    })
-                else:
-                    # From random generation or load
-                    tasks.append({
-                        'arrival': entry['arrival'],
-                        'burst': entry['burst'],
-                        'power': entry['power'],
-                        'priority': entry.get('priority', 1)
+                        'priority': int(entry['priority'].get()) if entry['priority'].get() else 1,
+                        'deadline': int(entry['deadline'].get()) if entry['deadline'].get().strip() else None
                     })
 
-            with open(file_path, 'w') as f:
-                json.dump(tasks, f, indent=2)
+            write_tasks(file_path, tasks, deadlines)
 
             messagebox.showinfo("Success", "Tasks saved successfully")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save tasks: {str(e)}")
 
-    def schedule_tasks(self, window=None):
-        """Schedule tasks using the selected policy"""
+    def collect_tasks(self, window=None):
+        """Tasks from the entry window, the cache or the generated/loaded batch, or None"""
         tasks = []
 
         if window:
+            rows = range(len(self.task_entries))
+            if self.edited_rows is not None and len(self.cached_tasks) == len(self.task_entries):
+                # Only rows typed into since the last schedule need parsing again
+                tasks = list(self.cached_tasks)
+                rows = sorted(self.edited_rows)
+            else:
+                tasks = [None] * len(self.task_entries)
             try:
                 # Get values from window if it exists
-                for i, entry in enumerate(self.task_entries):
+                for i in rows:
+                    entry = self.task_entries[i]
                     arrival = int(entry['arrival'].get().strip())
                     burst = int(entry['burst'].get().strip())
                     power = int(entry['power'].get().strip())
                     priority = int(entry['priority'].get().strip()) if entry['priority'].get().strip() else 1
+                    deadline = int(entry['deadline'].get().strip()) if entry['deadline'].get().strip() else None
 
-                    tasks.append({
+                    tasks[i] = {
                         'id': i + 1,
                         'arrival': arrival,
                         'burst': burst,
                         'power': power,
-                        'priority': priority
-                    })
+                        'priority': priority,
+                        'deadline': deadline
+                    }
             except tk.TclError:
                 # Window was destroyed, use cached values if available
                 if hasattr(self, 'cached_tasks') and self.cached_tasks:
                     tasks = self.cached_tasks
                 else:
                     messagebox.showerror("Error", "No valid task data available")
-                    return
+                    return None
             except ValueError:
                 messagebox.showerror("Error", "Please enter valid numeric values for all fields.")
-                return
+                return None
+        elif is_batch(self.task_entries):
+            # Generated or loaded tasks are already columnar
+            tasks = self.task_entries
         else:
             # Create tasks from cached or generated data
             for i, entry in enumerate(self.task_entries):
@@ -664,78 +852,234 @@ class EnergyEfficientSchedulerGUI:
                     'arrival': entry['arrival'],
                     'burst': entry['burst'],
                     'power': entry['power'],
-                    'priority': entry.get('priority', 1)
+                    'priority': entry.get('priority', 1),
+                    'deadline': entry.get('deadline')
                 })
 
-        if not tasks:
+        if not len(tasks):
             messagebox.showerror("Error", "No tasks to schedule")
-            return
+            return None
 
-        # Cache the tasks
-        self.cached_tasks = tasks.copy()
+        # Cache the tasks (a TaskBatch is never modified, so it is shared rather than copied)
+        self.cached_tasks = tasks if is_batch(tasks) else tasks.copy()
+        return tasks
 
-        # Sort tasks based on selected policy
+    def schedule_options(self):
+        """Keyword arguments for engine.simulate from the control panel, or None"""
+        try:
+            quantum = float(self.quantum_entry.get().strip())
+            switch_cost = float(self.switch_cost_entry.get().strip() or 0)
+            if quantum <= 0 or switch_cost < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Time quantum must be positive and context switch cost non-negative.")
+            return None
+
+        return {
+            'quantum': quantum,
+            'switch_cost': switch_cost,
+            'cores': int(self.core_slider.get()),
+            'partitioned': self.partitioned_var.get(),
+            'profile': self.power_profile.get()
+        }
+
+    def schedule_tasks(self, window=None):
+        """Schedule tasks using the selected policy"""
+        # Options first: collect_tasks replaces cached_tasks, which has to stay
+        # in step with edited_rows and the rescheduler if nothing gets scheduled
+        options = self.schedule_options()
+        if options is None:
+            return
+        edited, previous = self.edited_rows, self.cached_tasks
+        with INSTRUMENTS.phase('parse_entries'):
+            tasks = self.collect_tasks(window)
+        if tasks is None:
+            return
+
+        # Run the headless engine with the selected policy
         policy = self.policy_var.get()
-        if policy == "FCFS":
-            tasks.sort(key=lambda x: x['arrival'])
-        elif policy == "Shortest Job First":
-            tasks.sort(key=lambda x: (x['arrival'], x['burst']))
-        elif policy == "Priority-Based":
-            tasks.sort(key=lambda x: (x['priority'], x['arrival']))
-        elif policy == "Energy-Aware":
-            tasks.sort(key=lambda x: (x['power'], x['arrival']))
-
-        # Calculate scheduling
-        completion_time = 0
-        total_energy = 0
-        self.scheduled_tasks = []
-
-        for task in tasks:
-            start_time = max(completion_time, task['arrival'])
-            completion_time = start_time + task['burst']
-            energy_used = task['burst'] * task['power']
-            total_energy += energy_used
-
-            scheduled_task = {
-                'id': task['id'],
-                'arrival': task['arrival'],
-                'burst': task['burst'],
-                'power': task['power'],
-                'priority': task['priority'],
-                'start': start_time,
-                'end': completion_time,
-                'energy': energy_used
-            }
-
-            self.scheduled_tasks.append(scheduled_task)
-            self.task_history.append(scheduled_task)
+        cores = options['cores']
+        cached = False
+        rescheduled = 0
+        missed = None
+        with INSTRUMENTS.phase('schedule'):
+            if policy == MIN_ENERGY_POLICY:
+                # Speeds come from the deadlines, on one core and regardless of the power profile
+                self.rescheduler = self.edited_rows = None
+                try:
+                    run = schedule_min_energy(tasks, self.task_deadlines if is_batch(tasks) else None)
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                schedule, missed = run.schedule, run.missed
+                options = dict(options, cores=1, partitioned=False, profile=None)
+                cores = 1
+            elif window:
+                if (edited is not None and self.rescheduler is not None
+                        and self.rescheduler.matches(policy, **options)):
+                    # Recompute only from the earliest edited task on
+                    for row in sorted(edited):
+                        if tasks[row] != previous[row]:
+                            self.rescheduler.replace(tasks[row]['id'], tasks[row])
+                            rescheduled = max(rescheduled, self.rescheduler.recomputed)
+                else:
+                    self.rescheduler = IncrementalSchedule(tasks, policy, **options)
+                self.edited_rows = set()
+                schedule = self.rescheduler.schedule
+            else:
+                self.rescheduler = self.edited_rows = None
+                hits = self.schedule_cache.hits
+                schedule = self.schedule_cache.simulate(tasks, policy, **options)
+                cached = self.schedule_cache.hits > hits
+
+        # Run the thermal model over the schedule; if a core reaches the
+        # temperature limit, hot tasks are clocked down and scheduled again
+        throttled = 0
+        with INSTRUMENTS.phase('thermal'):
+            max_temp = float(self.temp_slider.get())
+            trace = self.thermal_model.run(schedule)
+            if trace.peak >= max_temp and missed is None:
+                run = simulate_throttled(tasks, policy, max_temp, self.thermal_model, **options)
+                schedule, trace = run.schedule, run.trace
+                throttled = int((run.levels > 0).sum())
+        self.thermal_started = time.monotonic()
+        self.thermal_trace = trace
+        self.schedule = schedule
+        total_energy = schedule.total_energy
+        completion_time = schedule.makespan
+
+        self.task_history.append_schedule(schedule)
+        metrics = ScheduleMetrics.from_schedule(schedule)
+        self.session_metrics.merge(metrics)
+        if self.run_store is not None and self.record_runs_var.get():
+            try:
+                self.run_store.save_run(schedule, tasks, **options)
+                self.runs_page = 0
+                self.update_runs_tree()
+            except sqlite3.Error as e:
+                messagebox.showerror("Error", f"Failed to record run: {str(e)}")
 
         # Update system stats
         self.system_stats['total_energy'] = total_energy
-        if completion_time > 0:
-            self.system_stats['avg_power'] = total_energy / completion_time
-        else:
-            self.system_stats['avg_power'] = 0
+        self.system_stats['avg_power'] = schedule.avg_power
 
         # Update visualizations
-        self.update_gantt_chart()
-        self.update_energy_chart()
-        self.update_history_tree()
+        with INSTRUMENTS.phase('update_gantt_chart'):
+            self.update_gantt_chart()
+        with INSTRUMENTS.phase('update_energy_chart'):
+            self.update_energy_chart()
+        with INSTRUMENTS.phase('update_history_tree'):
+            self.update_history_tree()
 
         # Show summary
-        summary = f"Scheduled {len(tasks)} tasks using {policy} policy\n"
-        summary += f"Total Energy Consumed: {total_energy} units\n"
+        if missed is None:
+            summary = f"Scheduled {len(tasks)} tasks using {policy} policy ({self.power_profile.get()} profile)\n"
+        else:
+            summary = f"Scheduled {len(tasks)} tasks using {policy} speed scaling\n"
+        summary += f"Total Energy Consumed: {total_energy:g} units\n"
         summary += f"Average Power: {self.system_stats['avg_power']:.1f} W\n"
-        summary += f"Makespan: {completion_time} time units"
+        summary += f"Makespan: {completion_time} time units on {cores} core(s)\n"
+        summary += "\n".join(format_metrics(metrics))
+        summary += f"\nPeak Temperature: {trace.peak:.1f}°C"
+        if throttled:
+            summary += f" (throttled {throttled} of {len(tasks)} tasks at {max_temp:.0f}°C)"
+        if missed:
+            shown = ", ".join(str(task_id) for task_id in missed[:MISSED_SHOWN])
+            more = f" and {len(missed) - MISSED_SHOWN} more" if len(missed) > MISSED_SHOWN else ""
+            summary += f"\n{len(missed)} task(s) would miss their deadline even at full speed: {shown}{more}"
+        elif missed is not None:
+            summary += "\nEvery task meets its deadline"
+        if cached:
+            summary += "\n(result reused from an earlier identical run)"
+        elif rescheduled:
+            summary += f"\n(edits rescheduled {rescheduled} of {len(tasks)} tasks)"
 
         messagebox.showinfo("Scheduling Complete", summary)
 
+    def compare_all_policies(self):
+        """Run every policy on the current tasks in parallel and show them side by side"""
+        tasks = self.collect_tasks()
+        if tasks is None:
+            return
+        options = self.schedule_options()
+        if options is None:
+            return
+
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        try:
+            results = compare_policies(tasks, **options)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Comparison failed: {str(e)}")
+            return
+        finally:
+            self.root.config(cursor="")
+
+        self.show_comparison(results, len(tasks), options)
+
+    def show_comparison(self, results, num_tasks, options):
+        """Window with the comparison table and overlaid energy/timing charts"""
+        window = tk.Toplevel(self.root)
+        window.title("Policy Comparison")
+        window.configure(bg=COLORS['bg_primary'])
+        window.geometry("1000x700")
+
+        ttk.Label(window, text=f"{num_tasks} tasks, {options['profile']} profile, "
+                               f"{options['cores']} core(s)",
+                  style='Card.TLabel').pack(anchor=tk.W, padx=15, pady=(15, 5))
+
+        table = ttk.Treeview(window, columns=COMPARE_HEADINGS, show="headings", height=len(results))
+        for col in COMPARE_HEADINGS:
+            table.heading(col, text=col)
+            table.column(col, width=150 if col == 'Policy' else 110, anchor=tk.CENTER)
+        for result in results:
+            table.insert("", tk.END, values=(result['policy'],) + tuple(
+                f"{result[field]:.6g}" for field in COMPARE_FIELDS[1:]))
+        table.pack(fill=tk.X, padx=15, pady=5)
+
+        fig = Figure(figsize=(10, 4.5), facecolor=COLORS['bg_secondary'])
+        curve_ax, time_ax = fig.subplots(1, 2)
+        colors = ['#6c5ce7', '#00d2d3', '#00b894', '#fdcb6e', '#e17055', '#a29bfe', '#fd79a8']
+        for ax in (curve_ax, time_ax):
+            ax.set_facecolor(COLORS['bg_secondary'])
+            ax.tick_params(colors=COLORS['text_primary'])
+            ax.grid(True, alpha=0.3, color=COLORS['text_secondary'], linestyle='--')
+            ax.set_axisbelow(True)
+
+        # Cumulative energy of every policy on one set of axes
+        for i, result in enumerate(results):
+            times, energy = result['curve']
+            curve_ax.plot(times, energy, color=colors[i % len(colors)], linewidth=2,
+                          label=result['policy'], drawstyle='steps-post')
+        curve_ax.set_xlabel("Time (units)", color=COLORS['text_primary'], fontsize=11, fontweight='bold')
+        curve_ax.set_ylabel("Cumulative Energy (units)", color=COLORS['text_primary'], fontsize=11, fontweight='bold')
+        curve_ax.set_title("Energy over Time", color=COLORS['text_primary'], fontsize=13, fontweight='bold')
+        curve_ax.legend(facecolor=COLORS['bg_tertiary'], edgecolor=COLORS['border'],
+                        labelcolor=COLORS['text_primary'], fontsize=8)
+
+        # Waiting time drawn over turnaround for each policy
+        names = [result['policy'] for result in results]
+        time_ax.barh(names, [result['avg_turnaround'] for result in results],
+                     color=COLORS['accent_primary'], alpha=0.85, label="Avg Turnaround")
+        time_ax.barh(names, [result['avg_waiting'] for result in results], height=0.4,
+                     color=COLORS['accent_warning'], alpha=0.9, label="Avg Waiting")
+        time_ax.invert_yaxis()
+        time_ax.set_xlabel("Time (units)", color=COLORS['text_primary'], fontsize=11, fontweight='bold')
+        time_ax.set_title("Waiting and Turnaround", color=COLORS['text_primary'], fontsize=13, fontweight='bold')
+        time_ax.legend(facecolor=COLORS['bg_tertiary'], edgecolor=COLORS['border'],
+                       labelcolor=COLORS['text_primary'], fontsize=8)
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=15, pady=(5, 15))
+        canvas.draw()
+
     def update_gantt_chart(self):
         """Update the Gantt chart visualization"""
         self.gantt_ax.clear()
         self.gantt_ax.set_facecolor(COLORS['bg_secondary'])
 
-        if not self.scheduled_tasks:
+        if self.schedule is None or not len(self.schedule):
             self.gantt_ax.text(0.5, 0.5, 'No tasks scheduled yet',
                              ha='center', va='center', transform=self.gantt_ax.transAxes,
                              color=COLORS['text_secondary'], fontsize=14)
@@ -746,27 +1090,18 @@ class EnergyEfficientSchedulerGUI:
         colors = ['#6c5ce7', '#00d2d3', '#00b894', '#fdcb6e', '#e17055', '#a29bfe', '#fd79a8', '#fdcb6e',
                  '#55efc4', '#74b9ff', '#0984e3', '#6c5ce7', '#a29bfe', '#fd79a8', '#e84393']
 
-        for i, task in enumerate(self.scheduled_tasks):
-            color = colors[i % len(colors)]
-            self.gantt_ax.barh(
-                y=f"Task {task['id']}",
-                width=task['end'] - task['start'],
-                left=task['start'],
-                height=0.6,
-                color=color,
-                edgecolor=COLORS['text_primary'],
-                linewidth=1.5,
-                label=f"Task {task['id']}",
-                alpha=0.85
-            )
-            # Add task ID label on the bar
-            mid_point = task['start'] + (task['end'] - task['start']) / 2
-            self.gantt_ax.text(mid_point, i, f"T{task['id']}",
-                             ha='center', va='center', color=COLORS['text_primary'],
-                             fontweight='bold', fontsize=9)
+        # One lane per core, drawn by a single collection that re-aggregates
+        # the slices whenever the view is zoomed or panned
+        self.gantt_view = GanttView(self.gantt_ax, self.schedule, colors, COLORS['accent_secondary'],
+                                    COLORS['text_primary'], COLORS['text_primary'])
+
+        num_cores = self.schedule.num_cores
+        self.gantt_ax.set_yticks(range(num_cores))
+        self.gantt_ax.set_yticklabels([f"Core {core + 1}" for core in range(num_cores)])
+        self.gantt_ax.set_ylim(num_cores - 0.5, -0.5)
 
         self.gantt_ax.set_xlabel("Time (units)", color=COLORS['text_primary'], fontsize=11, fontweight='bold')
-        self.gantt_ax.set_ylabel("Tasks", color=COLORS['text_primary'], fontsize=11, fontweight='bold')
+        self.gantt_ax.set_ylabel("Cores", color=COLORS['text_primary'], fontsize=11, fontweight='bold')
         self.gantt_ax.set_title(f"Gantt Chart - {self.policy_var.get()} Scheduling",
                                color=COLORS['text_primary'], fontsize=13, fontweight='bold', pad=15)
         self.gantt_ax.tick_params(colors=COLORS['text_primary'])
@@ -774,8 +1109,9 @@ class EnergyEfficientSchedulerGUI:
         self.gantt_ax.set_axisbelow(True)
 
         # Add legend if not too many tasks
-        if len(self.scheduled_tasks) <= 20:
-            legend = self.gantt_ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left',
+        handles = self.gantt_view.legend_handles()
+        if handles:
+            legend = self.gantt_ax.legend(handles=handles, bbox_to_anchor=(1.05, 1), loc='upper left',
                                         facecolor=COLORS['bg_tertiary'], edgecolor=COLORS['border'],
                                         labelcolor=COLORS['text_primary'], fontsize=9)
 
@@ -786,18 +1122,33 @@ class EnergyEfficientSchedulerGUI:
         self.energy_ax.clear()
         self.energy_ax.set_facecolor(COLORS['bg_secondary'])
 
-        if not self.scheduled_tasks:
+        if self.schedule is None or not len(self.schedule):
             self.energy_ax.text(0.5, 0.5, 'No tasks scheduled yet',
                               ha='center', va='center', transform=self.energy_ax.transAxes,
                               color=COLORS['text_secondary'], fontsize=14)
             self.energy_canvas.draw()
             return
 
-        task_ids = [f"Task {t['id']}" for t in self.scheduled_tasks]
-        energy_values = [t['energy'] for t in self.scheduled_tasks]
+        # Read from the schedule's columns rather than a dict per task
+        columns = schedule_columns(self.schedule)
+        ids, energies = columns['id'], columns['energy'].astype(np.float64)
+        title = "Energy Consumption per Task"
+        other = None
+        if len(energies) > ENERGY_BAR_LIMIT:
+            # Past the limit only the most energy-hungry tasks get a bar, so
+            # a million-task trace draws as fast as a small one
+            top = np.argpartition(energies, -ENERGY_BAR_LIMIT)[-ENERGY_BAR_LIMIT:]
+            top = top[np.argsort(energies[top], kind='stable')[::-1]]
+            rest = np.ones(len(energies), bool)
+            rest[top] = False
+            other = (f"Others (mean of {len(energies) - ENERGY_BAR_LIMIT:,})", float(energies[rest].mean()))
+            ids, energies = ids[top], energies[top]
+            title = f"Energy Consumption - top {ENERGY_BAR_LIMIT} of {len(rest):,} tasks"
+        task_ids = [f"Task {task_id}" for task_id in ids.tolist()]
+        energy_values = energies.tolist()
 
         # Use gradient colors based on energy consumption
-        max_energy = max(energy_values) if energy_values else 1
+        max_energy = max(energy_values) or 1
         colors_list = []
         for energy in energy_values:
             ratio = energy / max_energy
@@ -807,6 +1158,10 @@ class EnergyEfficientSchedulerGUI:
                 colors_list.append(COLORS['accent_warning'])
             else:
                 colors_list.append(COLORS['accent_success'])
+        if other is not None:
+            task_ids.append(other[0])
+            energy_values.append(other[1])
+            colors_list.append(COLORS['text_secondary'])
 
         bars = self.energy_ax.barh(task_ids, energy_values, color=colors_list,
                                   edgecolor=COLORS['text_primary'], linewidth=1.5, alpha=0.85)
@@ -817,7 +1172,7 @@ class EnergyEfficientSchedulerGUI:
                                  fontsize=11, fontweight='bold')
         self.energy_ax.set_ylabel("Tasks", color=COLORS['text_primary'],
                                  fontsize=11, fontweight='bold')
-        self.energy_ax.set_title("Energy Consumption per Task", color=COLORS['text_primary'],
+        self.energy_ax.set_title(title, color=COLORS['text_primary'],
                                fontsize=13, fontweight='bold', pad=15)
         self.energy_ax.tick_params(colors=COLORS['text_primary'])
         self.energy_ax.grid(True, axis='x', alpha=0.3, color=COLORS['text_secondary'], linestyle='--')
@@ -826,29 +1181,81 @@ class EnergyEfficientSchedulerGUI:
         self.energy_canvas.draw()
 
     def update_history_tree(self):
-        """Update the task history treeview"""
-        # Clear existing items
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-
-        # Add new items
-        for task in reversed(self.task_history):
-            self.history_tree.insert("", 0, values=(
-                task['id'],
-                task['arrival'],
-                task['burst'],
-                task['power'],
-                task['start'],
-                task['end'],
-                task['energy']
+        """Update the task history view after rows were added or removed"""
+        if self.history_view.source is self.task_history:
+            self.history_view.refresh()
+            runs = self.session_metrics.runs
+            self.show_history_metrics(f"Session ({runs} run{'' if runs == 1 else 's'})", self.session_metrics)
+
+    def show_history_metrics(self, title, metrics):
+        if not metrics.tasks:
+            self.history_metrics_label.config(text="")
+            return
+        self.history_metrics_label.config(text=f"{title}: {metrics.tasks:,} tasks\n" +
+                                          "\n".join(format_metrics(metrics)))
+
+    def update_runs_tree(self):
+        """Show the current page of saved runs"""
+        self.runs_tree.delete(*self.runs_tree.get_children())
+        if self.run_store is None:
+            return
+        for run in self.run_store.list_runs(page=self.runs_page, page_size=RUNS_PAGE_SIZE):
+            self.runs_tree.insert("", tk.END, iid=str(run['id']), values=(
+                run['id'],
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['created'])),
+                run['policy'],
+                run['num_tasks'],
+                f"{run['total_energy']:g}",
+                f"{run['makespan']:g}",
+                run['cores'],
+                run['profile'] or ''
             ))
 
+    def page_runs(self, step):
+        if self.run_store is None:
+            return
+        page = max(0, self.runs_page + step)
+        if step > 0 and not self.run_store.list_runs(page=page, page_size=RUNS_PAGE_SIZE):
+            return
+        self.runs_page = page
+        self.update_runs_tree()
+
+    def show_saved_run(self):
+        """Page the selected run's tasks straight from the database into the history view"""
+        selection = self.runs_tree.selection()
+        if not selection or self.run_store is None:
+            return
+        run_id = int(selection[0])
+        self.history_view.source = RunTasks(self.run_store, run_id)
+        self.history_view.scroll_to(0)
+        self.show_history_metrics(f"Run #{run_id}", self.run_store.run_metrics(run_id))
+
+    def show_session_history(self):
+        self.history_view.source = self.task_history
+        self.history_view.follow = True
+        self.update_history_tree()
+
+    def set_history_retention(self, event=None):
+        """Apply the retention capacity chosen in the History tab"""
+        try:
+            capacity = int(self.retention_box.get().replace(',', '').strip())
+            self.task_history.resize(capacity)
+        except ValueError:
+            messagebox.showerror("Error", "History retention must be a positive whole number of tasks.")
+            self.retention_box.set(f"{self.task_history.capacity:,}")
+            return
+        self.update_history_tree()
+
     def reset_system(self):
         """Reset the system state"""
-        self.scheduled_tasks = []
+        self.schedule = None
         self.task_history.clear()
+        self.session_metrics = ScheduleMetrics()
+        self.thermal_trace = None
         self.task_entries = []
+        self.task_deadlines = None
         self.cached_tasks = []
+        self.rescheduler = self.edited_rows = None
 
         self.system_stats = {
             'total_energy': 0,
@@ -873,11 +1280,21 @@ class EnergyEfficientSchedulerGUI:
     def on_closing(self):
         """Handle window close event"""
         self.shutdown_event.set()
+        if self.monitor_after:
+            self.root.after_cancel(self.monitor_after)
 
         # Wait for monitor thread to finish
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=1)
 
+        if self.run_store is not None:
+            self.run_store.close()
+        if self.instrument_report:
+            try:
+                INSTRUMENTS.write(self.instrument_report)
+            except OSError as e:
+                print(f"Instrumentation report not written: {e}")
+
         # Destroy the root window
         self.root.destroy()
 
@@ -0,0 +1,114 @@
+"""Bounded, columnar history of scheduled tasks.
+
+HistoryBuffer is a ring buffer with one NumPy array per field. Appending a
+schedule copies its columns in a few slice assignments, and once the
+retention capacity is reached the oldest rows are overwritten. Storage
+grows geometrically up to the capacity, so a large retention limit costs
+nothing until it is used.
+"""
+import numpy as np
+
+from taskbatch import schedule_columns
+
+HISTORY_FIELDS = ('id', 'arrival', 'burst', 'power', 'start', 'end', 'energy')
+DEFAULT_CAPACITY = 1000000
+RETENTION_CHOICES = (1000, 100000, 1000000, 10000000)
+_INITIAL_ALLOCATION = 1024
+
+
+class HistoryBuffer:
+    """The newest ``capacity`` scheduled tasks, oldest first"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self._columns = {field: np.empty(0, dtype=np.int64 if field == 'id' else np.float64)
+                         for field in HISTORY_FIELDS}
+        self._head = 0
+        self._size = 0
+        # Total rows ever appended, so views can tell what is new
+        self.appended = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    def _allocated(self):
+        return len(self._columns['id'])
+
+    def _reallocate(self, size):
+        """Move the rows, oldest first, into fresh arrays of ``size`` rows"""
+        order = self._physical(0, self._size)
+        for field, column in self._columns.items():
+            fresh = np.empty(size, dtype=column.dtype)
+            fresh[:self._size] = column[order]
+            self._columns[field] = fresh
+        self._head = 0
+
+    def _physical(self, start, stop):
+        return (self._head + np.arange(start, stop)) % max(self._allocated(), 1)
+
+    def resize(self, capacity):
+        """Change the retention capacity, dropping the oldest rows if it shrinks"""
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        if capacity < self._size:
+            self._head = (self._head + self._size - capacity) % self._allocated()
+            self._size = capacity
+        self.capacity = capacity
+        if self._allocated() > capacity:
+            self._reallocate(capacity)
+
+    def append_schedule(self, schedule):
+        """Append every task of a Schedule or BatchSchedule in completion order"""
+        columns = schedule_columns(schedule)
+        self.extend({field: columns[field] for field in HISTORY_FIELDS})
+
+    def extend(self, columns):
+        """Append rows given as a dict of equal-length arrays keyed by HISTORY_FIELDS"""
+        count = len(columns['id'])
+        self.appended += count
+        if count == 0:
+            return
+        if count >= self.capacity:
+            # Only the newest ``capacity`` rows survive
+            columns = {field: values[count - self.capacity:] for field, values in columns.items()}
+            count = self.capacity
+            self._head = self._size = 0
+
+        ids = np.asarray(columns['id'])
+        if ids.dtype.kind not in 'iu' and self._columns['id'].dtype != object:
+            self._columns['id'] = self._columns['id'].astype(object)
+
+        needed = min(self._size + count, self.capacity)
+        if needed > self._allocated():
+            self._reallocate(min(self.capacity, max(needed, 2 * self._allocated(), _INITIAL_ALLOCATION)))
+
+        allocated = self._allocated()
+        overflow = self._size + count - allocated
+        if overflow > 0:
+            # Full: the oldest rows are overwritten
+            self._head = (self._head + overflow) % allocated
+            self._size -= overflow
+        start = (self._head + self._size) % allocated
+        first = min(count, allocated - start)
+        for field, column in self._columns.items():
+            values = columns[field]
+            column[start:start + first] = values[:first]
+            column[:count - first] = values[first:]
+        self._size += count
+
+    def rows(self, start, stop):
+        """Rows ``start``..``stop`` (0 is the oldest kept) as tuples in HISTORY_FIELDS order"""
+        start, stop = max(start, 0), min(stop, self._size)
+        if stop <= start:
+            return []
+        index = self._physical(start, stop)
+        return list(zip(*(self._columns[field][index].tolist() for field in HISTORY_FIELDS)))
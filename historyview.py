@@ -0,0 +1,91 @@
+"""Virtually scrolled table for row sources far larger than Tk can hold.
+
+The Treeview only ever contains as many items as fit on screen. Scrolling
+moves a window over the source and rewrites those few items, so the cost
+of a refresh does not depend on how many rows the source has.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+def _format(value):
+    return f"{value:g}" if isinstance(value, float) else value
+
+
+class VirtualTreeview:
+    """Treeview plus scrollbar over ``source``, which provides __len__ and rows(start, stop)"""
+
+    def __init__(self, parent, columns, source, row_height=30, heading_height=30):
+        self.source = source
+        self.row_height = row_height
+        self.heading_height = heading_height
+        self.first = 0
+        self.page = 1
+        # Stay on the newest rows while the view is scrolled to the end
+        self.follow = True
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=1)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100, anchor=tk.CENTER)
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, 'units'))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1, 'units'))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1, 'units'))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-1, 'pages'))
+        self.tree.bind("<Next>", lambda event: self.scroll(1, 'pages'))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(len(self.source)))
+
+    def pack(self):
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def on_resize(self, event):
+        page = max(1, (event.height - self.heading_height) // self.row_height)
+        if page != self.page:
+            self.page = page
+            self.refresh()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.source)))
+        else:
+            self.scroll(int(amount), unit)
+
+    def scroll(self, amount, unit):
+        self.scroll_to(self.first + amount * (self.page if unit == 'pages' else 1))
+        return "break"
+
+    def scroll_to(self, first):
+        total = len(self.source)
+        self.first = max(0, min(first, total - self.page))
+        self.follow = self.first + self.page >= total
+        self.render()
+        return "break"
+
+    def refresh(self):
+        """Show new rows; call after the source has changed"""
+        total = len(self.source)
+        if self.follow or self.first + self.page > total:
+            self.first = max(0, total - self.page)
+        self.render()
+
+    def render(self):
+        rows = self.source.rows(self.first, self.first + self.page)
+        items = self.tree.get_children()
+        # Reuse the on-screen items; only add or drop the difference
+        for index in range(len(items), len(rows)):
+            self.tree.insert("", tk.END, iid=f"row{index}")
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        for index, row in enumerate(rows):
+            self.tree.item(f"row{index}", values=tuple(_format(value) for value in row))
+
+        total = len(self.source)
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + len(rows)) / total)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,239 @@
+"""Incremental rescheduling for interactive what-if edits.
+
+An IncrementalSchedule keeps a Schedule up to date while single tasks are
+replaced, inserted or removed. Nothing that happened before the earliest
+arrival an edit touches can change, so that prefix of the schedule is kept
+and only the rest is simulated again:
+
+* FCFS and the non-preemptive ready-queue policies resume the dispatcher
+  mid-run, from the core and ready-queue state at the last dispatch before
+  the affected time.
+* Preemptive policies restart from the last moment before it at which every
+  core was idle, when the dispatcher holds no state at all. Round Robin on
+  several cores keeps per-core state even then and is always recomputed.
+
+Partitioned runs and the Auto power profile choose per-task placement or
+frequencies over the whole task set, so they are recomputed in full too.
+Otherwise an edit costs O(k log n) for the k tasks scheduled after the
+restart point, plus a list insertion.
+"""
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from engine import ARRIVAL, ID, Schedule, is_batch, is_preemptive, normalize_tasks, resume, simulate, stream
+
+
+class IncrementalSchedule:
+    """A Schedule of ``tasks`` that can be edited one task at a time.
+
+    Task ids must be unique, since edits address tasks by id. Ties in arrival
+    time go to the task added first, as input order does for engine.simulate.
+    """
+
+    def __init__(self, tasks, policy="FCFS", quantum=2, switch_cost=0, cores=1, partitioned=False,
+                 profile=None, budget=None):
+        if cores < 1:
+            raise ValueError("At least one core is required")
+        self.policy = policy
+        self.options = {'quantum': quantum, 'switch_cost': switch_cost, 'cores': cores,
+                        'partitioned': partitioned, 'profile': profile, 'budget': budget}
+        self.cores = cores
+        self.preemptive = is_preemptive(policy)
+        # Fixed profiles scale each task on its own, so records are stored scaled
+        self.profile = None if profile == "Balanced" else profile
+        self.full = (partitioned and cores > 1) or profile == "Auto" or (policy == "Round Robin" and cores > 1)
+        # Tasks simulated again by the last change
+        self.recomputed = 0
+
+        self._by_id = {}
+        self._next_position = 0
+        # Records sorted by (arrival, position), with the keys kept alongside for bisection
+        self.records = []
+        self._keys = []
+        self._arrivals = []
+        for record in self._scale(tasks.to_records() if is_batch(tasks) else normalize_tasks(tasks)):
+            self._add(record)
+        self._rebuild()
+
+    def __len__(self):
+        return len(self.records)
+
+    def matches(self, policy, **options):
+        """True if this schedule was built with ``policy`` and these simulate options"""
+        return policy == self.policy and all(self.options[name] == value for name, value in options.items())
+
+    def replace(self, task_id, task):
+        """Give task ``task_id`` new values; returns the updated Schedule"""
+        record = self._record(task, task_id)
+        old, position = self._discard(task_id)
+        self._add(record, position)
+        return self._reschedule(min(old[ARRIVAL], record[ARRIVAL]))
+
+    def insert(self, task, task_id=None):
+        """Add a task (with a new id) after all tasks added before it"""
+        record = self._record(task, task_id)
+        self._add(record)
+        return self._reschedule(record[ARRIVAL])
+
+    def remove(self, task_id):
+        old, _ = self._discard(task_id)
+        return self._reschedule(old[ARRIVAL])
+
+    def _scale(self, records):
+        if self.profile is None or self.profile == "Auto":
+            return records
+        import dvfs
+        return dvfs.apply_profile(records, self.profile)
+
+    def _record(self, task, task_id):
+        record = normalize_tasks([task])[0]
+        if task_id is not None:
+            record = (task_id,) + tuple(record[1:])
+        return self._scale([record])[0]
+
+    def _add(self, record, position=None):
+        if record[ID] in self._by_id:
+            raise ValueError(f"Duplicate task id: {record[ID]}")
+        if position is None:
+            position = self._next_position
+            self._next_position += 1
+        self._by_id[record[ID]] = record, position
+        key = (record[ARRIVAL], position)
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._arrivals.insert(index, record[ARRIVAL])
+        self.records.insert(index, record)
+
+    def _discard(self, task_id):
+        try:
+            record, position = self._by_id.pop(task_id)
+        except KeyError:
+            raise KeyError(f"No task with id {task_id}") from None
+        index = bisect_left(self._keys, (record[ARRIVAL], position))
+        del self._keys[index], self._arrivals[index], self.records[index]
+        return record, position
+
+    def _simulate_options(self):
+        # Records already carry any fixed profile's scaling
+        return dict(self.options, profile="Auto" if self.profile == "Auto" else None)
+
+    def _rebuild(self):
+        if self.full:
+            # In the order tasks were added, as the Auto profile's choices can depend on it
+            records = [record for record, _ in sorted(self._by_id.values(), key=itemgetter(1))]
+            self.schedule = simulate(records, self.policy, **self._simulate_options())
+            self.recomputed = len(self.records)
+            return self.schedule
+        self.schedule = Schedule(self.policy, preemptive=self.preemptive, cores=self.cores)
+        self._cumulative = []
+        self._peaks = []
+        self._slices_done = []
+        return self._extend(self._stream(self.records))
+
+    def _stream(self, records):
+        return stream(records, self.policy, self.options['quantum'], self.options['switch_cost'], self.cores)
+
+    def _track(self, events):
+        """Pass events through, noting how many slices precede each completion"""
+        slices = len(self.schedule.slice_tasks)
+        done = self._slices_done.append
+        for event in events:
+            slices += 1
+            if event[3] is not None:
+                done(slices)
+            yield event
+
+    def _extend(self, events):
+        schedule = self.schedule
+        kept = len(schedule.tasks)
+        # Running totals in the order collect adds them, so a truncated
+        # schedule picks up exactly where a full run would be
+        total, makespan = schedule.total_energy, schedule.makespan
+        schedule.collect(self._track(events) if self.preemptive else events)
+        add_total, add_peak = self._cumulative.append, self._peaks.append
+        for energy, end in zip(schedule.energies[kept:], schedule.ends[kept:]):
+            total += energy
+            add_total(total)
+            if end > makespan:
+                makespan = end
+            add_peak(makespan)
+        self.recomputed = len(schedule.tasks) - kept
+        return schedule
+
+    def _truncate(self, kept, slices=0):
+        """Drop all but the first ``kept`` tasks (and ``slices`` slices); returns the dropped tasks"""
+        schedule = self.schedule
+        dropped = schedule.tasks[kept:]
+        for column in (schedule.tasks, schedule.starts, schedule.ends, schedule.energies, schedule.cores,
+                       self._cumulative, self._peaks):
+            del column[kept:]
+        if self.preemptive:
+            for column in (schedule.slice_tasks, schedule.slice_starts, schedule.slice_ends,
+                           schedule.slice_cores):
+                del column[slices:]
+            del self._slices_done[kept:]
+        schedule.total_energy = self._cumulative[-1] if kept else 0
+        schedule.makespan = self._peaks[-1] if kept else 0
+        return dropped
+
+    def _reschedule(self, time):
+        """Recompute the schedule from the earliest arrival ``time`` the last change touched"""
+        if self.full:
+            return self._rebuild()
+        if self.preemptive:
+            return self._restart_idle(time)
+        return self._resume(time)
+
+    def _resume(self, time):
+        schedule = self.schedule
+        # Dispatch times never decrease, and every dispatch before ``time``
+        # only saw tasks that arrived before it
+        kept = bisect_left(schedule.starts, time)
+        if kept == 0:
+            return self._rebuild()
+        clock = schedule.starts[kept - 1]
+
+        # A core is free once the last task dispatched to it ends
+        free_at = {}
+        for index in range(kept - 1, -1, -1):
+            core = schedule.cores[index]
+            if core not in free_at:
+                free_at[core] = schedule.ends[index]
+                if len(free_at) == self.cores:
+                    break
+        free = [(free_at.get(core, 0), core) for core in range(self.cores)]
+        dropped = self._truncate(kept)
+
+        if self.policy == "FCFS":
+            # Dispatched strictly in arrival order
+            return self._extend(resume(self.records[kept:], self.policy, self.cores, free))
+        # Admitted but not yet dispatched, numbered by their place in arrival order
+        ready = [(bisect_left(self._keys, (task[ARRIVAL], self._by_id[task[ID]][1])), task)
+                 for task in dropped if task[ARRIVAL] <= clock]
+        first = bisect_right(self._arrivals, clock)
+        return self._extend(resume(self.records[first:], self.policy, self.cores, free, ready, first, clock))
+
+    def _restart_idle(self, time):
+        schedule = self.schedule
+        # Walk back over completions until every task finished so far arrived
+        # before all the others; the machine is empty at that point. Round
+        # Robin must see a real gap, as a task queued the moment another one
+        # finishes is charged a context switch.
+        strict = self.policy == "Round Robin"
+        kept = len(schedule.tasks)
+        lowest = float('inf')
+        while kept:
+            arrival = schedule.tasks[kept - 1][ARRIVAL]
+            if arrival < lowest:
+                lowest = arrival
+            kept -= 1
+            if not kept:
+                break
+            end = schedule.ends[kept - 1]
+            if (lowest <= time and (end < lowest if strict else end <= lowest)
+                    and bisect_left(self._arrivals, lowest) == kept):
+                break
+        if kept == 0:
+            return self._rebuild()
+        self._truncate(kept, self._slices_done[kept - 1])
+        return self._extend(self._stream(self.records[kept:]))
@@ -0,0 +1,229 @@
+"""Optional instrumentation of the scheduling pipeline.
+
+INSTRUMENTS collects per-phase wall-clock timers, counters and high-water
+marks, and can capture a cProfile profile and tracemalloc allocation
+statistics alongside them. It is off by default: a disabled ``phase``
+hands back one shared no-op context manager and the counters return
+straight away, so the hooks stay in place for production runs. The engine's
+dispatch loops are never touched; dispatch, preemption and queue depth
+counts are derived from each finished Schedule, and only while enabled.
+
+    INSTRUMENTS.enable(cprofile=True)
+    with INSTRUMENTS.phase('parse'):
+        ...
+    INSTRUMENTS.write('report.prom')    # or .json
+
+Set CPU_SCHEDULER_INSTRUMENT to a report path to instrument the GUI; the
+report is written when the window closes. CPU_SCHEDULER_CAPTURE may add
+"cprofile" and/or "tracemalloc", separated by commas.
+"""
+import os
+import time
+
+ENV_REPORT = 'CPU_SCHEDULER_INSTRUMENT'
+ENV_CAPTURE = 'CPU_SCHEDULER_CAPTURE'
+PROMETHEUS_PREFIX = 'scheduler'
+PROMETHEUS_EXTENSIONS = ('.prom', '.txt')
+# Functions and allocation sites listed in a report
+PROFILE_TOP = 25
+MEMORY_TOP = 10
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('timers', 'name', 'started')
+
+    def __init__(self, timers, name):
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        timer = self.timers.get(self.name)
+        if timer is None:
+            self.timers[self.name] = [1, elapsed, elapsed]
+        else:
+            timer[0] += 1
+            timer[1] += elapsed
+            if elapsed > timer[2]:
+                timer[2] = elapsed
+        return False
+
+
+class Instrumentation:
+    """Timers, counters and optional profiler captures, all off until ``enable``"""
+
+    def __init__(self):
+        self.enabled = False
+        self._profiler = None
+        self._tracing = False
+        self.reset()
+
+    def reset(self):
+        # Phase name -> [calls, total seconds, longest call]
+        self.timers = {}
+        self.counters = {}
+        self.high_water = {}
+
+    def enable(self, cprofile=False, tracemalloc=False):
+        self.enabled = True
+        if cprofile and self._profiler is None:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if tracemalloc and not self._tracing:
+            import tracemalloc as _tracemalloc
+            if not _tracemalloc.is_tracing():
+                _tracemalloc.start()
+            self._tracing = True
+
+    def disable(self):
+        """Stop collecting; what was collected stays available for the report"""
+        self.enabled = False
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    def configure_from_env(self, environ=os.environ):
+        """Enable as CPU_SCHEDULER_INSTRUMENT/CAPTURE ask; returns the report path or None"""
+        path = environ.get(ENV_REPORT)
+        if not path:
+            return None
+        capture = {name.strip().lower() for name in environ.get(ENV_CAPTURE, '').split(',')}
+        self.enable(cprofile='cprofile' in capture, tracemalloc='tracemalloc' in capture)
+        return path
+
+    def phase(self, name):
+        """Context manager timing one pass through the pipeline phase ``name``"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self.timers, name)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe_max(self, name, value):
+        """Raise the high-water mark ``name`` to ``value`` if it is higher"""
+        if self.enabled and (name not in self.high_water or value > self.high_water[name]):
+            self.high_water[name] = value
+
+    def record_schedule(self, schedule):
+        """Count dispatches, preemptions and completions of a finished run and its ready queue peak"""
+        if not self.enabled:
+            return
+        import numpy as np
+        from taskbatch import schedule_columns
+
+        columns = schedule_columns(schedule)
+        completed = len(columns['end'])
+        if schedule.preemptive:
+            slice_starts = np.frombuffer(schedule.slice_starts, np.float64)
+            slice_ends = np.frombuffer(schedule.slice_ends, np.float64)
+        else:
+            slice_starts, slice_ends = columns['start'], columns['end']
+        self.count('simulations')
+        self.count('tasks_dispatched', len(slice_starts))
+        self.count('tasks_completed', completed)
+        self.count('preemptions', len(slice_starts) - completed)
+
+        # Ready tasks: +1 on arrival and when a slice ends, -1 when a slice starts
+        # and on completion. At equal times removals go first, so a task that is
+        # dispatched the moment it arrives never counts as queued.
+        times = np.concatenate((columns['arrival'], slice_ends, slice_starts, columns['end']))
+        deltas = np.repeat(np.array([1, 1, -1, -1], np.int8),
+                           (completed, len(slice_ends), len(slice_starts), completed))
+        if len(times):
+            depth = np.cumsum(deltas[np.lexsort((deltas, times))], dtype=np.int64)
+            self.observe_max('queue_depth', int(depth.max(initial=0)))
+
+    def report(self):
+        """Everything collected so far as a JSON-serializable dict"""
+        report = {
+            'timers': {name: {'calls': calls, 'seconds': total, 'max_seconds': longest}
+                       for name, (calls, total, longest) in self.timers.items()},
+            'counters': dict(self.counters),
+            'high_water': dict(self.high_water),
+        }
+        if self._profiler is not None:
+            report['profile'] = self._profile_rows()
+        if self._tracing:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:MEMORY_TOP]
+            report['memory'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [{'location': str(stat.traceback), 'bytes': stat.size, 'blocks': stat.count}
+                        for stat in top],
+            }
+        return report
+
+    def _profile_rows(self):
+        import pstats
+        # Reading the stats stops the profiler, so start it again if still collecting
+        stats = pstats.Stats(self._profiler)
+        if self.enabled:
+            self._profiler.enable()
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({'function': f"{os.path.basename(filename)}:{line}({function})", 'calls': calls,
+                         'total_seconds': total, 'cumulative_seconds': cumulative})
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:PROFILE_TOP]
+
+    def to_json(self):
+        import json
+        return json.dumps(self.report(), indent=2)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """The timers, counters and memory figures in the Prometheus text exposition format"""
+        report = self.report()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if samples:
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} {kind}")
+                lines.extend(f"{prefix}_{name}{labels} {value!r}" for labels, value in samples)
+
+        timers = sorted(report['timers'].items())
+        family('phase_seconds_total', 'counter', "Wall-clock time spent in each pipeline phase.",
+               [(f'{{phase="{name}"}}', timer['seconds']) for name, timer in timers])
+        family('phase_calls_total', 'counter', "Passes through each pipeline phase.",
+               [(f'{{phase="{name}"}}', timer['calls']) for name, timer in timers])
+        family('phase_max_seconds', 'gauge', "Longest single pass through each pipeline phase.",
+               [(f'{{phase="{name}"}}', timer['max_seconds']) for name, timer in timers])
+        for name, value in sorted(report['counters'].items()):
+            family(f'{name}_total', 'counter', f"Total {name.replace('_', ' ')}.", [('', value)])
+        for name, value in sorted(report['high_water'].items()):
+            family(f'{name}_max', 'gauge', f"High-water mark of {name.replace('_', ' ')}.", [('', value)])
+        memory = report.get('memory')
+        if memory:
+            family('memory_current_bytes', 'gauge', "Memory traced by tracemalloc.",
+                   [('', memory['current_bytes'])])
+            family('memory_peak_bytes', 'gauge', "Peak memory traced by tracemalloc.",
+                   [('', memory['peak_bytes'])])
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the report to ``path``: Prometheus text for .prom/.txt, JSON otherwise"""
+        text = (self.to_prometheus() if path.lower().endswith(PROMETHEUS_EXTENSIONS) else self.to_json())
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+INSTRUMENTS = Instrumentation()
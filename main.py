@@ -1,7 +1,11 @@
 import sys
-import tkinter as tk  # Required for GUI mode
 
 def main():
+    if len(sys.argv) > 1:
+        # Arguments mean a scripted run: no menu, no Tk
+        from batch import main as run_batch
+        sys.exit(run_batch(sys.argv[1:]))
+
     print("\n🚀 Welcome to the Energy-Efficient CPU Scheduler! 🚀")
     
     while True:
@@ -16,6 +20,7 @@ def main():
             break
         elif mode == "2":
             try:
+                import tkinter as tk  # Required for GUI mode
                 from gui import EnergyEfficientSchedulerGUI
                 root = tk.Tk()
                 app = EnergyEfficientSchedulerGUI(root)
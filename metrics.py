@@ -0,0 +1,142 @@
+"""Scheduling metrics per task and in aggregate.
+
+For every task, ``task_metrics`` gives the waiting time (turnaround not
+spent running), turnaround (completion minus arrival) and response time
+(first dispatch minus arrival). ScheduleMetrics folds those into
+RunningStats and QuantileSketches, adds throughput and CPU idle time, and
+merges like the accumulators in stats: a run can be added a chunk of tasks
+at a time, and per-process results can be reduced into one, so p50/p95/p99
+are reported without keeping every value.
+"""
+import math
+
+import numpy as np
+
+from stats import QuantileSketch, RunningStats
+from taskbatch import schedule_columns
+
+TIME_METRICS = ('waiting', 'turnaround', 'response')
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def time_metrics(arrival, burst, start, end):
+    """{metric: array} for tasks given as columns of arrival, burst, first start and end"""
+    arrival = np.asarray(arrival, np.float64)
+    turnaround = np.asarray(end, np.float64) - arrival
+    return {
+        'waiting': turnaround - np.asarray(burst, np.float64),
+        'turnaround': turnaround,
+        'response': np.asarray(start, np.float64) - arrival,
+    }
+
+
+def task_metrics(schedule):
+    """Per-task waiting, turnaround and response times of a Schedule, in completion order"""
+    columns = schedule_columns(schedule)
+    values = time_metrics(columns['arrival'], columns['burst'], columns['start'], columns['end'])
+    values['id'] = columns['id']
+    return values
+
+
+class ScheduleMetrics:
+    """Aggregate metrics over one or more runs.
+
+    ``add_tasks`` takes the tasks of a run, in any number of chunks, and
+    ``add_run`` the run's makespan and core count, which throughput and
+    idle time are measured against. Merged runs count as if they ran one
+    after another.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.stats = {metric: RunningStats() for metric in TIME_METRICS}
+        self.sketches = {metric: QuantileSketch(relative_accuracy) for metric in TIME_METRICS}
+        self.runs = 0
+        self.tasks = 0
+        # Time spent running tasks, and the time and core time the runs took
+        self.busy_time = 0.0
+        self.elapsed = 0.0
+        self.core_time = 0.0
+
+    @classmethod
+    def from_schedule(cls, schedule, relative_accuracy=0.01):
+        metrics = cls(relative_accuracy)
+        columns = schedule_columns(schedule)
+        metrics.add_tasks(columns['arrival'], columns['burst'], columns['start'], columns['end'])
+        metrics.add_run(schedule.makespan, schedule.num_cores)
+        return metrics
+
+    def add_tasks(self, arrival, burst, start, end):
+        """Fold in a chunk of tasks given as columns"""
+        for metric, values in time_metrics(arrival, burst, start, end).items():
+            self.stats[metric].add_many(values)
+            self.sketches[metric].add_many(values)
+        self.tasks += len(arrival)
+        self.busy_time += float(np.sum(burst, dtype=np.float64))
+
+    def add_run(self, makespan, cores=1):
+        """Account for a run ending at ``makespan`` on ``cores`` cores"""
+        self.runs += 1
+        self.elapsed += makespan
+        self.core_time += makespan * cores
+
+    def merge(self, other):
+        for metric in TIME_METRICS:
+            self.stats[metric].merge(other.stats[metric])
+            self.sketches[metric].merge(other.sketches[metric])
+        self.runs += other.runs
+        self.tasks += other.tasks
+        self.busy_time += other.busy_time
+        self.elapsed += other.elapsed
+        self.core_time += other.core_time
+        return self
+
+    @property
+    def throughput(self):
+        """Tasks completed per time unit"""
+        return self.tasks / self.elapsed if self.elapsed > 0 else 0
+
+    @property
+    def idle_time(self):
+        """Core time in which no task ran, including context switches"""
+        return max(self.core_time - self.busy_time, 0)
+
+    @property
+    def utilization(self):
+        return self.busy_time / self.core_time if self.core_time > 0 else 0
+
+    def quantile(self, metric, q):
+        stats = self.stats[metric]
+        if not stats.count:
+            return math.nan
+        # A bucket's representative can lie just outside the values seen
+        return min(max(self.sketches[metric].quantile(q), stats.min), stats.max)
+
+    def as_dict(self):
+        """Flat dict: tasks, throughput, idle_time, utilization and avg/pNN/max of each time metric"""
+        result = {
+            'tasks': self.tasks,
+            'throughput': self.throughput,
+            'idle_time': self.idle_time,
+            'utilization': self.utilization,
+        }
+        for metric in TIME_METRICS:
+            stats = self.stats[metric]
+            result[f'avg_{metric}'] = stats.mean
+            for q in QUANTILES:
+                result[f'p{round(q * 100)}_{metric}'] = self.quantile(metric, q)
+            result[f'max_{metric}'] = stats.max if stats.count else math.nan
+        return result
+
+
+def format_metrics(metrics):
+    """Human-readable lines describing a ScheduleMetrics"""
+    lines = [f"Throughput: {metrics.throughput:.4g} tasks/time unit",
+             f"CPU Idle Time: {metrics.idle_time:g} core-time units "
+             f"({1 - metrics.utilization:.2%} idle)" if metrics.core_time > 0 else "CPU Idle Time: 0"]
+    for metric in TIME_METRICS:
+        stats = metrics.stats[metric]
+        if not stats.count:
+            continue
+        quantiles = ", ".join(f"p{round(q * 100)} {metrics.quantile(metric, q):.6g}" for q in QUANTILES)
+        lines.append(f"{metric.capitalize()} Time: avg {stats.mean:.6g}, {quantiles}, max {stats.max:.6g}")
+    return lines
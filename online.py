@@ -0,0 +1,256 @@
+"""Online scheduling of tasks submitted while the simulation runs.
+
+OnlineScheduler feeds tasks handed to ``submit`` into the engine's
+streaming dispatcher and publishes start, preempt and finish events to
+async subscribers. The dispatcher runs in a worker thread and pulls tasks
+only when its clock needs them; each decision is published as soon as the
+tasks submitted so far settle it. A decision at time t therefore waits for
+the first task arriving after t, or for ``close``.
+
+Every queue is bounded. A subscriber that falls behind stalls the
+dispatcher, which stops taking tasks, which makes ``submit`` wait, so a
+slow consumer slows the producers down instead of growing memory. Events
+must therefore be read by another task than the one submitting. A
+subscriber can leave with ``Subscription.close``, and once the scheduler is
+closing, one whose queue stays full for CLOSE_GRACE seconds is dropped.
+
+    async def consume(events):
+        async for event in events:
+            ...
+
+    async with OnlineScheduler("Shortest Remaining Time", cores=2) as scheduler:
+        reader = asyncio.create_task(consume(scheduler.subscribe()))
+        await scheduler.submit({'arrival': 0, 'burst': 4, 'power': 2})
+        ...
+    await reader
+"""
+import asyncio
+from collections import namedtuple
+
+from engine import ARRIVAL, BURST, POWER, normalize_tasks, stream
+
+# Event kinds: a task gets a core (again, after a preemption), loses it unfinished, or
+# completes. ``time`` is simulated time and ``task`` an engine record.
+START, PREEMPT, FINISH = 'start', 'preempt', 'finish'
+Event = namedtuple('Event', 'kind time task core')
+
+DEFAULT_MAX_PENDING = 1024
+DEFAULT_MAX_EVENTS = 1024
+# Tasks taken and events handed over per hop between the loop and the dispatcher thread
+HANDOFF_BATCH = 256
+# Seconds a full subscriber is waited for once the scheduler is closing
+CLOSE_GRACE = 1.0
+
+_CLOSED = object()
+
+
+class Subscription:
+    """Async iterator over the events published after it was created"""
+
+    def __init__(self, maxsize, unsubscribe):
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+        self._unsubscribe = unsubscribe
+        self._done = asyncio.Event()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+        event = await self.queue.get()
+        if event is _CLOSED:
+            raise StopAsyncIteration
+        return event
+
+    def close(self):
+        """Stop receiving events; those already queued can still be read"""
+        if self.closed:
+            return
+        self.closed = True
+        self._unsubscribe(self)
+        self._done.set()
+        if not self.queue.full():
+            # Wakes a reader waiting on an empty queue
+            self.queue.put_nowait(_CLOSED)
+
+
+class OnlineScheduler:
+    """Schedules tasks under ``policy`` as they are submitted.
+
+    Arrival times must not decrease between submissions. A task without an
+    arrival time is stamped with the time since ``start``, in simulated time
+    units at ``time_scale`` units per second. A fixed power ``profile`` is
+    applied to each task on submission; the Auto profile needs the whole
+    task set and is not available.
+    """
+
+    def __init__(self, policy="FCFS", quantum=2, switch_cost=0, cores=1, profile=None,
+                 max_pending=DEFAULT_MAX_PENDING, time_scale=1.0):
+        if profile is not None:
+            import dvfs
+            if profile == dvfs.AUTO_PROFILE:
+                raise ValueError("The Auto power profile cannot be used online")
+            dvfs.profile_point(profile)
+        self.policy = policy
+        self.profile = profile
+        self.time_scale = time_scale
+        self.options = (quantum, switch_cost, cores)
+        self.summary = {'policy': policy, 'tasks': 0, 'total_energy': 0, 'makespan': 0}
+        self._max_pending = max_pending
+        self._subscribers = []
+        self._next_id = 1
+        self._last_arrival = 0
+        self._closed = False
+        self._loop = None
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if self._loop is not None:
+            raise RuntimeError("Scheduler already started")
+        self._loop = asyncio.get_running_loop()
+        self._started = self._loop.time()
+        self._pending = asyncio.Queue(self._max_pending)
+        self._closing = asyncio.Event()
+        # Raises here for an unknown policy or bad Round Robin settings
+        events = stream(self._records(), self.policy, *self.options)
+        self._runner = self._loop.run_in_executor(None, self._dispatch, events)
+
+    def subscribe(self, maxsize=DEFAULT_MAX_EVENTS):
+        """A Subscription receiving every event from now on until the scheduler closes"""
+        subscription = Subscription(maxsize, self._unsubscribe)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    async def submit(self, task):
+        """Queue a task (dict, task.Task or record); returns its engine record.
+
+        Waits while ``max_pending`` submitted tasks are not yet taken by the
+        dispatcher.
+        """
+        if self._runner is None or self._closed:
+            raise RuntimeError("Scheduler is not running")
+        if isinstance(task, dict):
+            task = dict(task)
+            task.setdefault('id', self._next_id)
+            task.setdefault('arrival', max((self._loop.time() - self._started) * self.time_scale,
+                                           self._last_arrival))
+        elif not isinstance(task, tuple) and not hasattr(task, 'id'):
+            task = (self._next_id, task.arrival, task.burst, task.power, getattr(task, 'priority', 1))
+        record = normalize_tasks([task])[0]
+        self._next_id += 1
+        if record[ARRIVAL] < self._last_arrival:
+            raise ValueError(f"Task arrives at {record[ARRIVAL]}, before an earlier submission "
+                             f"({self._last_arrival})")
+        if self.profile is not None:
+            import dvfs
+            record = dvfs.apply_profile([record], self.profile)[0]
+        self._last_arrival = record[ARRIVAL]
+        await self._pending.put(record)
+        return record
+
+    async def close(self):
+        """Stop taking tasks, wait for every decision to be published and end the subscriptions.
+
+        Subscribers that stop reading are dropped rather than waited for.
+        """
+        if self._runner is None:
+            return
+        if not self._closed:
+            self._closed = True
+            self._closing.set()
+            await self._pending.put(_CLOSED)
+        try:
+            # Shielded, so that a close cut short by a timeout can be retried
+            await asyncio.shield(self._runner)
+        finally:
+            if self._runner.done():
+                for subscription in list(self._subscribers):
+                    await self._deliver(subscription, _CLOSED)
+                self._subscribers = []
+
+    async def _deliver(self, subscription, event):
+        """Queue ``event`` for a subscriber, waiting for room unless it closes or stalls while closing"""
+        queue = subscription.queue
+        while not subscription.closed:
+            if not queue.full():
+                queue.put_nowait(event)
+                return
+            if self._closing.is_set():
+                try:
+                    await asyncio.wait_for(queue.put(event), CLOSE_GRACE)
+                except asyncio.TimeoutError:
+                    subscription.close()
+                return
+            put = asyncio.ensure_future(queue.put(event))
+            closing = asyncio.ensure_future(self._closing.wait())
+            done = asyncio.ensure_future(subscription._done.wait())
+            try:
+                await asyncio.wait((put, closing, done), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closing.cancel()
+                done.cancel()
+                if not put.done():
+                    put.cancel()
+            if not put.cancelled():
+                return
+
+    async def _take(self):
+        """Wait for at least one task and return everything queued, up to a batch"""
+        tasks = [await self._pending.get()]
+        while len(tasks) < HANDOFF_BATCH and not self._pending.empty():
+            tasks.append(self._pending.get_nowait())
+        return tasks
+
+    def _call(self, coroutine):
+        # Runs on the dispatcher thread: block until the loop has run ``coroutine``
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _records(self):
+        """Blocking iterator over submitted tasks, for the dispatcher thread"""
+        while True:
+            # The dispatcher is about to wait, so let subscribers see everything decided so far
+            self._flush()
+            for task in self._call(self._take()):
+                if task is _CLOSED:
+                    return
+                yield task
+
+    def _dispatch(self, events):
+        self._decided = []
+        for event in events:
+            self._decided.append(event)
+            if len(self._decided) >= HANDOFF_BATCH:
+                self._flush()
+        self._flush()
+
+    def _flush(self):
+        if self._decided:
+            decided, self._decided = self._decided, []
+            self._call(self._publish(decided))
+
+    async def _publish(self, decided):
+        summary = self.summary
+        for task, start, end, first, core in decided:
+            events = (Event(START, start, task, core),
+                      Event(PREEMPT if first is None else FINISH, end, task, core))
+            if first is not None:
+                summary['tasks'] += 1
+                summary['total_energy'] += task[BURST] * task[POWER]
+                if end > summary['makespan']:
+                    summary['makespan'] = end
+            for subscription in list(self._subscribers):
+                for event in events:
+                    await self._deliver(subscription, event)
@@ -0,0 +1,232 @@
+"""Persistent run history in a local SQLite database.
+
+Every scheduling run is stored with its parameters, a hash of the task set
+and one row per scheduled task. A run is saved in a single transaction,
+with its task rows inserted by executemany in batches, so a 1M-task run is
+written in seconds and a failed save leaves nothing behind. Queries page
+through runs and through a run's tasks instead of loading them whole.
+
+    python rundb.py list [--policy FCFS] [--page 2]
+    python rundb.py show RUN_ID [--page 3]
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from engine import is_batch
+from metrics import ScheduleMetrics, format_metrics
+from taskbatch import SCHEDULE_COLUMNS, TaskBatch, schedule_columns
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cpu_scheduler', 'runs.sqlite3')
+INSERT_BATCH = 50000
+PAGE_SIZE = 50
+
+RUN_FIELDS = ('id', 'created', 'policy', 'quantum', 'switch_cost', 'cores', 'partitioned', 'profile',
+              'task_hash', 'num_tasks', 'total_energy', 'makespan', 'avg_power')
+TASK_FIELDS = ('seq',) + SCHEDULE_COLUMNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    policy TEXT NOT NULL,
+    quantum REAL,
+    switch_cost REAL,
+    cores INTEGER NOT NULL,
+    partitioned INTEGER NOT NULL,
+    profile TEXT,
+    task_hash TEXT NOT NULL,
+    num_tasks INTEGER NOT NULL,
+    total_energy REAL NOT NULL,
+    makespan REAL NOT NULL,
+    avg_power REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_policy ON runs (policy, created);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE INDEX IF NOT EXISTS runs_task_hash ON runs (task_hash);
+
+-- Rows are clustered by (run_id, seq), so a run's tasks are one range scan
+CREATE TABLE IF NOT EXISTS run_tasks (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    id,
+    arrival REAL,
+    burst REAL,
+    power REAL,
+    priority REAL,
+    start REAL,
+    "end" REAL,
+    energy REAL,
+    core INTEGER,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS run_tasks_time ON run_tasks (run_id, start, "end");
+"""
+
+
+class RunStore:
+    """Connection to a run history database, created on first use"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save_run(self, schedule, tasks, quantum=None, switch_cost=None, cores=1, partitioned=False,
+                 profile=None):
+        """Store a run and its per-task results; returns the new run id"""
+        batch = tasks if is_batch(tasks) else TaskBatch.from_tasks(tasks)
+        columns = schedule_columns(schedule)
+        count = len(columns['id'])
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created, policy, quantum, switch_cost, cores, partitioned, profile,"
+                " task_hash, num_tasks, total_energy, makespan, avg_power)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), schedule.policy, quantum, switch_cost, cores, int(bool(partitioned)), profile,
+                 batch.digest(), count, float(schedule.total_energy), float(schedule.makespan),
+                 float(schedule.avg_power)))
+            run_id = cursor.lastrowid
+
+            insert = (f"INSERT INTO run_tasks (run_id, seq, {', '.join(map(_quote, SCHEDULE_COLUMNS))})"
+                      f" VALUES (?, ?{', ?' * len(SCHEDULE_COLUMNS)})")
+            # Batches bound the Python lists built at a time; the rows commit together with the run
+            for offset in range(0, count, INSERT_BATCH):
+                stop = min(offset + INSERT_BATCH, count)
+                values = [columns[field][offset:stop].tolist() for field in SCHEDULE_COLUMNS]
+                self.conn.executemany(insert, zip([run_id] * (stop - offset), range(offset, stop), *values))
+        return run_id
+
+    def list_runs(self, policy=None, since=None, until=None, page=0, page_size=PAGE_SIZE):
+        """Runs, newest first, as dicts keyed by RUN_FIELDS"""
+        clauses, params = [], []
+        if policy is not None:
+            clauses.append("policy = ?")
+            params.append(policy)
+        if since is not None:
+            clauses.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT {', '.join(RUN_FIELDS)} FROM runs{where} ORDER BY created DESC, id DESC"
+            " LIMIT ? OFFSET ?", params + [page_size, page * page_size])
+        return [dict(zip(RUN_FIELDS, row)) for row in rows]
+
+    def get_run(self, run_id):
+        row = self.conn.execute(f"SELECT {', '.join(RUN_FIELDS)} FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(zip(RUN_FIELDS, row)) if row else None
+
+    def run_tasks(self, run_id, start=0, stop=None, time_from=None, time_to=None):
+        """Task rows ``start``..``stop`` of a run in completion order, as tuples in TASK_FIELDS order.
+
+        ``time_from``/``time_to`` keep only tasks that ran within that window.
+        """
+        clauses, params = ["run_id = ?", "seq >= ?"], [run_id, start]
+        if stop is not None:
+            clauses.append("seq < ?")
+            params.append(stop)
+        if time_from is not None:
+            clauses.append('"end" > ?')
+            params.append(time_from)
+        if time_to is not None:
+            clauses.append("start < ?")
+            params.append(time_to)
+        return self.conn.execute(
+            f"SELECT {', '.join(map(_quote, TASK_FIELDS))} FROM run_tasks"
+            f" WHERE {' AND '.join(clauses)} ORDER BY seq", params).fetchall()
+
+    def run_metrics(self, run_id):
+        """metrics.ScheduleMetrics of a stored run, read a batch of rows at a time"""
+        run = self.get_run(run_id)
+        metrics = ScheduleMetrics()
+        cursor = self.conn.execute(
+            'SELECT arrival, burst, start, "end" FROM run_tasks WHERE run_id = ? ORDER BY seq', (run_id,))
+        while True:
+            rows = cursor.fetchmany(INSERT_BATCH)
+            if not rows:
+                break
+            metrics.add_tasks(*np.array(rows, dtype=np.float64).T)
+        metrics.add_run(run['makespan'], run['cores'])
+        return metrics
+
+    def delete_run(self, run_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+
+def _quote(field):
+    # "end" is an SQL keyword
+    return f'"{field}"'
+
+
+class RunTasks:
+    """Row source over one stored run for historyview.VirtualTreeview"""
+
+    def __init__(self, store, run_id, fields=('id', 'arrival', 'burst', 'power', 'start', 'end', 'energy')):
+        self.store = store
+        self.run_id = run_id
+        self.count = store.get_run(run_id)['num_tasks']
+        self._select = (f"SELECT {', '.join(map(_quote, fields))} FROM run_tasks"
+                        " WHERE run_id = ? AND seq >= ? AND seq < ? ORDER BY seq")
+
+    def __len__(self):
+        return self.count
+
+    def rows(self, start, stop):
+        return self.store.conn.execute(self._select, (self.run_id, max(start, 0), stop)).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Browse the stored scheduling runs")
+    parser.add_argument('--db', default=DEFAULT_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    list_parser = commands.add_parser('list', help="list runs, newest first")
+    list_parser.add_argument('--policy')
+    list_parser.add_argument('--page', type=int, default=1)
+    show_parser = commands.add_parser('show', help="show one run's tasks")
+    show_parser.add_argument('run_id', type=int)
+    show_parser.add_argument('--page', type=int, default=1)
+    show_parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    args = parser.parse_args(argv)
+
+    store = RunStore(args.db)
+    try:
+        if args.command == 'list':
+            for run in store.list_runs(args.policy, page=args.page - 1):
+                print(f"#{run['id']:<6} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['created']))}"
+                      f"  {run['policy']:<24} {run['num_tasks']:>9} tasks  energy {run['total_energy']:g}"
+                      f"  makespan {run['makespan']:g}  cores {run['cores']}  {run['profile'] or ''}")
+            return 0
+        run = store.get_run(args.run_id)
+        if run is None:
+            print(f"No run #{args.run_id}")
+            return 1
+        print(f"Run #{run['id']}: {run['policy']}, {run['num_tasks']} tasks, task set {run['task_hash'][:12]}")
+        if args.page == 1:
+            for line in format_metrics(store.run_metrics(args.run_id)):
+                print(f"  {line}")
+        start = (args.page - 1) * args.page_size
+        print("  ".join(f"{field:>10}" for field in TASK_FIELDS))
+        for row in store.run_tasks(args.run_id, start, start + args.page_size):
+            print("  ".join(f"{value:>10g}" if isinstance(value, float) else f"{value!s:>10}" for value in row))
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
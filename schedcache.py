@@ -0,0 +1,170 @@
+"""Content-addressed cache of scheduling results.
+
+Results are keyed by a SHA-256 over the task set's contents and every
+parameter that can change the outcome, so an identical request is answered
+without simulating again no matter where the tasks came from. The newest
+entries are kept in memory; an optional cache directory holds more of them
+as pickles, evicting the least recently used once it grows past its size
+limit. Only point ``directory`` at a location you trust, since entries are
+unpickled when read.
+"""
+import hashlib
+import json
+import os
+import pickle
+import weakref
+from collections import OrderedDict
+
+from engine import is_batch, simulate
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cpu_scheduler', 'cache')
+DEFAULT_CAPACITY = 8
+DEFAULT_MAX_BYTES = 1 << 30
+EXTENSION = '.pickle'
+
+
+def _task_digest(tasks):
+    from taskbatch import TaskBatch
+    return (tasks if is_batch(tasks) else TaskBatch.from_tasks(tasks)).digest()
+
+
+def schedule_key(digest, policy, quantum=2, switch_cost=0, cores=1, partitioned=False, profile=None,
+                 budget=None, kind='schedule'):
+    """Cache key for scheduling the task set with SHA-256 ``digest`` under these settings.
+
+    Parameters a policy ignores are left out, so e.g. FCFS runs with
+    different quanta share one entry.
+    """
+    params = {
+        'kind': kind,
+        'tasks': digest,
+        'policy': policy,
+        'cores': cores,
+        'partitioned': bool(partitioned) and cores > 1,
+        'profile': profile,
+    }
+    if policy == "Round Robin":
+        params['quantum'] = quantum
+        params['switch_cost'] = switch_cost
+    if profile == "Auto":
+        params['budget'] = budget
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ScheduleCache:
+    """LRU of the last ``capacity`` results in memory, backed by ``directory`` if given"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        if capacity < 0:
+            raise ValueError("Cache capacity cannot be negative")
+        self.capacity = capacity
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # A TaskBatch is never modified, so its digest is computed once
+        self._digests = weakref.WeakKeyDictionary()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def digest(self, tasks):
+        """Content digest of a task set, remembered for TaskBatches"""
+        if not is_batch(tasks):
+            return _task_digest(tasks)
+        digest = self._digests.get(tasks)
+        if digest is None:
+            digest = self._digests[tasks] = tasks.digest()
+        return digest
+
+    def key(self, tasks, policy="FCFS", kind='schedule', **options):
+        return schedule_key(self.digest(tasks), policy, kind=kind, **options)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def get(self, key):
+        """Cached value for ``key``, or None"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                # The modification time doubles as the last use for eviction
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                # A damaged entry is just a miss; it is rewritten on the next put
+                value = None
+            if value is not None:
+                self.hits += 1
+                self._remember(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory is not None:
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            self.evict()
+
+    def _remember(self, key, value):
+        if self.capacity == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def evict(self):
+        """Delete the least recently used files until the directory fits in ``max_bytes``"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(EXTENSION):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Another process sharing the directory got there first
+                pass
+            total -= size
+
+    def clear(self):
+        """Drop the in-memory tier (files on disk are kept)"""
+        self._entries.clear()
+
+    def simulate(self, tasks, policy="FCFS", **options):
+        """engine.simulate, answered from the cache when the same run was done before"""
+        key = self.key(tasks, policy, **options)
+        schedule = self.get(key)
+        if schedule is None:
+            schedule = simulate(tasks, policy, **options)
+            self.put(key, schedule)
+        return schedule
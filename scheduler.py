@@ -1,20 +1,42 @@
-import matplotlib.pyplot as plt
+from engine import ARRIVAL, BURST, ID, POWER, is_batch, simulate
+from task import Task
 
 class EnergyEfficientScheduler:
-    def __init__(self, tasks):
-        self.tasks = sorted(tasks, key=lambda t: t.arrival)  # Sort tasks by arrival time
-        self.total_energy_consumed = sum(task.energy() for task in self.tasks)
+    def __init__(self, tasks, policy="FCFS", quantum=2, switch_cost=0, cores=1, partitioned=False,
+                 profile=None):
+        """Accepts a list of task.Task objects or a taskbatch.TaskBatch"""
+        self.policy = policy
+        self.source = tasks
+        self.result = simulate(tasks, policy, quantum=quantum, switch_cost=switch_cost,
+                               cores=cores, partitioned=partitioned, profile=profile)
+        self.total_energy_consumed = self.result.total_energy
+
+    @property
+    def tasks(self):
+        """Tasks in the order the engine finished them"""
+        if is_batch(self.source):
+            return [Task(record[ARRIVAL], record[BURST], record[POWER]) for record in self.result.tasks]
+        return [self.source[record[ID] - 1] for record in self.result.tasks]
 
     def schedule(self):
         """Simulates task execution and prints scheduling order."""
-        print("\n🕒 Scheduling Order:")
-        for task in self.tasks:
-            print(task)
+        print(f"\n🕒 Scheduling Order ({self.policy}):")
+        for task, start, end, core in zip(self.tasks, self.result.starts, self.result.ends, self.result.cores):
+            print(f"{task}  ->  core {core + 1}, start {start}, end {end}")
         print(f"\n⚡ Total Energy Consumed: {self.total_energy_consumed} units")
+        print(f"⏱️ Makespan: {self.result.makespan} time units")
 
-    import matplotlib.pyplot as plt
+        # Percentiles need numpy, which the scheduler does not load until here
+        from metrics import ScheduleMetrics, format_metrics
+        print("\n📊 Metrics:")
+        for line in format_metrics(ScheduleMetrics.from_schedule(self.result)):
+            print(f"  {line}")
 
+    @staticmethod
     def plot_energy_consumption(tasks):
+        # Only plotting needs matplotlib; the scheduler itself stays headless
+        import matplotlib.pyplot as plt
+
         plt.ion()  # Enable interactive mode (keeps plots inside the same session)
         energies = [task.energy() for task in tasks]
         labels = [f'Task {i+1}' for i in range(len(tasks))]
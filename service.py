@@ -0,0 +1,384 @@
+"""Local JSON-over-HTTP scheduling service.
+
+Built on asyncio streams with no dependencies beyond the standard library.
+Connections are kept alive between requests. Small scheduling requests
+that arrive close together are grouped into one job for the worker pool,
+so the cost of handing work to a process is shared by the whole group.
+Schedules with many rows are sent with chunked transfer encoding as they
+are encoded instead of being built up as one body.
+
+    python service.py --port 8765 --workers 4
+
+    POST /schedule   {"tasks": [{"arrival": 0, "burst": 3, "power": 2}, ...],
+                      "policy": "sjf", "cores": 2, "schedule": true}
+    GET  /policies
+    GET  /health
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+from argparse import ArgumentTypeError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+from batch import policy_name, schedule_rows
+from dvfs import AUTO_PROFILE, PROFILES
+from engine import ARRIVAL, POLICIES
+from traceio import SCHEDULE_FIELDS, records_from_rows
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY = 64 << 20
+# Requests with at most this many tasks are batched; larger ones get a job of their own
+BATCH_MAX_TASKS = 2000
+BATCH_SIZE = 64
+BATCH_WINDOW = 0.002
+# Schedules with more rows than this are streamed, CHUNK_ROWS rows per chunk
+STREAM_ROWS = 5000
+CHUNK_ROWS = 2000
+# Most cores a request may simulate
+MAX_CORES = 1024
+
+
+def _schedule(records, policy, options, include_schedule):
+    from compare import summarize
+    from engine import simulate
+    schedule = simulate(records, policy, **options)
+    summary = summarize(schedule, curve=False)
+    # Every slice ends by the makespan and adds to the total energy, so finite totals mean finite rows
+    if not all(math.isfinite(value) for value in summary.values() if isinstance(value, (int, float))):
+        raise ValueError("Task values are too large: the schedule's totals overflow")
+    return summary, list(schedule_rows(schedule)) if include_schedule else None
+
+
+def run_jobs(jobs):
+    """Worker: run (records, policy, options, include_schedule) jobs as (ok, result or error) pairs.
+
+    An error is a (status, message) pair. Each job fails on its own, so one
+    bad job never takes down the others batched with it.
+    """
+    results = []
+    for job in jobs:
+        try:
+            results.append((True, _schedule(*job)))
+        except (ValueError, KeyError, TypeError) as e:
+            results.append((False, (HTTPStatus.UNPROCESSABLE_ENTITY, str(e))))
+        except Exception as e:
+            results.append((False, (HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")))
+    return results
+
+
+class RequestError(Exception):
+    """A request the service rejects, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_job(body):
+    """(records, policy, options, include_schedule) from a /schedule request body"""
+    try:
+        request = json.loads(body)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}") from None
+    if not isinstance(request, dict) or not isinstance(request.get('tasks'), list):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Expected an object with a 'tasks' list")
+    if not all(isinstance(row, dict) for row in request['tasks']):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Every task must be an object")
+    try:
+        records = records_from_rows(request['tasks'])
+        policy = policy_name(str(request.get('policy', "FCFS")))
+        for number, record in enumerate(records, 1):
+            if not all(math.isfinite(value) for value in record[ARRIVAL:]):
+                raise ValueError(f"Task {number} has a value that is not a finite number")
+    except (ValueError, TypeError, ArgumentTypeError) as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, str(e)) from None
+    if policy not in POLICIES:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Use one policy per request")
+    return records, policy, parse_options(request), bool(request.get('schedule', True))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def parse_options(request):
+    """engine.simulate keyword arguments from a request, checked for type and range"""
+    options = {}
+    if 'quantum' in request:
+        if not _is_number(request['quantum']) or request['quantum'] <= 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'quantum' must be a positive number")
+        options['quantum'] = request['quantum']
+    if 'switch_cost' in request:
+        if not _is_number(request['switch_cost']) or request['switch_cost'] < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'switch_cost' must be a non-negative number")
+        options['switch_cost'] = request['switch_cost']
+    if 'cores' in request:
+        cores = request['cores']
+        if isinstance(cores, bool) or not isinstance(cores, int) or not 1 <= cores <= MAX_CORES:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'cores' must be an integer from 1 to {MAX_CORES}")
+        options['cores'] = cores
+    if 'partitioned' in request:
+        if not isinstance(request['partitioned'], bool):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'partitioned' must be true or false")
+        options['partitioned'] = request['partitioned']
+    if 'profile' in request:
+        profile = request['profile']
+        if profile is not None and profile not in PROFILES and profile != AUTO_PROFILE:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'profile' must be one of "
+                                                       f"{', '.join([*PROFILES, AUTO_PROFILE])} or null")
+        options['profile'] = profile
+    return options
+
+
+class Batcher:
+    """Groups jobs submitted within ``window`` seconds (up to ``size``) into one pool call"""
+
+    def __init__(self, pool, size=BATCH_SIZE, window=BATCH_WINDOW):
+        self.pool = pool
+        self.size = size
+        self.window = window
+        self._waiting = []
+        self._timer = None
+
+    def submit(self, job):
+        """Future for ``job``'s (ok, result or error) pair"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiting.append((job, future))
+        if len(self._waiting) >= self.size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._waiting:
+            return
+        waiting, self._waiting = self._waiting, []
+        done = asyncio.get_running_loop().run_in_executor(self.pool, run_jobs, [job for job, _ in waiting])
+
+        def deliver(done):
+            error = done.exception()
+            for index, (_, future) in enumerate(waiting):
+                if future.cancelled():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[index])
+
+        done.add_done_callback(deliver)
+
+
+class SchedulingService:
+    """HTTP front end that runs scheduling jobs on a pool of ``workers`` processes.
+
+    With ``workers=0`` jobs run on a single thread in this process instead.
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, batch_window=BATCH_WINDOW):
+        if workers == 0:
+            self.pool = ThreadPoolExecutor(1)
+        else:
+            self.pool = ProcessPoolExecutor(workers or os.cpu_count() or 1)
+        self.batcher = Batcher(self.pool, batch_size, batch_window)
+        self.server = None
+        self.requests = 0
+        self._connections = {}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            # Idle keep-alive connections would otherwise hold the server open
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self.server.wait_closed()
+        self.pool.shutdown()
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until the client or a Connection: close ends it"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._send_error(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                           "Request head too large", False)
+                    return
+                try:
+                    method, target, version, headers = _parse_head(head)
+                except ValueError:
+                    await self._send_error(writer, HTTPStatus.BAD_REQUEST, "Malformed request", False)
+                    return
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                chunked = version != 'HTTP/1.0'
+                try:
+                    body = await self._read_body(reader, headers)
+                except RequestError as e:
+                    # The body was not read, so the connection cannot be reused
+                    await self._send_error(writer, e.status, str(e), False)
+                    return
+                try:
+                    await self._route(writer, method, target.split('?', 1)[0], body, keep_alive, chunked)
+                except RequestError as e:
+                    await self._send_error(writer, e.status, str(e), keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # The response may have been cut short, so the connection is not reused
+                    await self._send_error(writer, HTTPStatus.INTERNAL_SERVER_ERROR,
+                                           f"{type(e).__name__}: {e}", False)
+                    return
+                self.requests += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def _read_body(self, reader, headers):
+        if 'transfer-encoding' in headers:
+            raise RequestError(HTTPStatus.NOT_IMPLEMENTED, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length > MAX_BODY:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body larger than {MAX_BODY} bytes")
+        return await reader.readexactly(length) if length else b''
+
+    async def _route(self, writer, method, path, body, keep_alive, chunked):
+        if path == '/health':
+            _expect(method, 'GET')
+            await self._send_json(writer, HTTPStatus.OK, {'status': 'ok', 'requests': self.requests}, keep_alive)
+        elif path == '/policies':
+            _expect(method, 'GET')
+            await self._send_json(writer, HTTPStatus.OK, {'policies': POLICIES}, keep_alive)
+        elif path == '/schedule':
+            _expect(method, 'POST')
+            job = parse_job(body)
+            if len(job[0]) <= BATCH_MAX_TASKS:
+                ok, result = await self.batcher.submit(job)
+            else:
+                ok, result = (await asyncio.get_running_loop().run_in_executor(self.pool, run_jobs, [job]))[0]
+            if not ok:
+                raise RequestError(*result)
+            await self._send_schedule(writer, job[1], *result, keep_alive, chunked)
+        else:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+
+    async def _send_schedule(self, writer, policy, summary, rows, keep_alive, chunked):
+        response = {'policy': policy, 'summary': summary}
+        if rows is None or len(rows) <= STREAM_ROWS or not chunked:
+            if rows is not None:
+                response['fields'] = SCHEDULE_FIELDS
+                response['schedule'] = rows
+            await self._send_json(writer, HTTPStatus.OK, response, keep_alive)
+            return
+
+        prefix = json.dumps(dict(response, fields=SCHEDULE_FIELDS), allow_nan=False)[:-1] + ', "schedule": ['
+        writer.write(_head(HTTPStatus.OK, keep_alive, [('Transfer-Encoding', 'chunked')]))
+        _write_chunk(writer, prefix.encode('utf-8'))
+        for offset in range(0, len(rows), CHUNK_ROWS):
+            text = json.dumps(rows[offset:offset + CHUNK_ROWS], allow_nan=False)[1:-1]
+            _write_chunk(writer, (text if offset == 0 else ', ' + text).encode('utf-8'))
+            # Wait for a slow client instead of buffering the whole schedule
+            await writer.drain()
+        _write_chunk(writer, b']}')
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    async def _send_json(self, writer, status, obj, keep_alive):
+        try:
+            body = json.dumps(obj, allow_nan=False).encode('utf-8')
+        except ValueError:
+            # Infinity and NaN are not JSON
+            status = HTTPStatus.UNPROCESSABLE_ENTITY
+            body = json.dumps({'error': "The result has values JSON cannot represent"}).encode('utf-8')
+        writer.write(_head(status, keep_alive, [('Content-Length', str(len(body)))]) + body)
+        await writer.drain()
+
+    async def _send_error(self, writer, status, message, keep_alive):
+        await self._send_json(writer, status, {'error': message}, keep_alive)
+
+
+def _parse_head(head):
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, version = lines[0].split(' ')
+    if not version.startswith('HTTP/1.'):
+        raise ValueError(version)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _expect(method, allowed):
+    if method != allowed:
+        raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {allowed}")
+
+
+def _head(status, keep_alive, headers):
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def _write_chunk(writer, data):
+    writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, batch_size=BATCH_SIZE,
+                batch_window=BATCH_WINDOW):
+    service = SchedulingService(workers, batch_size, batch_window)
+    server = await service.start(host, port)
+    print(f"Scheduling service on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the scheduler over HTTP on this machine")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU; 0 runs jobs on a thread)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="most small requests grouped into one worker job")
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW * 1000,
+                        help="milliseconds to wait for more small requests before dispatching a group")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.batch_size, args.batch_window / 1000))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+"""Minimum-energy speed scaling for tasks with deadlines (Yao, Demers, Shenker).
+
+Each task has to do ``burst`` units of work between its arrival and its
+deadline on one core whose clock can be set anywhere between the slowest
+and fastest dvfs operating points. For any convex power curve, and the
+dvfs V^2 * f curve is convex, YDS gives the feasible speed profile of least
+energy. It runs the densest interval, the one with the most work that must
+be done inside it per unit of its length, at exactly that density. Then it
+cuts that interval out of the timeline and repeats.
+
+Finding the densest interval one at a time takes quadratic time per
+interval. Here the same profile comes from splitting instead: at the mean
+density g of a task set, the set K of elementary intervals (the gaps
+between consecutive arrivals and deadlines) that maximizes
+``work inside K - g * length of K`` holds exactly the tasks that run faster
+than g. That split takes one left-to-right pass with a stack of candidate
+starts (``_split``). Splitting the inside and the cut-down outside again,
+until no set beats its own mean, gives every YDS speed level. Each pass is
+linear, and the splits behave like quicksort partitions, so 100k tasks are
+solved in seconds.
+
+The power of a task at speed s is its nominal power times the dvfs power
+scale at s. That scale is the same for every task, so the profile is
+optimal for the core as a whole. Task power only weights the reported
+energy.
+"""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+import dvfs
+from engine import Schedule
+from taskbatch import TaskBatch
+from traceio import task_deadlines
+
+POLICY = "Min-Energy (YDS)"
+
+# Clock speeds relative to the nominal operating point, fastest first
+_SPEEDS = 1 / dvfs.TIME_SCALE
+_VOLTAGES = np.array([v for _, v in dvfs.OPERATING_POINTS])
+MAX_SPEED = float(_SPEEDS[0])
+MIN_SPEED = float(_SPEEDS[-1])
+# Work left over from rounding is ignored below this fraction of a burst
+RELATIVE_TOLERANCE = 1e-9
+
+SpeedScaledRun = namedtuple('SpeedScaledRun', 'schedule speeds missed')
+
+
+def power_scale(speed):
+    """Power relative to nominal at clock ``speed``, with voltage interpolated between points"""
+    speed = np.asarray(speed, np.float64)
+    voltage = np.interp(speed, _SPEEDS[::-1], _VOLTAGES[::-1]) / dvfs.NOMINAL_VOLTAGE
+    return voltage ** 2 * speed
+
+
+def _split(lengths, starts, ends, works, density, tolerance):
+    """Flags of the largest set of intervals maximizing its work minus ``density`` times its length.
+
+    Tasks occupy intervals [starts[j], ends[j]) and count as work only if
+    all of them are in the set. Returns None if no set beats the empty one
+    by more than ``tolerance``.
+
+    V[i] is the best value using intervals before i. A run [s, i) scores
+    A(s) - density * T(i), where T is the prefix length and
+    A(s) = V[s] + density * T(s) + (work of tasks inside [s, i)). A task
+    ending at i adds its work to A(s) for every s up to its start, so an
+    older start gains at least as much as a newer one from then on. A start
+    whose A is no higher than an older one can never win again and is
+    dropped. The live starts then have increasing A, the newest is the best
+    one, and they are kept as differences from their predecessor so that
+    adding to a prefix changes a single difference.
+    """
+    m = len(lengths)
+    by_end = [[] for _ in range(m + 1)]
+    for start, end, work in zip(starts, ends, works):
+        by_end[end].append((start, work))
+
+    # Nearest live start at or before s, via path halving over dropped starts
+    parent = list(range(m + 1))
+    after = [-1] * (m + 1)
+    gap = [0.0] * (m + 1)
+    top, top_value = 0, 0.0
+    value = [0.0] * (m + 1)
+    run_start = [-1] * (m + 1)
+    elapsed = 0.0
+
+    for i in range(1, m + 1):
+        elapsed += lengths[i - 1]
+        for start, work in by_end[i]:
+            p = start
+            while parent[p] != p:
+                parent[p] = parent[parent[p]]
+                p = parent[p]
+            q = after[p]
+            if q < 0:
+                top_value += work
+                continue
+            gap[q] -= work
+            while q >= 0 and gap[q] <= tolerance:
+                parent[q] = p
+                r = after[q]
+                if r < 0:
+                    top, top_value = p, top_value - gap[q]
+                else:
+                    gap[r] += gap[q]
+                after[p] = r
+                q = r
+
+        best = top_value - density * elapsed
+        if best >= value[i - 1] - tolerance:
+            value[i], run_start[i] = best, top
+        else:
+            value[i] = value[i - 1]
+
+        candidate = value[i] + density * elapsed
+        if candidate > top_value + tolerance:
+            after[top] = i
+            gap[i] = candidate - top_value
+            top, top_value = i, candidate
+        else:
+            parent[i] = i - 1
+
+    if value[m] <= tolerance:
+        return None
+    inside = np.zeros(m, bool)
+    i = m
+    while i > 0:
+        if run_start[i] < 0:
+            i -= 1
+        else:
+            inside[run_start[i]:i] = True
+            i = run_start[i]
+    return inside
+
+
+def yds_levels(arrival, work, deadline):
+    """Split tasks into YDS speed levels.
+
+    Returns the sorted distinct arrival/deadline times and a list of
+    (speed, interval indices, task indices) tuples, one per level. Interval
+    k runs from ``times[k]`` to ``times[k + 1]``. Each level's tasks do all
+    their work in its intervals at its speed, and no two levels share an
+    interval.
+    """
+    arrival = np.asarray(arrival, np.float64)
+    work = np.asarray(work, np.float64)
+    deadline = np.asarray(deadline, np.float64)
+    times, index = np.unique(np.concatenate((arrival, deadline)), return_inverse=True)
+    first, last = index[:len(arrival)], index[len(arrival):]
+    interval_lengths = np.diff(times)
+
+    levels = []
+    pending = [(np.arange(len(interval_lengths)), np.arange(len(arrival)))]
+    while pending:
+        intervals, jobs = pending.pop()
+        if not len(jobs):
+            continue
+        starts = np.searchsorted(intervals, first[jobs])
+        ends = np.searchsorted(intervals, last[jobs])
+        # Intervals no task can use are idle and take no part in the density
+        cover = np.zeros(len(intervals) + 1, np.int64)
+        np.add.at(cover, starts, 1)
+        np.add.at(cover, ends, -1)
+        used = np.cumsum(cover[:-1]) > 0
+        if not used.all():
+            intervals = intervals[used]
+            starts = np.searchsorted(intervals, first[jobs])
+            ends = np.searchsorted(intervals, last[jobs])
+
+        lengths = interval_lengths[intervals]
+        total = float(work[jobs].sum())
+        density = total / float(lengths.sum())
+        inside = None
+        if len(jobs) > 1:
+            inside = _split(lengths.tolist(), starts.tolist(), ends.tolist(), work[jobs].tolist(), density,
+                            RELATIVE_TOLERANCE * total)
+        if inside is None or inside.all():
+            levels.append((density, intervals, jobs))
+            continue
+        # A task is inside K if none of its intervals are outside it
+        outside = np.concatenate(([0], np.cumsum(~inside)))
+        contained = outside[ends] == outside[starts]
+        pending.append((intervals[inside], jobs[contained]))
+        pending.append((intervals[~inside], jobs[~contained]))
+    return times, levels
+
+
+def _run_level(times, intervals, jobs, speed, arrival, work, deadline, firm, slices, done):
+    """EDF over one level's intervals at ``speed``, appending (task, start, end) slices.
+
+    ``done`` receives the work each task completed. With ``firm`` set, the
+    speed is below what the level needs, and a task still unfinished at its
+    deadline is abandoned.
+    """
+    order = jobs[np.argsort(arrival[jobs], kind='stable')].tolist()
+    remaining = {j: float(work[j]) for j in order}
+    ready = []
+    next_job = 0
+    t = 0.0
+    for k in intervals.tolist():
+        t, end = float(times[k]), float(times[k + 1])
+        while next_job < len(order) and arrival[order[next_job]] <= t:
+            j = order[next_job]
+            heapq.heappush(ready, (deadline[j], j))
+            next_job += 1
+        while ready and t < end:
+            due, j = ready[0]
+            if firm and due <= t:
+                heapq.heappop(ready)
+                done[j] = work[j] - remaining[j]
+                continue
+            run = min(remaining[j] / speed, end - t)
+            slices.append((j, t, t + run))
+            t += run
+            remaining[j] -= run * speed
+            if remaining[j] <= RELATIVE_TOLERANCE * work[j]:
+                heapq.heappop(ready)
+                done[j] = work[j]
+    # Rounding may leave a sliver of work at the very end of the last interval
+    for _, j in ready:
+        done[j] = work[j] if not firm or remaining[j] <= RELATIVE_TOLERANCE * work[j] else work[j] - remaining[j]
+
+
+def schedule_min_energy(tasks, deadlines=None, max_speed=MAX_SPEED, min_speed=MIN_SPEED):
+    """Schedule ``tasks`` on one core at the YDS minimum-energy speeds; returns a SpeedScaledRun.
+
+    ``deadlines`` defaults to ``traceio.task_deadlines(tasks)``; None or
+    NaN (as from ``traceio.load_deadlines``) means none. A task without a
+    deadline has to finish by the latest deadline given, or by the time
+    FCFS at nominal speed would finish everything if that is later. Levels
+    that need more than ``max_speed`` run at it instead, and their tasks
+    may miss deadlines; ``missed`` lists those task ids. A missed task is
+    abandoned at its deadline and appears in the schedule with the burst it
+    actually got. A task that never ran is left out. ``speeds`` gives each
+    task's clock relative to nominal, in the order of the task set.
+    """
+    batch = tasks if isinstance(tasks, TaskBatch) else TaskBatch.from_tasks(tasks)
+    if deadlines is None:
+        deadlines = task_deadlines(tasks)
+    arrival = batch.arrival.astype(np.float64)
+    work = batch.burst.astype(np.float64)
+    n = len(batch)
+
+    given = np.array([np.nan if d is None else d for d in deadlines], np.float64).reshape(n)
+    finish = 0.0
+    for a, b in zip(np.sort(arrival).tolist(), work[np.argsort(arrival, kind='stable')].tolist()):
+        finish = max(finish, a) + b
+    horizon = max(finish, float(np.nanmax(given)) if np.any(~np.isnan(given)) else finish)
+    deadline = np.where(np.isnan(given), horizon, given)
+    late = np.flatnonzero((deadline <= arrival) & (work > 0))
+    if len(late):
+        raise ValueError(f"Task {batch.ids[late[0]]} has a deadline at or before its arrival")
+
+    speeds = np.zeros(n)
+    done = np.zeros(n)
+    slices = []
+    active = np.flatnonzero(work > 0)
+    if len(active):
+        times, levels = yds_levels(arrival[active], work[active], deadline[active])
+        for density, intervals, jobs in levels:
+            jobs = active[jobs]
+            speed = min(max(density, min_speed), max_speed)
+            speeds[jobs] = speed
+            _run_level(times, intervals, jobs, speed, arrival, work, deadline, density > max_speed,
+                       slices, done)
+
+    # One record per task, its burst and power scaled to the speed it ran at
+    ids, priority, power = batch.ids.tolist(), batch.priority.tolist(), batch.power.tolist()
+    scaled_power = power_scale(np.maximum(speeds, min_speed)).tolist()
+    records = [(ids[j], float(arrival[j]), float(done[j] / speeds[j]) if speeds[j] else 0.0,
+                power[j] * scaled_power[j], priority[j]) for j in range(n)]
+
+    events = []
+    first_start = {}
+    last_end = {}
+    for j, start, end in slices:
+        first_start.setdefault(j, start)
+        last_end[j] = end
+    for j, start, end in slices:
+        events.append((records[j], start, end, first_start[j] if end == last_end[j] else None, 0))
+    for j in np.flatnonzero(work <= 0).tolist():
+        events.append((records[j], float(arrival[j]), float(arrival[j]), float(arrival[j]), 0))
+    events.sort(key=lambda event: (event[2], event[3] is not None))
+
+    missed = [ids[j] for j in range(n) if done[j] < work[j] * (1 - RELATIVE_TOLERANCE)]
+    return SpeedScaledRun(Schedule(POLICY, preemptive=True).collect(events), speeds, missed)
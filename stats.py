@@ -0,0 +1,148 @@
+"""Streaming statistics that can be merged across worker processes.
+
+Both accumulators take values one at a time or as whole arrays, use a
+fixed amount of memory however many values they have seen, and combine
+with ``merge`` so per-worker results can be reduced without keeping the
+underlying samples.
+"""
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    """Count, mean, variance, min and max (Welford, merged with Chan's update)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            other = RunningStats()
+            other.count = values.size
+            other.mean = float(values.mean())
+            other._m2 = float(((values - other.mean) ** 2).sum())
+            other.min = float(values.min())
+            other.max = float(values.max())
+            self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (0 for fewer than two values)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Quantiles with a bounded relative error from logarithmic buckets.
+
+    A value x lands in bucket ceil(log_gamma |x|) with gamma = (1 + a) / (1 - a),
+    and every value in a bucket is reported as the same representative, which
+    is within ``relative_accuracy`` (a) of it. The number of buckets grows
+    with the log of the value range, not with the number of values.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+        self._zeros = 0
+        self.count = 0
+
+    def _bucket(self, magnitude):
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, bucket):
+        return 2 * self._gamma ** bucket / (self._gamma + 1)
+
+    def add(self, value):
+        self.count += 1
+        if value > 0:
+            bucket = self._bucket(value)
+            self._positive[bucket] = self._positive.get(bucket, 0) + 1
+        elif value < 0:
+            bucket = self._bucket(-value)
+            self._negative[bucket] = self._negative.get(bucket, 0) + 1
+        else:
+            self._zeros += 1
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += values.size
+        self._zeros += int(np.count_nonzero(values == 0))
+        for buckets, magnitudes in ((self._positive, values[values > 0]), (self._negative, -values[values < 0])):
+            if magnitudes.size:
+                keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                                         return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    buckets[key] = buckets.get(key, 0) + count
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        for buckets, others in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, count in others.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self._zeros += other._zeros
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Estimated q-quantile (0 <= q <= 1), or nan when the sketch is empty"""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        # Walk from the most negative value to the most positive one
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self._zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self._positive))
@@ -0,0 +1,201 @@
+"""Monte Carlo parameter sweeps over seeded random workloads.
+
+Every (seed, policy, cores, profile) combination is one simulation. Seeds
+are split into chunks that worker processes handle independently: each
+worker generates the workload for a seed once, runs every combination on
+it, and folds the results into mergeable RunningStats/QuantileSketch
+accumulators. Per-task waiting, turnaround and response times of every
+run are folded into a metrics.ScheduleMetrics per group the same way, so
+the summary reports tail latency over all tasks as well. Only those
+accumulators travel back to the parent, so the sweep scales with the
+number of cores and its memory does not grow with the number of runs.
+Arrivals are spread over a span that grows with the task count, as in
+bench.workload, so each workload keeps the offered load (--load) of the
+single core whatever its size.
+With --cache-dir each run's results are also kept on disk, so repeating
+or extending a sweep only simulates what is new.
+
+    python sweep.py --seeds 1000 --tasks 5000 --cores 1 4 --profile Balanced Auto -o summary.csv
+"""
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from compare import summarize
+from engine import POLICIES, simulate
+from metrics import TIME_METRICS, ScheduleMetrics
+from schedcache import ScheduleCache
+from stats import QuantileSketch, RunningStats
+from taskbatch import LOAD, MEAN_BURST, TaskBatch
+
+METRICS = ('total_energy', 'avg_power', 'makespan', 'avg_waiting', 'avg_turnaround')
+QUANTILES = (0.5, 0.95, 0.99)
+SUMMARY_FIELDS = ('policy', 'cores', 'profile', 'metric', 'count', 'mean', 'std', 'min', 'max',
+                  'p50', 'p95', 'p99')
+
+
+class Aggregate:
+    """Streaming statistics for every metric of one (policy, cores, profile) group"""
+
+    def __init__(self):
+        self.stats = {metric: RunningStats() for metric in METRICS}
+        self.sketches = {metric: QuantileSketch() for metric in METRICS}
+        # Over every task of every run rather than per run
+        self.tasks = ScheduleMetrics()
+
+    def add(self, summary, metrics):
+        for metric in METRICS:
+            self.stats[metric].add(summary[metric])
+            self.sketches[metric].add(summary[metric])
+        self.tasks.merge(metrics)
+
+    def merge(self, other):
+        for metric in METRICS:
+            self.stats[metric].merge(other.stats[metric])
+            self.sketches[metric].merge(other.sketches[metric])
+        self.tasks.merge(other.tasks)
+        return self
+
+
+def _workload(num_tasks, seed, load=LOAD):
+    """Seeded TaskBatch whose arrivals are spaced to offer ``load`` times one core's capacity"""
+    return TaskBatch.random(num_tasks, seed=seed, max_arrival=int(num_tasks * MEAN_BURST / load))
+
+
+def _run_seeds(seeds, num_tasks, policies, core_counts, profiles, options, cache_dir=None, load=LOAD):
+    """Worker: simulate every combination for a chunk of seeds and aggregate locally"""
+    # Only summaries are cached, and only on disk: nothing repeats within a worker
+    cache = ScheduleCache(0, cache_dir) if cache_dir is not None else None
+    groups = {}
+    for seed in seeds:
+        # Every combination sees the same workload for a seed, so groups are paired
+        batch = _workload(num_tasks, seed, load)
+        for policy in policies:
+            for cores in core_counts:
+                for profile in profiles:
+                    result = None
+                    if cache is not None:
+                        cache_key = cache.key(batch, policy, kind='metrics', cores=cores, profile=profile,
+                                              **options)
+                        result = cache.get(cache_key)
+                    if result is None:
+                        schedule = simulate(batch, policy, cores=cores, profile=profile, **options)
+                        result = summarize(schedule, curve=False), ScheduleMetrics.from_schedule(schedule)
+                        if cache is not None:
+                            cache.put(cache_key, result)
+                    key = (policy, cores, profile)
+                    if key not in groups:
+                        groups[key] = Aggregate()
+                    groups[key].add(*result)
+    return groups
+
+
+def sweep(seeds, num_tasks=1000, policies=None, core_counts=(1,), profiles=("Balanced",),
+          processes=None, chunks_per_worker=4, cache_dir=None, load=LOAD, **options):
+    """Run the sweep and return {(policy, cores, profile): Aggregate}.
+
+    ``options`` (quantum, switch_cost, partitioned) are passed on to
+    engine.simulate. Seeds are split into about ``chunks_per_worker`` chunks
+    per worker so that slow chunks do not leave other workers idle at the end.
+    Run summaries found in the schedcache directory ``cache_dir`` are reused.
+    ``load`` is the offered load of each workload relative to one core.
+    """
+    seeds = list(seeds)
+    policies = list(POLICIES) if policies is None else list(policies)
+    if not load > 0:
+        raise ValueError("load must be positive")
+    args = (num_tasks, policies, tuple(core_counts), tuple(profiles), options, cache_dir, load)
+    workers = min(processes or os.cpu_count() or 1, max(len(seeds), 1))
+
+    results = {}
+
+    def fold(groups):
+        for key, aggregate in groups.items():
+            if key in results:
+                results[key].merge(aggregate)
+            else:
+                results[key] = aggregate
+
+    if workers <= 1:
+        fold(_run_seeds(seeds, *args))
+        return results
+
+    size = max(1, -(-len(seeds) // (workers * chunks_per_worker)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_seeds, seeds[i:i + size], *args) for i in range(0, len(seeds), size)]
+        # Fold each chunk in as soon as it is done so finished results are not held
+        for future in as_completed(futures):
+            fold(future.result())
+    return results
+
+
+def _group_order(item):
+    (policy, cores, profile), _ = item
+    return POLICIES.index(policy), cores, profile
+
+
+def summary_rows(results):
+    """One row per group and metric, in SUMMARY_FIELDS order.
+
+    Run metrics are followed by the task_* rows, whose statistics are taken
+    over the tasks of all of the group's runs.
+    """
+    rows = []
+    for (policy, cores, profile), aggregate in sorted(results.items(), key=_group_order):
+        for metric in METRICS:
+            stats, sketch = aggregate.stats[metric], aggregate.sketches[metric]
+            rows.append((policy, cores, profile, metric, stats.count, stats.mean, stats.std,
+                         stats.min, stats.max) + tuple(sketch.quantile(q) for q in QUANTILES))
+        tasks = aggregate.tasks
+        for metric in TIME_METRICS:
+            stats = tasks.stats[metric]
+            rows.append((policy, cores, profile, f'task_{metric}', stats.count, stats.mean, stats.std,
+                         stats.min, stats.max) + tuple(tasks.quantile(metric, q) for q in QUANTILES))
+    return rows
+
+
+def write_summary(path, results):
+    """Write the sweep summary as CSV, or as JSON for any other extension"""
+    rows = summary_rows(results)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            writer = csv.writer(f)
+            writer.writerow(SUMMARY_FIELDS)
+            writer.writerows(rows)
+        else:
+            json.dump([dict(zip(SUMMARY_FIELDS, row)) for row in rows], f, indent=2)
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo sweep over seeded random workloads")
+    parser.add_argument('--seeds', type=int, default=100, help="number of seeded workloads")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--tasks', type=int, default=1000, help="tasks per workload")
+    parser.add_argument('--load', type=float, default=LOAD,
+                        help="offered load of each workload relative to one core (default %(default)s)")
+    parser.add_argument('--policy', nargs='+', choices=POLICIES, default=None)
+    parser.add_argument('--cores', nargs='+', type=int, default=[1])
+    parser.add_argument('--profile', nargs='+', default=["Balanced"])
+    parser.add_argument('--quantum', type=float, default=2)
+    parser.add_argument('--switch-cost', type=float, default=0)
+    parser.add_argument('--partitioned', action='store_true')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--cache-dir', default=None,
+                        help="reuse run summaries stored here by earlier sweeps (e.g. ~/.cpu_scheduler/cache)")
+    parser.add_argument('-o', '--output', default='sweep_summary.json')
+    args = parser.parse_args(argv)
+
+    results = sweep(range(args.first_seed, args.first_seed + args.seeds), args.tasks, args.policy,
+                    args.cores, args.profile, processes=args.processes, cache_dir=args.cache_dir,
+                    load=args.load,
+                    quantum=args.quantum,
+                    switch_cost=args.switch_cost, partitioned=args.partitioned)
+    count = write_summary(args.output, results)
+    print(f"Wrote {count} summary rows for {len(results)} groups to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 class Task:
-    def __init__(self, arrival, burst, power):
+    def __init__(self, arrival, burst, power, deadline=None):
         self.arrival = arrival
         self.burst = burst
         self.power = power
+        # Time by which the task must finish, or None if it has no deadline
+        self.deadline = deadline
 
     def energy(self):
         """Calculate energy consumption for this task."""
         return self.burst * self.power
 
     def __str__(self):
-        return f"Task(Arrival: {self.arrival}, Burst: {self.burst}, Power: {self.power}, Energy: {self.energy()})"
+        deadline = f", Deadline: {self.deadline}" if self.deadline is not None else ""
+        return (f"Task(Arrival: {self.arrival}, Burst: {self.burst}, Power: {self.power}{deadline}, "
+                f"Energy: {self.energy()})")
@@ -0,0 +1,231 @@
+"""Columnar task sets backed by NumPy arrays.
+
+A TaskBatch keeps one array per field instead of one Python object per
+task, and each integer column uses the narrowest dtype that fits its
+values. Tens of millions of tasks fit in a few hundred MB this way. FCFS
+timelines and energy totals are computed over whole columns at once.
+"""
+import hashlib
+from itertools import chain
+
+import numpy as np
+
+from engine import ID, ARRIVAL, BURST, POWER, PRIORITY
+
+# Mean burst of TaskBatch.random's default 1..10 range, and the share of one
+# core that generated workloads keep busy when their arrivals are spaced out
+MEAN_BURST = 5.5
+LOAD = 0.9
+
+
+def _narrow(values):
+    """Return ``values`` as an array using the smallest integer dtype that fits"""
+    arr = np.asarray(values)
+    if arr.dtype.kind not in 'iu' or arr.size == 0:
+        return arr
+    return arr.astype(np.result_type(np.min_scalar_type(arr.min()), np.min_scalar_type(arr.max())),
+                      copy=False)
+
+
+class TaskBatch:
+    """A set of tasks stored column-wise"""
+
+    def __init__(self, arrival, burst, power, priority=None, ids=None, narrow=True):
+        # narrow=False keeps the given arrays as they are, e.g. memory-mapped
+        # columns that would otherwise be copied into memory
+        fit = _narrow if narrow else np.asarray
+        self.arrival = fit(arrival)
+        self.burst = fit(burst)
+        self.power = fit(power)
+        n = len(self.arrival)
+        if len(self.burst) != n or len(self.power) != n:
+            raise ValueError("TaskBatch columns must all have the same length")
+        self.priority = fit(np.ones(n, dtype=np.int8) if priority is None else priority)
+        # Ids default to 1..n and are only materialized when asked for
+        self._ids = None if ids is None else fit(ids)
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """Build a batch from GUI task dicts, task.Task objects or engine records"""
+        from engine import normalize_tasks
+        records = normalize_tasks(tasks)
+        if not records:
+            return cls([], [], [])
+        ids, arrival, burst, power, priority = zip(*records)
+        return cls(arrival, burst, power, priority, ids)
+
+    @classmethod
+    def random(cls, n, seed=None, max_arrival=20, max_burst=10, max_power=5, max_priority=5):
+        """Random workload drawn with the same ranges as the GUI generator"""
+        rng = np.random.default_rng(seed)
+        return cls(rng.integers(0, max_arrival, n, endpoint=True),
+                   rng.integers(1, max_burst, n, endpoint=True),
+                   rng.integers(1, max_power, n, endpoint=True),
+                   rng.integers(1, max_priority, n, endpoint=True))
+
+    def __len__(self):
+        return len(self.arrival)
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            return np.arange(1, len(self) + 1, dtype=np.min_scalar_type(len(self)))
+        return self._ids
+
+    @property
+    def nbytes(self):
+        total = self.arrival.nbytes + self.burst.nbytes + self.power.nbytes + self.priority.nbytes
+        return total + (self._ids.nbytes if self._ids is not None else 0)
+
+    def copy(self):
+        return TaskBatch(self.arrival.copy(), self.burst.copy(), self.power.copy(),
+                         self.priority.copy(), None if self._ids is None else self._ids.copy())
+
+    def take(self, index):
+        """Batch holding the tasks at ``index``, in that order.
+
+        Columns are already narrowed, so a slice of a memory-mapped batch
+        stays a view of the file.
+        """
+        return TaskBatch(self.arrival[index], self.burst[index], self.power[index],
+                         self.priority[index], self.ids[index], narrow=False)
+
+    def digest(self):
+        """SHA-256 hex digest of the task set's contents, independent of column dtypes"""
+        sha = hashlib.sha256(len(self).to_bytes(8, 'little'))
+        for column in (self.ids, self.arrival, self.burst, self.power, self.priority):
+            if column.dtype.kind in 'iufb':
+                sha.update(np.ascontiguousarray(column, dtype='<f8').tobytes())
+            else:
+                sha.update('\0'.join(map(str, column.tolist())).encode('utf-8'))
+        return sha.hexdigest()
+
+    def energy(self):
+        """Per-task energy (burst * power)"""
+        return np.multiply(self.burst, self.power, dtype=np.result_type(self.burst, self.power, np.int64))
+
+    def total_energy(self):
+        return self.energy().sum()
+
+    def to_records(self):
+        """Engine task records for the policies that need the event loop"""
+        return list(zip(self.ids.tolist(), self.arrival.tolist(), self.burst.tolist(),
+                        self.power.tolist(), self.priority.tolist()))
+
+    def to_dicts(self):
+        """Tasks in the dict layout used by the GUI and the JSON task files"""
+        return [
+            {'id': task[ID], 'arrival': task[ARRIVAL], 'burst': task[BURST],
+             'power': task[POWER], 'priority': task[PRIORITY]}
+            for task in self.to_records()
+        ]
+
+    def arrival_order(self):
+        """Stable index that sorts the batch by arrival, or None if already sorted"""
+        arrival = self.arrival
+        if len(arrival) < 2 or bool(np.all(arrival[1:] >= arrival[:-1])):
+            return None
+        return np.argsort(arrival, kind='stable')
+
+    def fcfs(self):
+        """Vectorized FCFS timeline on a single CPU, returned as a BatchSchedule.
+
+        With tasks in arrival order and C the running sum of bursts, each end
+        time satisfies end[i] = max(end[i-1], arrival[i]) + burst[i], which
+        unrolls to end[i] = C[i] + max over j <= i of (arrival[j] - C[j-1]).
+        That inner maximum is a single ``np.maximum.accumulate``.
+        """
+        order = self.arrival_order()
+        batch = self if order is None else self.take(order)
+
+        wide = np.float64 if batch.burst.dtype.kind == 'f' or batch.arrival.dtype.kind == 'f' else np.int64
+        burst = batch.burst.astype(wide)
+        end = np.cumsum(burst)
+        slack = np.subtract(batch.arrival, end, dtype=wide)
+        slack += burst
+        np.maximum.accumulate(slack, out=slack)
+        if len(slack) and slack[0] < 0:
+            # The CPU clock starts at 0, so negative arrivals cannot start earlier
+            np.maximum(slack, 0, out=slack)
+        end += slack
+        # The slack buffer is no longer needed, reuse it for the start times
+        start = np.subtract(end, burst, out=slack)
+
+        return BatchSchedule("FCFS", batch, start, end, makespan=end[-1].item() if len(end) else 0)
+
+
+class BatchSchedule:
+    """Schedule computed over a TaskBatch, with the same read API as engine.Schedule"""
+
+    preemptive = False
+    num_cores = 1
+
+    def __init__(self, policy, batch, starts, ends, makespan=None):
+        self.policy = policy
+        self.batch = batch
+        self.starts = starts
+        self.ends = ends
+        self.cores = np.zeros(len(batch), dtype=np.uint16)
+        self.energies = batch.energy()
+        self.total_energy = self.energies.sum().item() if len(batch) else 0
+        if makespan is None:
+            makespan = ends.max().item() if len(batch) else 0
+        self.makespan = makespan
+
+    def __len__(self):
+        return len(self.batch)
+
+    @property
+    def avg_power(self):
+        return self.total_energy / self.makespan if self.makespan > 0 else 0
+
+    @property
+    def tasks(self):
+        return self.batch.to_records()
+
+    def slices(self):
+        return zip(self.batch.to_records(), self.starts.tolist(), self.ends.tolist(), self.cores.tolist())
+
+    def to_dicts(self):
+        rows = self.batch.to_dicts()
+        for row, start, end, energy in zip(rows, self.starts.tolist(), self.ends.tolist(),
+                                           self.energies.tolist()):
+            row['start'] = start
+            row['end'] = end
+            row['energy'] = energy
+            row['core'] = 0
+        return rows
+
+
+SCHEDULE_COLUMNS = ('id', 'arrival', 'burst', 'power', 'priority', 'start', 'end', 'energy', 'core')
+
+
+def schedule_columns(schedule):
+    """Per-task columns of an engine.Schedule or BatchSchedule as a dict of arrays.
+
+    Rows are in the schedule's completion order, keyed by SCHEDULE_COLUMNS.
+    """
+    batch = getattr(schedule, 'batch', None)
+    if batch is None:
+        tasks = schedule.tasks
+        try:
+            fields = np.fromiter(chain.from_iterable(tasks), np.float64, len(tasks) * 5).reshape(len(tasks), 5)
+            ids = fields[:, ID].astype(np.int64) if np.all(np.mod(fields[:, ID], 1) == 0) else fields[:, ID]
+        except (TypeError, ValueError):
+            # Non-numeric task ids
+            fields = np.array([task[ARRIVAL:] for task in tasks], dtype=np.float64).reshape(len(tasks), 4)
+            fields = np.column_stack((np.zeros(len(tasks)), fields))
+            ids = np.array([task[ID] for task in tasks], dtype=object)
+        batch = TaskBatch(fields[:, ARRIVAL], fields[:, BURST], fields[:, POWER], fields[:, PRIORITY], ids,
+                          narrow=False)
+    return {
+        'id': batch.ids,
+        'arrival': batch.arrival,
+        'burst': batch.burst,
+        'power': batch.power,
+        'priority': batch.priority,
+        'start': np.asarray(schedule.starts, np.float64),
+        'end': np.asarray(schedule.ends, np.float64),
+        'energy': np.asarray(schedule.energies),
+        'core': np.asarray(schedule.cores),
+    }
@@ -0,0 +1,36 @@
+from task import Task
+from traceio import iter_records, load_batch, load_deadlines, write_tasks
+
+RECORDS = [(1, 0, 3, 2, 1), (2, 1, 2, 4, 1), (3, 4, 1, 1, 2)]
+
+
+def test_write_tasks_streams_a_generator(tmp_path):
+    path = str(tmp_path / 'tasks.jsonl')
+    assert write_tasks(path, (record for record in RECORDS)) == 3
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_write_tasks_copies_a_trace_record_by_record(tmp_path):
+    src, dst = str(tmp_path / 'tasks.csv'), str(tmp_path / 'copy.csv.gz')
+    write_tasks(src, RECORDS)
+    assert write_tasks(dst, iter_records(src)) == 3
+    assert list(iter_records(dst)) == RECORDS
+
+
+def test_write_tasks_keeps_deadlines(tmp_path):
+    path = str(tmp_path / 'tasks.csv')
+    write_tasks(path, [Task(0, 3, 2, deadline=5), Task(1, 2, 4)])
+    deadlines = load_deadlines(path)
+    assert deadlines[0] == 5 and deadlines[1] != deadlines[1]
+    assert write_tasks(path, RECORDS, [9, None, float('nan')]) == 3
+    assert list(load_deadlines(path)[:1]) == [9]
+
+
+def test_load_batch_reads_deadlines_in_the_same_pass(tmp_path):
+    path = str(tmp_path / 'tasks.jsonl')
+    write_tasks(path, RECORDS, [None, 7, None])
+    batch, deadlines = load_batch(path, chunk_size=2, deadlines=True)
+    assert batch.to_records() == RECORDS
+    assert deadlines[1] == 7 and (deadlines != deadlines)[[0, 2]].all()
+    write_tasks(path, RECORDS)
+    assert load_batch(path, deadlines=True)[1] is None
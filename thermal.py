@@ -0,0 +1,218 @@
+"""Lumped RC thermal model of the cores, driven by a schedule's power draw.
+
+Each core is a heat capacity C tied to ambient through a thermal
+resistance R, so that C dT/dt = P(t) - (T - T_ambient) / R. The simulated
+timeline is cut into equal steps over which each core's power is averaged,
+and for constant power the exact update over a step of length dt is
+
+    T[k+1] = a T[k] + (1 - a) (T_ambient + R P[k]),   a = exp(-dt / RC)
+
+That recurrence is solved for all cores at once, a chunk of steps at a
+time, as a scaled cumulative sum, so a run of millions of steps takes
+milliseconds of NumPy rather than a Python loop per step.
+
+``simulate_throttled`` closes the loop: tasks that ran while their core
+was at the temperature limit are clocked down one dvfs operating point
+(longer bursts, lower power) and the task set is scheduled again, until
+no task runs hot or every hot task is at the slowest point.
+"""
+import math
+from collections import namedtuple
+from itertools import chain
+
+import numpy as np
+
+import dvfs
+from engine import ARRIVAL, ID, POWER, is_batch, simulate
+from taskbatch import TaskBatch, schedule_columns
+
+DEFAULT_AMBIENT = 40.0
+# Degrees C per watt, and R * C in simulated time units
+DEFAULT_RESISTANCE = 8.0
+DEFAULT_TIME_CONSTANT = 20.0
+# Steps per time constant, and the most steps a trace may have
+STEPS_PER_TIME_CONSTANT = 8
+MAX_STEPS = 1 << 20
+# Chunks span at most this many time constants, which bounds the growth of
+# the scaled cumulative sum to a factor of e ** CHUNK_EXPONENT
+CHUNK_EXPONENT = 30.0
+MAX_ROUNDS = 10
+
+# Throttle level n runs a task n operating points below nominal
+_NOMINAL = dvfs.PROFILES["Balanced"]
+THROTTLE_TIME = dvfs.TIME_SCALE[_NOMINAL:] / dvfs.TIME_SCALE[_NOMINAL]
+THROTTLE_POWER = dvfs.POWER_SCALE[_NOMINAL:] / dvfs.POWER_SCALE[_NOMINAL]
+MAX_THROTTLE = len(THROTTLE_TIME) - 1
+
+ThrottledRun = namedtuple('ThrottledRun', 'schedule trace levels rounds')
+
+
+def _slices(schedule):
+    """(ids, starts, ends, cores, power) arrays with one entry per executed slice"""
+    if not schedule.preemptive:
+        columns = schedule_columns(schedule)
+        return (columns['id'], columns['start'], columns['end'], columns['core'].astype(np.int64),
+                columns['power'].astype(np.float64))
+    tasks = schedule.slice_tasks
+    try:
+        fields = np.fromiter(chain.from_iterable(tasks), np.float64, len(tasks) * 5).reshape(len(tasks), 5)
+        ids = fields[:, ID]
+    except (TypeError, ValueError):
+        # Non-numeric task ids
+        fields = np.array([task[ARRIVAL:] for task in tasks], np.float64).reshape(len(tasks), 4)
+        fields = np.column_stack((np.zeros(len(tasks)), fields))
+        ids = np.array([task[ID] for task in tasks], dtype=object)
+    return (ids, np.frombuffer(schedule.slice_starts, np.float64), np.frombuffer(schedule.slice_ends, np.float64),
+            np.frombuffer(schedule.slice_cores, np.uint16).astype(np.int64), fields[:, POWER])
+
+
+class ThermalModel:
+    """Per-core RC thermal parameters; ``run`` turns a Schedule into a ThermalTrace"""
+
+    def __init__(self, ambient=DEFAULT_AMBIENT, resistance=DEFAULT_RESISTANCE,
+                 time_constant=DEFAULT_TIME_CONSTANT):
+        if resistance <= 0 or time_constant <= 0:
+            raise ValueError("Thermal resistance and time constant must be positive")
+        self.ambient = ambient
+        self.resistance = resistance
+        self.time_constant = time_constant
+
+    def step(self, makespan):
+        """Step length for a timeline of ``makespan`` time units"""
+        return max(self.time_constant / STEPS_PER_TIME_CONSTANT, makespan / MAX_STEPS)
+
+    def run(self, schedule, start_temperature=None):
+        """ThermalTrace of every core over the schedule, starting from ``start_temperature``"""
+        ids, starts, ends, cores, power = _slices(schedule)
+        makespan = float(schedule.makespan)
+        dt = self.step(makespan)
+        steps = max(1, math.ceil(makespan / dt))
+        grid = np.arange(steps + 1) * dt
+        num_cores = max(schedule.num_cores, int(cores.max()) + 1 if len(cores) else 1)
+
+        # Energy and busy time used so far are piecewise linear in time, so
+        # interpolating them at the grid points gives exact per-step averages
+        step_power = np.zeros((num_cores, steps))
+        step_busy = np.zeros((num_cores, steps))
+        order = np.lexsort((starts, cores))
+        bounds = np.searchsorted(cores[order], np.arange(num_cores + 1))
+        for core in range(num_cores):
+            index = order[bounds[core]:bounds[core + 1]]
+            if not len(index):
+                continue
+            times = np.column_stack((starts[index], ends[index])).ravel()
+            durations = ends[index] - starts[index]
+            energy = np.concatenate(([0], np.cumsum(durations * power[index])))
+            busy = np.concatenate(([0], np.cumsum(durations)))
+            # Flat between slices, rising during them
+            energy = np.column_stack((energy[:-1], energy[1:])).ravel()
+            busy = np.column_stack((busy[:-1], busy[1:])).ravel()
+            step_power[core] = np.diff(np.interp(grid, times, energy)) / dt
+            step_busy[core] = np.diff(np.interp(grid, times, busy)) / dt
+
+        first = self.ambient if start_temperature is None else start_temperature
+        temperatures = self._integrate(step_power, dt, first)
+        return ThermalTrace(self, grid, temperatures, step_busy.mean(axis=0), makespan,
+                            (ids, starts, ends, cores))
+
+    def _integrate(self, step_power, dt, first):
+        """Temperatures at every grid point for per-step power ``step_power`` (cores x steps)"""
+        cores, steps = step_power.shape
+        x = dt / self.time_constant
+        drive = self.ambient + self.resistance * step_power
+        temperatures = np.empty((cores, steps + 1))
+        temperatures[:, 0] = first
+        if x > CHUNK_EXPONENT:
+            # Every step is long enough to settle completely
+            temperatures[:, 1:] = drive
+            return temperatures
+        decay = math.exp(-x)
+        chunk = max(1, int(CHUNK_EXPONENT / x))
+        # Within a chunk, T[j] = a^j (T[0] + sum over i < j of (1 - a) drive[i] a^-(i+1))
+        growth = np.exp(x * np.arange(1, chunk + 1))
+        shrink = np.exp(-x * np.arange(1, chunk + 1))
+        for begin in range(0, steps, chunk):
+            end = min(begin + chunk, steps)
+            m = end - begin
+            scaled = np.cumsum((1 - decay) * drive[:, begin:end] * growth[:m], axis=1)
+            temperatures[:, begin + 1:end + 1] = (temperatures[:, begin:begin + 1] + scaled) * shrink[:m]
+        return temperatures
+
+
+class ThermalTrace:
+    """Core temperatures on an even time grid, with the utilization of each step"""
+
+    def __init__(self, model, times, temperatures, utilization, makespan, slices):
+        self.model = model
+        self.times = times
+        self.temperatures = temperatures
+        self.utilization = utilization
+        self.makespan = makespan
+        self._slices = slices
+
+    @property
+    def peak(self):
+        return float(self.temperatures.max())
+
+    def sample(self, t):
+        """{'temperature': hottest core, 'cpu_utilization': percent} at simulated time ``t``.
+
+        Past the end of the trace the cores are idle and cool towards ambient.
+        """
+        if t >= self.makespan:
+            cooling = math.exp(-(t - self.makespan) / self.model.time_constant)
+            hottest = max(float(np.interp(self.makespan, self.times, row)) for row in self.temperatures)
+            return {'temperature': self.model.ambient + (hottest - self.model.ambient) * cooling,
+                    'cpu_utilization': 0}
+        t = max(t, 0.0)
+        hottest = max(float(np.interp(t, self.times, row)) for row in self.temperatures)
+        step = min(int(t / (self.times[1] - self.times[0])), len(self.utilization) - 1)
+        return {'temperature': hottest, 'cpu_utilization': round(100 * float(self.utilization[step]))}
+
+    def hot_tasks(self, max_temperature):
+        """Ids of tasks whose core reached ``max_temperature`` while they ran.
+
+        Power is constant during a slice, so the core temperature moves
+        monotonically across it and its extremes are at the two ends.
+        """
+        ids, starts, ends, cores = self._slices
+        peak = np.empty(len(ids))
+        for core in range(len(self.temperatures)):
+            on_core = cores == core
+            row = self.temperatures[core]
+            peak[on_core] = np.maximum(np.interp(starts[on_core], self.times, row),
+                                       np.interp(ends[on_core], self.times, row))
+        return np.unique(ids[peak >= max_temperature])
+
+
+def simulate_throttled(tasks, policy="FCFS", max_temperature=85.0, model=None, quantum=2, switch_cost=0,
+                       cores=1, partitioned=False, profile=None, budget=None):
+    """Schedule ``tasks`` with thermal throttling and return a ThrottledRun.
+
+    ``levels`` gives each task's throttle level (0 = unthrottled) in the
+    order of the task set; task ids must be unique. The power profile is
+    applied first, and throttling scales bursts and power relative to it.
+    """
+    model = model or ThermalModel()
+    if profile is not None:
+        tasks = dvfs.apply_profile(tasks, profile, budget, cores)
+    batch = tasks if is_batch(tasks) else TaskBatch.from_tasks(tasks)
+    ids = batch.ids
+    by_id = np.argsort(ids, kind='stable')
+    if len(ids) > 1 and np.any(ids[by_id][1:] == ids[by_id][:-1]):
+        raise ValueError("Throttling needs unique task ids")
+
+    levels = np.zeros(len(batch), dtype=np.int8)
+    current = batch
+    for rounds in range(1, MAX_ROUNDS + 1):
+        schedule = simulate(current, policy, quantum=quantum, switch_cost=switch_cost, cores=cores,
+                            partitioned=partitioned)
+        trace = model.run(schedule)
+        hot = by_id[np.searchsorted(ids[by_id], trace.hot_tasks(max_temperature))]
+        hot = hot[levels[hot] < MAX_THROTTLE]
+        if not len(hot) or rounds == MAX_ROUNDS:
+            break
+        levels[hot] += 1
+        current = TaskBatch(batch.arrival, np.round(batch.burst * THROTTLE_TIME[levels], 3),
+                            np.round(batch.power * THROTTLE_POWER[levels], 3), batch.priority, ids)
+    return ThrottledRun(schedule, trace, levels, rounds)
@@ -0,0 +1,139 @@
+"""Compact binary task traces that are opened with a memory map.
+
+Layout (little endian):
+
+    offset 0   magic b'CPUTRACE', uint16 version, uint16 column count,
+               uint32 reserved, uint64 task count; padded to 64 bytes
+    offset 64  the id column, then arrival, burst, power and priority,
+               each stored contiguously as a fixed-width integer array
+
+Opening a trace maps those columns straight into a TaskBatch without
+copying, so only the pages the scheduler actually reads are loaded.
+"""
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'CPUTRACE'
+VERSION = 1
+EXTENSION = '.ctrace'
+HEADER = struct.Struct('<8sHHIQ')
+HEADER_SIZE = 64
+
+COLUMNS = (
+    ('id', np.dtype('<i8')),
+    ('arrival', np.dtype('<i8')),
+    ('burst', np.dtype('<i4')),
+    ('power', np.dtype('<i4')),
+    ('priority', np.dtype('<i4')),
+)
+
+
+def _offsets(count):
+    offsets = []
+    offset = HEADER_SIZE
+    for _, dtype in COLUMNS:
+        offsets.append(offset)
+        offset += count * dtype.itemsize
+    return offsets
+
+
+def _size(count):
+    """File size of a trace holding ``count`` tasks: the end of its last column"""
+    return HEADER_SIZE + count * sum(dtype.itemsize for _, dtype in COLUMNS)
+
+
+def read_header(path):
+    """Task count stored in a binary trace, after validating the header"""
+    with open(path, 'rb') as f:
+        magic, version, columns, _, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"Not a binary task trace: {path}")
+    if version != VERSION or columns != len(COLUMNS):
+        raise ValueError(f"Unsupported binary trace version {version} in {path}")
+    return count
+
+
+def open_binary(path, mode='r'):
+    """Map a binary trace as a TaskBatch whose columns are numpy.memmap views"""
+    from taskbatch import TaskBatch
+
+    count = read_header(path)
+    if count == 0:
+        return TaskBatch([], [], [])
+    ids, arrival, burst, power, priority = (
+        np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(count,))
+        for (_, dtype), offset in zip(COLUMNS, _offsets(count))
+    )
+    return TaskBatch(arrival, burst, power, priority, ids, narrow=False)
+
+
+def _create(path, count):
+    """Write the header and return writable memmaps for each column"""
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), 0, count).ljust(HEADER_SIZE, b'\0'))
+        f.truncate(_size(count))
+    if count == 0:
+        return []
+    return [np.memmap(path, dtype=dtype, mode='r+', offset=offset, shape=(count,))
+            for (_, dtype), offset in zip(COLUMNS, _offsets(count))]
+
+
+def _fill(column, offset, values, dtype):
+    values = np.asarray(values)
+    if values.dtype.kind == 'f' and not np.all(np.mod(values, 1) == 0):
+        raise ValueError("Binary traces store integer task fields only")
+    if values.size and (values.min() < np.iinfo(dtype).min or values.max() > np.iinfo(dtype).max):
+        raise ValueError(f"Task field values do not fit the binary trace's {dtype} column")
+    column[offset:offset + len(values)] = values
+
+
+def write_binary(path, tasks):
+    """Write tasks (a TaskBatch, or anything engine.normalize_tasks accepts) as a binary trace"""
+    from engine import is_batch
+    from taskbatch import TaskBatch
+
+    batch = tasks if is_batch(tasks) else TaskBatch.from_tasks(tasks)
+    # The batch may itself be mapped from ``path``, so write beside it and
+    # swap the file in; existing maps keep reading the old one
+    tmp_path = path + '.tmp'
+    columns = _create(tmp_path, len(batch))
+    values = (batch.ids, batch.arrival, batch.burst, batch.power, batch.priority)
+    try:
+        for column, data, (_, dtype) in zip(columns, values, COLUMNS):
+            _fill(column, 0, data, dtype)
+            column.flush()
+    except ValueError:
+        del columns
+        os.remove(tmp_path)
+        raise
+    del columns
+    os.replace(tmp_path, path)
+    return len(batch)
+
+
+def convert_to_binary(src, dst):
+    """Convert a JSON/JSONL/CSV trace to the binary format in two streaming passes.
+
+    The first pass counts tasks so the columns can be laid out; the second
+    fills them chunk by chunk, so the source is never held in memory.
+    """
+    from traceio import iter_chunks, iter_records
+
+    count = sum(1 for _ in iter_records(src))
+    columns = _create(dst, count)
+    offset = 0
+    for chunk in iter_chunks(iter_records(src)):
+        for column, values, (_, dtype) in zip(columns, zip(*chunk), COLUMNS):
+            _fill(column, offset, values, dtype)
+        offset += len(chunk)
+    for column in columns:
+        column.flush()
+    return count
+
+
+def convert_from_binary(src, dst):
+    """Convert a binary trace back to a JSON/JSONL/CSV trace"""
+    from traceio import write_tasks
+    return write_tasks(dst, open_binary(src))
@@ -0,0 +1,336 @@
+"""Streaming readers and writers for task traces.
+
+Traces are JSON Lines (``.jsonl``/``.ndjson``) or CSV, optionally gzip
+compressed (``.gz``). Both are read one task at a time, so a multi-GB
+production trace can be scheduled with bounded memory. The legacy
+``.json`` task files (one JSON array) are still accepted but have to be
+parsed whole. Binary ``.ctrace`` files (see tracebin) are memory-mapped
+instead of parsed.
+
+A task may also have a deadline. Text traces carry it in an optional
+``deadline`` column that the engine ignores; ``load_batch(path,
+deadlines=True)`` or ``load_deadlines`` reads it back for the
+deadline-aware speedscale policy.
+"""
+import csv
+import gzip
+import json
+import math
+import os
+from itertools import islice
+
+from engine import ARRIVAL, BURST, ID, POWER, PRIORITY, is_batch, normalize_tasks, stream
+
+TASK_FIELDS = ('id', 'arrival', 'burst', 'power', 'priority')
+SCHEDULE_FIELDS = TASK_FIELDS + ('start', 'end', 'energy', 'core')
+# Fields every trace row must give; id and priority have defaults
+REQUIRED_FIELDS = ('arrival', 'burst', 'power')
+# Optional column after TASK_FIELDS, written only when some task has a deadline
+DEADLINE_FIELD = 'deadline'
+
+CHUNK_SIZE = 65536
+
+
+def trace_format(path):
+    """'jsonl', 'csv', 'json' or 'binary', judged by the file extension"""
+    if path.lower().endswith('.ctrace'):
+        return 'binary'
+    name = path[:-3] if path.endswith('.gz') else path
+    ext = os.path.splitext(name)[1].lower()
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if ext == '.csv':
+        return 'csv'
+    if ext == '.json':
+        return 'json'
+    raise ValueError(f"Unsupported trace format: {path}")
+
+
+def open_trace(path, mode):
+    """Open a text trace or output file, gzip-compressed if ``path`` ends in .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def _number(value, field):
+    """``value`` as an int or a finite float; anything else (null, lists, text, NaN) is a ValueError"""
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"{field} is not a number: {value!r}") from None
+    elif isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number, not {type(value).__name__}")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"{field} must be finite, not {value}")
+    return value
+
+
+def _record(row, number):
+    """Engine record from trace row ``number`` (1-based), which is also the default id.
+
+    Only id and priority may be left out; a row missing anything else is an
+    error rather than a task with made-up values.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"Row {number}: expected an object with task fields, not {type(row).__name__}")
+    for field in REQUIRED_FIELDS:
+        if row.get(field) in (None, ''):
+            raise ValueError(f"Row {number}: missing {field}")
+    task_id = row.get('id')
+    priority = row.get('priority')
+    try:
+        return (_number(task_id, 'id') if task_id not in (None, '') else number,
+                _number(row['arrival'], 'arrival'),
+                _number(row['burst'], 'burst'),
+                _number(row['power'], 'power'),
+                _number(priority, 'priority') if priority not in (None, '') else 1)
+    except ValueError as e:
+        raise ValueError(f"Row {number}: {e}") from None
+
+
+def _deadline(row, number):
+    """Deadline of trace row ``number`` as a float, NaN if it has none"""
+    deadline = row.get(DEADLINE_FIELD) if isinstance(row, dict) else None
+    if deadline in (None, ''):
+        return math.nan
+    try:
+        return float(_number(deadline, DEADLINE_FIELD))
+    except ValueError as e:
+        raise ValueError(f"Row {number}: {e}") from None
+
+
+def task_deadlines(tasks):
+    """Each task's deadline, or None: the 'deadline' of a dict or a task.Task.
+
+    Records and TaskBatches carry no deadlines.
+    """
+    if is_batch(tasks):
+        return [None] * len(tasks)
+    deadlines = []
+    for task in tasks:
+        if isinstance(task, dict):
+            deadlines.append(task.get(DEADLINE_FIELD))
+        elif isinstance(task, tuple):
+            deadlines.append(None)
+        else:
+            deadlines.append(getattr(task, DEADLINE_FIELD, None))
+    return deadlines
+
+
+def records_from_rows(rows):
+    """Engine records from task dicts laid out as in JSON traces, numbering tasks without an id"""
+    return [_record(row, number) for number, row in enumerate(rows, 1)]
+
+
+def _iter_rows(path):
+    """Yield the rows of a text trace as dicts"""
+    fmt = trace_format(path)
+    with open_trace(path, 'r') as f:
+        if fmt == 'json':
+            yield from json.load(f)
+        elif fmt == 'jsonl':
+            yield from (json.loads(line) for line in f if line.strip())
+        else:
+            yield from csv.DictReader(f)
+
+
+def iter_records(path):
+    """Yield engine task records from a trace file one at a time"""
+    if trace_format(path) == 'binary':
+        from tracebin import open_binary
+        yield from _iter_task_records(open_binary(path))
+        return
+    for number, row in enumerate(_iter_rows(path), 1):
+        yield _record(row, number)
+
+
+def load_deadlines(path):
+    """Deadlines of a trace's tasks in file order, or None if no task has one.
+
+    Returns a float array with NaN for tasks without a deadline.
+    """
+    if trace_format(path) == 'binary':
+        return None
+    import numpy as np
+    deadlines = np.fromiter((_deadline(row, number) for number, row in enumerate(_iter_rows(path), 1)),
+                            np.float64)
+    return None if np.isnan(deadlines).all() else deadlines
+
+
+def iter_chunks(records, chunk_size=CHUNK_SIZE):
+    """Group an iterable of records into lists of at most ``chunk_size``"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def in_arrival_order(records):
+    """Pass records through, raising ValueError as soon as an arrival goes backwards"""
+    previous = None
+    for task in records:
+        if previous is not None and task[ARRIVAL] < previous:
+            raise ValueError(f"Trace is not sorted by arrival time (task {task[ID]}); "
+                             f"sort it before streaming")
+        previous = task[ARRIVAL]
+        yield task
+
+
+def load_batch(path, chunk_size=CHUNK_SIZE, deadlines=False):
+    """Read a trace into a TaskBatch, converting it to columns chunk by chunk.
+
+    Binary traces are mapped rather than read, so they load without copying.
+    With ``deadlines`` set, returns ``(batch, deadlines)`` instead, the
+    deadlines gathered in the same pass as for ``load_deadlines``.
+    """
+    import numpy as np
+    from taskbatch import TaskBatch
+
+    if trace_format(path) == 'binary':
+        from tracebin import open_binary
+        batch = open_binary(path)
+        return (batch, None) if deadlines else batch
+
+    columns = [[] for _ in TASK_FIELDS]
+    deadline_chunks = []
+    for chunk in iter_chunks(enumerate(_iter_rows(path), 1), chunk_size):
+        records = [_record(row, number) for number, row in chunk]
+        for column, values in zip(columns, zip(*records)):
+            column.append(np.array(values))
+        if deadlines:
+            deadline_chunks.append(np.fromiter((_deadline(row, number) for number, row in chunk),
+                                               np.float64, len(chunk)))
+    if not columns[0]:
+        batch = TaskBatch([], [], [])
+    else:
+        ids, arrival, burst, power, priority = (np.concatenate(column) for column in columns)
+        batch = TaskBatch(arrival, burst, power, priority, ids)
+    if not deadlines:
+        return batch
+    given = np.concatenate(deadline_chunks) if deadline_chunks else None
+    return batch, (None if given is None or np.isnan(given).all() else given)
+
+
+def _iter_task_records(tasks, chunk_size=CHUNK_SIZE):
+    if is_batch(tasks):
+        for offset in range(0, len(tasks), chunk_size):
+            yield from tasks.take(slice(offset, offset + chunk_size)).to_records()
+    else:
+        for chunk in iter_chunks(tasks, chunk_size):
+            yield from normalize_tasks(chunk)
+
+
+def write_rows(f, fmt, fields, rows):
+    """Write rows (tuples in ``fields`` order) to an open text file as 'csv', 'jsonl' or 'json'"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == 'jsonl':
+        for row in rows:
+            f.write(json.dumps(dict(zip(fields, row))))
+            f.write('\n')
+            count += 1
+    else:
+        # A JSON array written one element per line keeps the legacy
+        # format readable by json.load without building it in memory
+        f.write('[')
+        for row in rows:
+            f.write(',\n' if count else '\n')
+            f.write(json.dumps(dict(zip(fields, row))))
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+def _write_rows(path, fields, rows):
+    fmt = trace_format(path)
+    if fmt == 'binary':
+        raise ValueError("Binary traces hold tasks only; write schedules as JSON or CSV")
+    with open_trace(path, 'w') as f:
+        return write_rows(f, fmt, fields, rows)
+
+
+def _written_deadline(deadline):
+    """Deadline as written to a trace: None for none or NaN, whole floats as ints"""
+    # NaN is the only value not equal to itself
+    if deadline is None or deadline != deadline:
+        return None
+    deadline = deadline.item() if hasattr(deadline, 'item') else deadline
+    return int(deadline) if isinstance(deadline, float) and deadline.is_integer() else deadline
+
+
+def write_tasks(path, tasks, deadlines=None):
+    """Stream tasks (records, dicts, Task objects, a TaskBatch or any iterable of them) to a trace file.
+
+    ``deadlines`` is a sequence in task order (e.g. from ``load_deadlines``)
+    where None or NaN means no deadline. Left out, the deadlines of a list
+    of dicts or Task objects are used; other inputs are streamed as they
+    are, without looking ahead. If any task has a deadline, a deadline
+    column is added, which binary traces cannot hold.
+    """
+    if deadlines is None and isinstance(tasks, list):
+        deadlines = task_deadlines(tasks)
+    has_deadlines = deadlines is not None and any(_written_deadline(d) is not None for d in deadlines)
+    if trace_format(path) == 'binary':
+        if has_deadlines:
+            raise ValueError("Binary traces cannot hold deadlines; save as JSON, JSON Lines or CSV")
+        from tracebin import write_binary
+        return write_binary(path, tasks)
+    if not has_deadlines:
+        return _write_rows(path, TASK_FIELDS, _iter_task_records(tasks))
+    rows = (record + (_written_deadline(deadline),)
+            for record, deadline in zip(_iter_task_records(tasks), deadlines))
+    return _write_rows(path, TASK_FIELDS + (DEADLINE_FIELD,), rows)
+
+
+def schedule_trace(path, policy="FCFS", out_path=None, quantum=2, switch_cost=0, cores=1,
+                   profile=None):
+    """Schedule a trace file with bounded memory and return summary totals.
+
+    The trace must be sorted by arrival time. Completed tasks are written
+    to ``out_path`` as they finish when it is given. Fixed power profiles are
+    applied chunk by chunk; the Auto profile needs the whole task set and is
+    not available here.
+    """
+    records = in_arrival_order(iter_records(path))
+    if profile is not None:
+        import dvfs
+        if profile == dvfs.AUTO_PROFILE:
+            raise ValueError("The Auto power profile cannot be used on a streamed trace")
+        records = (task for chunk in iter_chunks(records)
+                   for task in dvfs.apply_profile(chunk, profile))
+
+    summary = {'policy': policy, 'tasks': 0, 'total_energy': 0, 'makespan': 0, 'avg_power': 0}
+
+    def completed():
+        for task, start, end, first, core in stream(records, policy, quantum, switch_cost, cores):
+            if first is None:
+                continue
+            energy = task[BURST] * task[POWER]
+            summary['tasks'] += 1
+            summary['total_energy'] += energy
+            if end > summary['makespan']:
+                summary['makespan'] = end
+            yield (task[ID], task[ARRIVAL], task[BURST], task[POWER], task[PRIORITY],
+                   first, end, energy, core)
+
+    if out_path:
+        _write_rows(out_path, SCHEDULE_FIELDS, completed())
+    else:
+        for _ in completed():
+            pass
+
+    if summary['makespan'] > 0:
+        summary['avg_power'] = summary['total_energy'] / summary['makespan']
+    return summary